@@ -15,8 +15,12 @@ MODIFICAÇÕES DO AGENTE 1:
 
 import sys
 import os
+import time
 from pathlib import Path
 
+# Marco zero do relatório de inicialização
+_INICIO_PROCESSO = time.perf_counter()
+
 # IMPORTANTE: Carregar .env ANTES de importar outros módulos
 def load_env():
     """
@@ -46,28 +50,61 @@ def load_env():
 
 # Carregar variáveis de ambiente antes de qualquer outra importação
 load_env()
+_FIM_ENV = time.perf_counter()
 
 # Agora importar as outras bibliotecas com ambiente configurado
+# O backend (main) e o áudio (pyaudio) são carregados depois, fora do caminho do login
 import customtkinter as ctk
 from tkinter import messagebox, Canvas
 from datetime import datetime, timedelta
 import threading
-import time
 import math
 import random
-import numpy as np
+_FIM_IMPORTS = time.perf_counter()
 
-# Importar o backend integrado (agora com as variáveis de ambiente carregadas)
-# Este import deve acontecer após load_env() para garantir configuração correta
-from main import AURALISBackend, process_message_async
 
-# Importar processador de áudio
-try:
-    from src.audio_processor import AudioRecorder
-    AUDIO_DISPONIVEL = True
-except ImportError:
-    print("⚠️  Módulo de áudio não disponível. Instale pyaudio: pip install pyaudio")
-    AUDIO_DISPONIVEL = False
+class RelatorioInicializacao:
+    """
+    Tempos de cada etapa da inicialização, em ms desde o início do processo
+    
+    As etapas podem ser registradas por threads diferentes (interface e
+    aquecimento do backend). O relatório é impresso uma vez, quando o login
+    já está visível e o backend pronto.
+    """
+    
+    def __init__(self, inicio: float):
+        self.inicio = inicio
+        self.etapas = []  # (nome, início ms, duração ms)
+        self._pendentes = {'login', 'backend'}
+        self.lock = threading.Lock()
+    
+    def registrar(self, nome: str, inicio_etapa: float, fim_etapa: float = None):
+        """Registra uma etapa a partir dos instantes de perf_counter()"""
+        fim_etapa = fim_etapa if fim_etapa is not None else time.perf_counter()
+        with self.lock:
+            self.etapas.append((
+                nome,
+                (inicio_etapa - self.inicio) * 1000,
+                (fim_etapa - inicio_etapa) * 1000
+            ))
+    
+    def concluir(self, marco: str):
+        """Marca 'login' ou 'backend' como prontos; imprime quando ambos estiverem"""
+        with self.lock:
+            self._pendentes.discard(marco)
+            if self._pendentes:
+                return
+            etapas = sorted(self.etapas, key=lambda e: e[1])
+        
+        print("\n⏱️  Relatório de inicialização (ms desde o início)")
+        for nome, inicio_ms, duracao_ms in etapas:
+            print(f"   {inicio_ms:8.1f} +{duracao_ms:8.1f}  {nome}")
+        print(f"   Total até tudo pronto: {(time.perf_counter() - self.inicio) * 1000:.1f} ms\n")
+
+
+relatorio_inicializacao = RelatorioInicializacao(_INICIO_PROCESSO)
+relatorio_inicializacao.registrar("Carregar .env", _INICIO_PROCESSO, _FIM_ENV)
+relatorio_inicializacao.registrar("Importar interface (customtkinter)", _FIM_ENV, _FIM_IMPORTS)
 
 class SistemaTFT:
     """
@@ -78,16 +115,20 @@ class SistemaTFT:
     """
     
     def __init__(self):
+        inicio_interface = time.perf_counter()
+        
         # Configurar tema escuro para toda a aplicação
         ctk.set_appearance_mode("dark")
         
-        # Inicializar backend AURALIS com sistema de agentes IA
-        print("🚀 Inicializando backend AURALIS...")
-        # Backend conectado APENAS ao Supabase
-        self.backend = AURALISBackend()  # Sem mocks - apenas Supabase
+        # Backend AURALIS aquecido em segundo plano enquanto o login aparece
+        self.backend = None
+        self.backend_pronto = threading.Event()
+        self.erro_backend = None
+        threading.Thread(target=self._aquecer_backend, name='auralis-aquecimento', daemon=True).start()
         
-        # Inicializar gravador de áudio se disponível
-        self.audio_recorder = AudioRecorder() if AUDIO_DISPONIVEL else None
+        # Gravador de áudio criado no primeiro uso (ver propriedade audio_recorder)
+        self._audio_recorder = None
+        self._audio_disponivel = None
         
         # Paleta de cores personalizada otimizada para tema escuro
         # Cores cuidadosamente selecionadas para boa visibilidade e acessibilidade
@@ -138,6 +179,65 @@ class SistemaTFT:
         
         # Iniciar com tela de login - ponto de entrada do sistema
         self.mostrar_login()
+        relatorio_inicializacao.registrar("Montar janela e tela de login", inicio_interface)
+        
+        # Primeiro ciclo ocioso do Tk: login desenhado na tela
+        inicio_desenho = time.perf_counter()
+        self.janela.after_idle(lambda: self._login_visivel(inicio_desenho))
+    
+    def _login_visivel(self, inicio_desenho: float):
+        relatorio_inicializacao.registrar("Desenhar login", inicio_desenho)
+        relatorio_inicializacao.concluir('login')
+    
+    def _aquecer_backend(self):
+        """Importa e inicializa o backend fora da thread da interface"""
+        inicio = time.perf_counter()
+        try:
+            # Este import deve acontecer após load_env() para garantir configuração correta
+            import main
+            relatorio_inicializacao.registrar("Importar backend (main, agente, OpenAI, Supabase)", inicio)
+            
+            print("🚀 Inicializando backend AURALIS...")
+            inicio_backend = time.perf_counter()
+            self.backend = main.AURALISBackend()  # Sem mocks - apenas Supabase
+            for etapa, inicio_etapa, fim_etapa in self.backend.tempos_inicializacao:
+                relatorio_inicializacao.registrar(f"  Backend: {etapa}", inicio_etapa, fim_etapa)
+            relatorio_inicializacao.registrar("Inicializar backend", inicio_backend)
+        except Exception as e:
+            print(f"❌ Erro ao inicializar backend: {e}")
+            self.erro_backend = e
+        finally:
+            self.backend_pronto.set()
+            relatorio_inicializacao.concluir('backend')
+    
+    @property
+    def audio_recorder(self):
+        """
+        Gravador de áudio, importado e criado no primeiro uso
+        
+        None enquanto o backend aquece (tenta de novo no próximo acesso) e, de
+        vez, sem pyaudio, sem backend ou se o gravador não puder ser criado.
+        """
+        if self._audio_disponivel is None:
+            if not self.backend_pronto.is_set():
+                return None
+            
+            inicio = time.perf_counter()
+            try:
+                if self.backend is None:
+                    raise RuntimeError(f"backend indisponível ({self.erro_backend})")
+                from src.audio_processor import AudioRecorder
+                self._audio_recorder = AudioRecorder(self.backend.clientes)
+                self._audio_disponivel = True
+            except ImportError:
+                print("⚠️  Módulo de áudio não disponível. Instale pyaudio: pip install pyaudio")
+                self._audio_disponivel = False
+            except Exception as e:
+                print(f"⚠️  Gravador de áudio não pôde ser criado: {e}")
+                self._audio_recorder = None
+                self._audio_disponivel = False
+            print(f"⏱️  Áudio carregado em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return self._audio_recorder
     
     def centralizar_janela(self):
         """
@@ -153,7 +253,12 @@ class SistemaTFT:
     
     def executar(self):
         """Inicia o loop principal da interface gráfica"""
-        self.janela.mainloop()
+        try:
+            self.janela.mainloop()
+        finally:
+            # Janela fechada: cancelar perguntas pendentes e parar os workers
+            if self.backend:
+                self.backend.encerrar()
     
     def transicao_rapida(self, novo_frame_func):
         """
@@ -244,6 +349,17 @@ class SistemaTFT:
         if not usuario:
             return
         
+        # Backend ainda aquecendo: tentar de novo em instantes sem travar a janela
+        if not self.backend_pronto.is_set():
+            self.btn_login.configure(text="Conectando...", state="disabled")
+            self.janela.after(100, self.fazer_login)
+            return
+        self.btn_login.configure(text="ENTRAR", state="normal")
+        
+        if self.erro_backend is not None:
+            messagebox.showerror("Erro", f"Erro ao inicializar backend: {self.erro_backend}", parent=self.janela)
+            return
+        
         # Autenticar via backend
         user = self.backend.authenticate(usuario, senha)
         if user:
@@ -655,34 +771,18 @@ PRÓXIMOS PASSOS:
             # Processar em thread separada
             def processar():
                 try:
-                    # Criar arquivo temporário
-                    from datetime import datetime
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    arquivo_temp = f"reuniao_texto_{timestamp}.txt"
-                    
-                    # Salvar conteúdo com cabeçalho completo
-                    with open(arquivo_temp, "w", encoding="utf-8") as f:
-                        f.write(f"Título: {titulo}\n")
-                        f.write(f"Responsável: {self.usuario_logado.get('username', 'Não identificado')}\n")
-                        f.write(f"Data: {datetime.now().strftime('%d/%m/%Y')}\n")
-                        f.write(f"Hora: {datetime.now().strftime('%H:%M')}\n")
-                        if hasattr(self, 'observacoes_reuniao'):
-                            f.write(f"Observações: {self.observacoes_reuniao}\n")
-                        f.write(f"\n{conteudo}")
-                    
-                    # Processar embeddings
-                    from src.embeddings_processor import ProcessadorEmbeddings
-                    processador = ProcessadorEmbeddings()
-                    
-                    # O processador extrai metadados automaticamente do arquivo
-                    sucesso = processador.processar_arquivo(arquivo_temp)
-                    
-                    # Remover arquivo temporário
-                    import os
-                    os.remove(arquivo_temp)
+                    # Enviar o texto direto para chunking, embeddings e inserção
+                    pipeline = self._criar_pipeline_reuniao(
+                        titulo,
+                        getattr(self, 'observacoes_reuniao', ''),
+                        datetime.now(),
+                        prefixo="reuniao_texto"
+                    )
+                    pipeline.adicionar_segmento(conteudo)
+                    resultado = pipeline.finalizar()
                     
                     # Callback na thread principal
-                    self.janela.after(0, lambda: self.finalizar_processamento_texto(loading, sucesso))
+                    self.janela.after(0, lambda: self.finalizar_processamento_texto(loading, resultado))
                     
                 except Exception as e:
                     erro_msg = str(e)
@@ -693,23 +793,25 @@ PRÓXIMOS PASSOS:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar reunião: {str(e)}", parent=self.janela)
     
-    def finalizar_processamento_texto(self, loading, sucesso):
+    def _criar_pipeline_reuniao(self, titulo: str, observacoes: str, data_inicio: datetime,
+                                prefixo: str = "reuniao_audio"):
+        """Cria o pipeline de ingestão com o cabeçalho da reunião"""
+        from src.pipeline_reuniao import PipelineIngestaoReuniao
+        
+        cabecalho = f"""Título: {titulo}
+Responsável: {self.usuario_logado.get('username', 'Não identificado')}
+Data: {data_inicio.strftime('%d/%m/%Y')}
+Hora: {data_inicio.strftime('%H:%M')}"""
+        if observacoes:
+            cabecalho += f"\nObservações: {observacoes}"
+        
+        arquivo_origem = f"{prefixo}_{data_inicio.strftime('%Y%m%d_%H%M%S')}.txt"
+        return PipelineIngestaoReuniao(self.backend.processador_embeddings, cabecalho, arquivo_origem)
+    
+    def finalizar_processamento_texto(self, loading, resultado):
         """Finaliza processamento de texto"""
         loading.destroy()
-        
-        if sucesso:
-            messagebox.showinfo(
-                "Sucesso",
-                "Reunião salva com sucesso!",
-                parent=self.janela
-            )
-            self.transicao_rapida(self.mostrar_menu_principal)
-        else:
-            messagebox.showerror(
-                "Erro",
-                "Erro ao salvar reunião no banco de dados.",
-                parent=self.janela
-            )
+        self._finalizar_ingestao_reuniao(resultado)
     
     def erro_processamento_texto(self, loading, erro):
         """Trata erro no processamento"""
@@ -820,6 +922,11 @@ PRÓXIMOS PASSOS:
                 self.audio_recorder.toggle_recording()
             except:
                 pass
+            # Reunião abandonada: descartar o que já foi ingerido
+            if getattr(self, 'pipeline_reuniao', None):
+                self.audio_recorder.on_partial_text = None
+                threading.Thread(target=self.pipeline_reuniao.cancelar, daemon=True).start()
+                self.pipeline_reuniao = None
         self.frame_gravacao_audio.destroy()
         # Voltar para formulário anterior
         self.transicao_rapida(self._criar_pre_gravacao)
@@ -837,6 +944,18 @@ PRÓXIMOS PASSOS:
                 text="Gravando... Clique para parar"
             )
             
+            # Trechos transcritos ao vivo seguem direto para o banco
+            try:
+                self.pipeline_reuniao = self._criar_pipeline_reuniao(
+                    self.titulo_reuniao_audio,
+                    self.observacoes_reuniao_audio,
+                    self.data_inicio_gravacao
+                )
+                self.audio_recorder.on_partial_text = self.pipeline_reuniao.adicionar_segmento
+            except Exception as e:
+                print(f"⚠️  Pipeline de ingestão indisponível ({e}); usando processamento após a gravação")
+                self.pipeline_reuniao = None
+            
             try:
                 self.audio_recorder.toggle_recording()
                 self.tempo_inicio_gravacao = time.time()
@@ -917,10 +1036,23 @@ PRÓXIMOS PASSOS:
     def processar_gravacao_reuniao(self):
         """Processa gravação da reunião"""
         try:
-            # Obter transcrição
+            # Obter transcrição (no modo ao vivo só falta o último segmento)
             transcricao = self.audio_recorder.get_transcription()
             
-            if transcricao:
+            pipeline = getattr(self, 'pipeline_reuniao', None)
+            self.pipeline_reuniao = None
+            self.audio_recorder.on_partial_text = None
+            
+            if transcricao and pipeline:
+                # Sem transcrição ao vivo, o texto inteiro entra agora (sem as partes que falharam)
+                if pipeline.segmentos_recebidos == 0:
+                    from src.audio_processor import remover_marcadores_erro
+                    texto = remover_marcadores_erro(transcricao)
+                    if texto.strip():
+                        pipeline.adicionar_segmento(texto)
+                resultado = pipeline.finalizar()
+                self.janela.after(0, lambda: self._finalizar_ingestao_reuniao(resultado))
+            elif transcricao:
                 # Criar cabeçalho completo
                 cabecalho = f"""Título: {self.titulo_reuniao_audio}
 Responsável: {self.usuario_logado.get('username', 'Não identificado')}
@@ -939,6 +1071,8 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
                     conteudo_completo
                 ))
             else:
+                if pipeline:
+                    pipeline.cancelar()
                 self.janela.after(0, lambda: messagebox.showerror(
                     "Erro", 
                     "Não foi possível transcrever o áudio.", 
@@ -955,6 +1089,22 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
             # Fechar interface de gravação
             self.janela.after(0, lambda: self.fechar_interface_gravacao())
     
+    def _finalizar_ingestao_reuniao(self, resultado: dict):
+        """Informa o resultado da ingestão da reunião (completa, parcial ou com erro)"""
+        if resultado['sucesso']:
+            messagebox.showinfo("Sucesso", "Reunião salva com sucesso!", parent=self.janela)
+            self.transicao_rapida(self.mostrar_menu_principal)
+        elif resultado['parcial']:
+            messagebox.showwarning(
+                "Reunião salva parcialmente",
+                f"Apenas {resultado['chunks_inseridos']} de {resultado['chunks_criados']} trechos "
+                f"foram salvos; parte da reunião não estará disponível nas buscas.",
+                parent=self.janela
+            )
+            self.transicao_rapida(self.mostrar_menu_principal)
+        else:
+            messagebox.showerror("Erro", "Erro ao salvar reunião no banco de dados.", parent=self.janela)
+    
     def fechar_interface_gravacao(self):
         """Fecha interface de gravação após processamento"""
         self.animacao_ativa_reuniao = False
@@ -1185,6 +1335,30 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
         self.text_chat.configure(state="disabled")
         self.text_chat.see("end")
     
+    def _processar_com_ia(self, mensagem: str):
+        """Envia a mensagem ao backend; a resposta aparece no chat enquanto é gerada"""
+        # Desabilitar entrada durante processamento
+        self.entry_chat.configure(state="disabled")
+        
+        # Mostrar indicador de processamento
+        self._mostrar_processando()
+        self.resposta_em_andamento = False
+        
+        # Processar mensagem via backend de forma assíncrona
+        from main import process_message_async
+        process_message_async(
+            self.backend,
+            mensagem,
+            self._resposta_ia_callback,
+            self._erro_ia_callback,
+            token_callback=self._trecho_ia_callback,
+            sessao=f"tft-{id(self)}"
+        )
+    
+    def _trecho_ia_callback(self, trecho: str):
+        """Callback para cada trecho da resposta em streaming"""
+        self.janela.after(0, lambda: self._anexar_trecho_resposta(trecho))
+    
     def _resposta_ia_callback(self, resposta: str):
         """Callback para resposta da IA"""
         # Executar na thread principal da GUI
@@ -1194,19 +1368,40 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
         """Callback para erro no processamento"""
         self.janela.after(0, lambda: self._atualizar_chat_com_erro(erro))
     
-    def _atualizar_chat_com_resposta(self, resposta: str):
-        """Atualiza o chat com a resposta da IA"""
-        self.text_chat.configure(state="normal")
-        
-        # Remover "Processando..."
+    def _remover_processando(self):
+        """Remove o indicador "Processando..." do fim do chat"""
         content = self.text_chat.get("1.0", "end-1c")
         lines = content.split('\n')
         if lines and "Processando..." in lines[-1]:
             # Remover última linha
             self.text_chat.delete("end-2l", "end")
+    
+    def _anexar_trecho_resposta(self, trecho: str):
+        """Acrescenta um trecho da resposta em streaming ao chat"""
+        self.text_chat.configure(state="normal")
+        
+        # Primeiro trecho substitui o "Processando..."
+        if not self.resposta_em_andamento:
+            self._remover_processando()
+            self.text_chat.insert("end", "🤖 ")
+            self.resposta_em_andamento = True
         
-        # Adicionar resposta
-        self.text_chat.insert("end", f"🤖 {resposta}\n\n")
+        self.text_chat.insert("end", trecho)
+        self.text_chat.configure(state="disabled")
+        self.text_chat.see("end")
+    
+    def _atualizar_chat_com_resposta(self, resposta: str):
+        """Atualiza o chat com a resposta da IA"""
+        self.text_chat.configure(state="normal")
+        
+        if self.resposta_em_andamento:
+            # Resposta já exibida trecho a trecho: apenas fechar o bloco
+            self.text_chat.insert("end", "\n\n")
+            self.resposta_em_andamento = False
+        else:
+            # Remover "Processando..." e adicionar resposta
+            self._remover_processando()
+            self.text_chat.insert("end", f"🤖 {resposta}\n\n")
         self.text_chat.configure(state="disabled")
         self.text_chat.see("end")
         
@@ -1218,11 +1413,13 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
         """Atualiza o chat com mensagem de erro"""
         self.text_chat.configure(state="normal")
         
-        # Remover "Processando..."
-        content = self.text_chat.get("1.0", "end-1c")
-        lines = content.split('\n')
-        if lines and "Processando..." in lines[-1]:
-            self.text_chat.delete("end-2l", "end")
+        if self.resposta_em_andamento:
+            # Erro no meio do streaming: manter o que já foi exibido
+            self.text_chat.insert("end", "\n")
+            self.resposta_em_andamento = False
+        else:
+            # Remover "Processando..."
+            self._remover_processando()
         
         # Adicionar erro
         self.text_chat.insert("end", f"❌ Erro: {erro}\n\n")
@@ -1245,19 +1442,7 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
         
         self.entry_chat.delete(0, "end")
         
-        # Desabilitar entrada durante processamento
-        self.entry_chat.configure(state="disabled")
-        
-        # Mostrar indicador de processamento
-        self._mostrar_processando()
-        
-        # Processar mensagem via backend de forma assíncrona
-        process_message_async(
-            self.backend,
-            msg,
-            self._resposta_ia_callback,
-            self._erro_ia_callback
-        )
+        self._processar_com_ia(msg)
     
     # ==================== INTERFACE DE ÁUDIO COM CLIQUE ====================
     def abrir_interface_audio(self):
@@ -1526,16 +1711,7 @@ Hora: {self.data_inicio_gravacao.strftime('%H:%M')}"""
         self.fechar_audio()
         
         # Processar como mensagem normal
-        self.entry_chat.configure(state="disabled")
-        self._mostrar_processando()
-        
-        # Processar mensagem via backend
-        process_message_async(
-            self.backend,
-            transcricao,
-            self._resposta_ia_callback,
-            self._erro_ia_callback
-        )
+        self._processar_com_ia(transcricao)
     
     def erro_transcricao(self, erro: str):
         """Trata erro na transcrição"""
@@ -46,6 +46,11 @@ CREATE INDEX idx_base_conhecimento_documento_origem ON base_conhecimento(documen
 CREATE INDEX idx_base_conhecimento_ativo ON base_conhecimento(ativo);
 CREATE INDEX idx_base_conhecimento_metadata ON base_conhecimento USING GIN(metadata);
 
+-- Busca lexical: conteúdo em tsvector (configuração portuguese) com índice GIN
+ALTER TABLE base_conhecimento ADD COLUMN IF NOT EXISTS conteudo_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(conteudo, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_base_conhecimento_conteudo_tsv ON base_conhecimento USING GIN(conteudo_tsv);
+
 -- Função para busca semântica por similaridade
 CREATE OR REPLACE FUNCTION buscar_conhecimento_similar(
     query_embedding vector(1536),
@@ -86,6 +91,105 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Função para busca semântica com várias consultas de uma vez
+-- Recebe um array JSON de embeddings e devolve os top-k de cada consulta
+-- (indicados por consulta_indice, base 0) em uma única chamada
+CREATE OR REPLACE FUNCTION buscar_conhecimento_similar_multi(
+    query_embeddings JSONB,
+    limite INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    consulta_indice INTEGER,
+    id UUID,
+    conteudo TEXT,
+    tipo_documento TEXT,
+    categoria TEXT,
+    tags TEXT[],
+    documento_origem TEXT,
+    similaridade FLOAT,
+    metadata JSONB
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        (q.idx - 1)::INTEGER,
+        s.id,
+        s.conteudo,
+        s.tipo_documento,
+        s.categoria,
+        s.tags,
+        s.documento_origem,
+        s.sim,
+        s.metadata
+    FROM jsonb_array_elements(query_embeddings) WITH ORDINALITY AS q(emb, idx)
+    CROSS JOIN LATERAL (
+        SELECT
+            bc.id,
+            bc.conteudo,
+            bc.tipo_documento,
+            bc.categoria,
+            bc.tags,
+            bc.documento_origem,
+            1 - (bc.embedding <=> (q.emb::TEXT)::vector(1536)) AS sim,
+            bc.metadata
+        FROM base_conhecimento bc
+        WHERE bc.ativo = true
+        ORDER BY bc.embedding <=> (q.emb::TEXT)::vector(1536)
+        LIMIT limite
+    ) s
+    ORDER BY q.idx, s.sim DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para busca lexical (termos exatos) na base de conhecimento
+-- Termos combinados com OU e ordenados por ts_rank_cd; fundida com a busca vetorial no cliente
+CREATE OR REPLACE FUNCTION buscar_conhecimento_texto(
+    consulta TEXT,
+    limite INTEGER DEFAULT 15
+)
+RETURNS TABLE (
+    id UUID,
+    conteudo TEXT,
+    tipo_documento TEXT,
+    categoria TEXT,
+    tags TEXT[],
+    documento_origem TEXT,
+    relevancia FLOAT,
+    metadata JSONB
+) AS $$
+DECLARE
+    termos tsquery := NULLIF(replace(plainto_tsquery('portuguese', consulta)::TEXT, '&', '|'), '')::tsquery;
+BEGIN
+    IF termos IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        bc.id,
+        bc.conteudo,
+        bc.tipo_documento,
+        bc.categoria,
+        bc.tags,
+        bc.documento_origem,
+        ts_rank_cd(bc.conteudo_tsv, termos)::FLOAT AS relevancia,
+        bc.metadata
+    FROM base_conhecimento bc
+    WHERE
+        bc.ativo = true
+        AND bc.conteudo_tsv @@ termos
+    ORDER BY 7 DESC -- relevancia
+    LIMIT limite;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Coluna computada com o embedding em binário (formato do pgvector em base64)
+-- Usada pelo índice local do cliente para evitar o parse do texto do vetor
+CREATE OR REPLACE FUNCTION embedding_b64(r base_conhecimento)
+RETURNS TEXT AS $$
+    SELECT encode(vector_send(r.embedding), 'base64');
+$$ LANGUAGE sql STABLE;
+
 -- Função para obter contexto completo de um documento
 CREATE OR REPLACE FUNCTION obter_contexto_documento(
     doc_origem TEXT,
@@ -156,4 +260,5 @@ COMMENT ON COLUMN base_conhecimento.embedding IS 'Vetor de embedding gerado pelo
 COMMENT ON COLUMN base_conhecimento.chunk_index IS 'Índice sequencial do chunk dentro do documento original';
 COMMENT ON COLUMN base_conhecimento.tipo_documento IS 'Tipo do documento: manual, estatuto, procedimento, politica, etc.';
 COMMENT ON COLUMN base_conhecimento.tags IS 'Tags para categorização e busca adicional';
+COMMENT ON COLUMN base_conhecimento.conteudo_tsv IS 'Conteúdo em tsvector (português) para a busca lexical fundida com a vetorial';
 COMMENT ON COLUMN base_conhecimento.metadata IS 'Metadados adicionais em formato JSON para extensibilidade';
\ No newline at end of file
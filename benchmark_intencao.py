@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da classificação de intenção
+Compara a implementação anterior (re.search sem compilar + varreduras de
+substring por verificação) com o MatcherIntencao pré-compilado, conferindo
+antes que os dois dão exatamente o mesmo resultado para cada pergunta.
+
+Não usa OpenAI nem Supabase:
+    python benchmark_intencao.py [repeticoes]
+"""
+
+import re
+import sys
+import os
+import timeit
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.clarificador_intencao import ClarificadorIntencao, TipoPergunta
+
+PERGUNTAS = [
+    "Me ajude",
+    "O que você pode fazer?",
+    "Status",
+    "Informações",
+    "Qual foi o tema da última reunião?",
+    "Compare as duas últimas reuniões",
+    "asdfghjkl",
+    "???",
+    "",
+    "Oi",
+    "Resumo geral",
+    "Novidades?",
+    "Quem é o responsável pelo projeto de crédito?",
+    "Quando foi a primeira reunião sobre inadimplência?",
+    "Liste as decisões da reunião de ontem",
+    "Analise a evolução dos indicadores financeiros do mês",
+    "O que é CDI",
+    "Qual o valor aprovado para o novo sistema?",
+    "Pode me ajudar?",
+    "Estou com um problema no relatório",
+    "tá difícil",
+    "me explique isso",
+    "como assim",
+    "ué",
+    "Existe alguma pendência do cooperado?",
+    "Quantos participantes tiveram na reunião mais recente?",
+    "Quais são as melhores práticas de governança?",
+    "Mostre o telefone do gerente da agência",
+    "bom dia, preciso de informações sobre a reunião de ontem",
+    "socorro",
+    "help me",
+    "ajud",
+]
+
+
+# ---------------------------------------------------------------------------
+# Implementação anterior (referência)
+# ---------------------------------------------------------------------------
+
+PADROES_ANTERIORES = {
+    TipoPergunta.INFORMACAO_SIMPLES: (r"(o que é|qual|quando|quem|onde|quanto)\s+", 0.8),
+    TipoPergunta.ANALISE_COMPLEXA: (r"(compar|analis|avali|projet|identifi|relacion)", 0.9),
+    TipoPergunta.ACAO_ESPECIFICA: (r"(list|mostr|encontr|busc|extra|resum)", 0.85),
+    TipoPergunta.SAUDACAO: (r"^(oi|olá|bom dia|boa tarde|boa noite|opa)", 0.95),
+}
+
+
+def classificar_anterior(clarificador, pergunta):
+    pergunta_lower = pergunta.lower().strip()
+
+    if pergunta_lower in clarificador.respostas_diretas:
+        return (TipoPergunta.SAUDACAO, 1.0, [pergunta_lower], False)
+
+    for categoria, info in clarificador.perguntas_ambiguas.items():
+        for variacao in info["variacoes"]:
+            if variacao in pergunta_lower or pergunta_lower in variacao:
+                return (TipoPergunta.AMBIGUA, 0.9, [variacao], True)
+
+    melhor_tipo = TipoPergunta.AJUDA_GENERICA
+    melhor_confianca = 0.0
+    palavras_encontradas = []
+
+    for tipo, padrao in clarificador.padroes_pergunta.items():
+        palavras_match = [p for p in padrao["palavras"] if p in pergunta_lower]
+        regex, peso = PADROES_ANTERIORES[tipo]
+        regex_match = re.search(regex, pergunta_lower, re.IGNORECASE)
+
+        confianca = 0.0
+        if palavras_match:
+            confianca += peso * len(palavras_match) / len(padrao["palavras"])
+        if regex_match:
+            confianca += peso * 0.5
+
+        if confianca > melhor_confianca:
+            melhor_tipo = tipo
+            melhor_confianca = confianca
+            palavras_encontradas = palavras_match
+
+    precisa_clarificacao = (
+        melhor_confianca < 0.5 or
+        len(pergunta_lower.split()) <= 2 or
+        melhor_tipo == TipoPergunta.AJUDA_GENERICA
+    )
+    return (melhor_tipo, melhor_confianca, palavras_encontradas, precisa_clarificacao)
+
+
+def pergunta_simples_anterior(pergunta):
+    pergunta_lower = pergunta.lower().strip()
+    padroes_simples = [r'^o que é\s+\w+', r'^quem é\s+\w+', r'^quando\s+',
+                       r'^onde\s+', r'^qual\s+', r'^quantos?\s+']
+    if len(pergunta.split()) < 10:
+        for padrao in padroes_simples:
+            if re.match(padrao, pergunta_lower):
+                return True
+    termos_especificos = ['data', 'horário', 'nome', 'valor', 'número', 'telefone',
+                          'email', 'endereço', 'cpf', 'cnpj', 'código']
+    if any(termo in pergunta_lower for termo in termos_especificos):
+        return True
+    return pergunta_lower.startswith(('é possível', 'posso', 'tem como', 'existe', 'há'))
+
+
+def busca_temporal_anterior(pergunta):
+    pergunta_lower = pergunta.lower()
+    indicadores_recente = ['última', 'ultima', 'mais recente', 'recente', 'últimas', 'ultimas']
+    indicadores_primeira = ['primeira', 'mais antiga', 'inicial']
+    indicadores_data = ['hoje', 'ontem', 'semana', 'mês', 'mes', 'data', 'quando']
+    return {
+        'busca_recente': any(ind in pergunta_lower for ind in indicadores_recente),
+        'busca_primeira': any(ind in pergunta_lower for ind in indicadores_primeira),
+        'busca_data': any(ind in pergunta_lower for ind in indicadores_data),
+        'tem_contexto_temporal': any([
+            any(ind in pergunta_lower for ind in indicadores_recente),
+            any(ind in pergunta_lower for ind in indicadores_primeira),
+            any(ind in pergunta_lower for ind in indicadores_data)
+        ])
+    }
+
+
+def pergunta_ambigua_anterior(pergunta):
+    termos_ambiguos = ['isso', 'aquilo', 'ele', 'ela', 'eles', 'o que aconteceu',
+                       'me explique', 'como assim', 'o que foi', 'qual foi', 'me fale sobre']
+    pergunta_limpa = pergunta.lower().strip()
+    if len(pergunta_limpa.split()) <= 4:
+        return any(termo in pergunta_limpa for termo in termos_ambiguos)
+    return False
+
+
+def pergunta_generica_anterior(pergunta):
+    termos_genericos = ['como melhorar', 'o que é', 'qual a importância', 'melhores práticas',
+                        'dicas para', 'estratégias de', 'o que você acha', 'sua opinião sobre']
+    pergunta_lower = pergunta.lower()
+    return any(termo in pergunta_lower for termo in termos_genericos)
+
+
+def ajuda_vaga_anterior(pergunta):
+    pergunta_lower = pergunta.lower()
+    padroes_vagos = [
+        r'(?:pode|poderia|consegue) me ajudar',
+        r'(?:to|tô|estou) com (?:um |)problema',
+        r'preciso de (?:ajuda|auxílio|socorro)',
+        r'(?:tem|teria) como (?:me |)ajudar',
+        r'(?:ajuda|socorro|help)(?:\s|$)',
+        r'(?:não sei|nao sei) o que fazer',
+        r'(?:tá|está) difícil'
+    ]
+    for padrao in padroes_vagos:
+        if re.search(padrao, pergunta_lower):
+            if len(pergunta.split()) < 10:
+                return True
+    return False
+
+
+def analisar_anterior(clarificador, pergunta):
+    """Todas as verificações feitas por pergunta antes do matcher"""
+    return (
+        classificar_anterior(clarificador, pergunta),
+        pergunta_simples_anterior(pergunta),
+        busca_temporal_anterior(pergunta),
+        pergunta_ambigua_anterior(pergunta),
+        pergunta_generica_anterior(pergunta),
+        ajuda_vaga_anterior(pergunta),
+    )
+
+
+def analisar_novo(clarificador, pergunta):
+    sinais = clarificador.analisar(pergunta)
+    c = clarificador.classificar_pergunta(pergunta, sinais)
+    return (
+        (c.tipo, c.confianca, c.palavras_chave, c.precisa_clarificacao),
+        sinais.pergunta_simples,
+        sinais.contexto_temporal(),
+        sinais.pergunta_ambigua,
+        sinais.pergunta_generica,
+        sinais.pedido_ajuda_vago,
+    )
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    clarificador = ClarificadorIntencao()
+
+    # 1. Mesmos resultados
+    divergencias = 0
+    for pergunta in PERGUNTAS:
+        anterior = analisar_anterior(clarificador, pergunta)
+        novo = analisar_novo(clarificador, pergunta)
+        if anterior != novo:
+            divergencias += 1
+            print(f"❌ Divergência em {pergunta!r}:\n   anterior: {anterior}\n   novo:     {novo}")
+    if divergencias:
+        sys.exit(1)
+    print(f"✅ Resultados idênticos para {len(PERGUNTAS)} perguntas")
+
+    # 2. Tempo
+    t_anterior = timeit.timeit(
+        lambda: [analisar_anterior(clarificador, p) for p in PERGUNTAS], number=repeticoes)
+    t_novo = timeit.timeit(
+        lambda: [analisar_novo(clarificador, p) for p in PERGUNTAS], number=repeticoes)
+
+    total = repeticoes * len(PERGUNTAS)
+    print(f"Anterior: {t_anterior / total * 1e6:.1f} µs/pergunta")
+    print(f"Matcher:  {t_novo / total * 1e6:.1f} µs/pergunta")
+    print(f"Ganho:    {t_anterior / t_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
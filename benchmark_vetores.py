@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da leitura de embeddings vindos do Supabase
+Compara json.loads do texto do pgvector (lista de floats Python) com o parse
+direto para float32 (src/vetores.py), tanto do texto quanto do binário em
+base64 da coluna computada embedding_b64, conferindo antes que os valores
+são iguais. Mostra também a memória ocupada por vetor.
+
+Não usa OpenAI nem Supabase:
+    python benchmark_vetores.py [repeticoes]
+"""
+
+import sys
+import os
+import json
+import base64
+import struct
+import timeit
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.vetores import DIMENSAO_PADRAO, vetor_de_texto, vetor_de_pgvector_b64
+
+
+def gerar_exemplo(dimensao: int = DIMENSAO_PADRAO):
+    """Texto do pgvector e binário em base64 (como o encode do Postgres) do mesmo vetor"""
+    vetor = np.random.default_rng(42).normal(0, 0.03, dimensao).astype(np.float32)
+    texto = '[' + ','.join(repr(float(v)) for v in vetor) + ']'
+    binario = struct.pack('>HH', dimensao, 0) + vetor.astype('>f4').tobytes()
+    b64 = base64.encodebytes(binario).decode()  # quebras de linha como no Postgres
+    return vetor, texto, b64
+
+
+def memoria_lista(lista) -> int:
+    return sys.getsizeof(lista) + sum(sys.getsizeof(v) for v in lista)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    vetor, texto, b64 = gerar_exemplo()
+
+    # Conferir que todos os caminhos dão o mesmo vetor
+    assert np.allclose(np.asarray(json.loads(texto), dtype=np.float32), vetor)
+    assert np.array_equal(vetor_de_texto(texto), vetor)
+    assert np.array_equal(vetor_de_pgvector_b64(b64), vetor)
+
+    casos = [
+        ("json.loads (texto)", lambda: json.loads(texto)),
+        ("float32 do texto", lambda: vetor_de_texto(texto)),
+        ("float32 do base64", lambda: vetor_de_pgvector_b64(b64)),
+    ]
+
+    print(f"📊 Leitura de um embedding ({DIMENSAO_PADRAO} dimensões, {repeticoes} repetições)")
+    for nome, funcao in casos:
+        tempo = timeit.timeit(funcao, number=repeticoes) / repeticoes
+        print(f"   {nome:<20} {tempo * 1e6:8.1f} µs")
+
+    print("\n📦 Tamanho por vetor")
+    print(f"   {'texto transferido':<20} {len(texto):8d} bytes")
+    print(f"   {'base64 transferido':<20} {len(b64):8d} bytes")
+    lista = json.loads(texto)
+    print(f"   {'lista Python':<20} {memoria_lista(lista):8d} bytes")
+    print(f"   {'array float32':<20} {vetor.nbytes:8d} bytes "
+          f"({memoria_lista(lista) / vetor.nbytes:.1f}x menor)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,20 @@ Gerencia autenticação, processamento de reuniões e assistente IA
 """
 
 import os
+import time
 import hashlib
-import threading
 from datetime import datetime
-from typing import Dict, Optional, Callable
+from typing import Dict, Optional, Callable, Iterator
 from pathlib import Path
 
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
 
 # Importar os módulos necessários
 from src.agente_busca_melhorado import AgenteBuscaMelhorado
 from src.embeddings_processor import ProcessadorEmbeddings
+from src.executor_requisicoes import ExecutorRequisicoes
+from src.clientes import RegistroClientes, obter_registro_clientes
 
 load_dotenv()
 
@@ -25,27 +27,45 @@ class AURALISBackend:
     Integra Supabase para persistência e OpenAI para IA
     """
     
-    def __init__(self):
-        # Configurar Supabase
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
+    def __init__(self, clientes: Optional[RegistroClientes] = None):
+        # Tempos de cada etapa (nome, início, fim em perf_counter) para o relatório de inicialização
+        self.tempos_inicializacao = []
+        inicio = time.perf_counter()
         
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("Credenciais Supabase não encontradas no .env")
+        # Clientes compartilhados por todos os componentes (um pool por serviço)
+        self.clientes = clientes or obter_registro_clientes()
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        # Configurar Supabase
+        self.supabase: Client = self.clientes.supabase('anon')
+        inicio = self._marcar_etapa("clientes Supabase", inicio)
         
         # Integração com assistente de reuniões
-        self.assistente_reunioes = AgenteBuscaMelhorado()
+        self.assistente_reunioes = AgenteBuscaMelhorado(self.clientes)
+        inicio = self._marcar_etapa("assistente (OpenAI, memória, clarificador)", inicio)
         
         # Processador de embeddings
-        self.processador_embeddings = ProcessadorEmbeddings()
+        self.processador_embeddings = ProcessadorEmbeddings(self.clientes)
+        inicio = self._marcar_etapa("processador de embeddings", inicio)
+        
+        # Perguntas do chat: pool limitado com fila (uma pergunta ativa por sessão)
+        self.executor_requisicoes = ExecutorRequisicoes(
+            self.buscar_informacao_reuniao_stream,
+            max_workers=int(os.getenv('CHAT_MAX_WORKERS', '2')),
+            tamanho_fila=int(os.getenv('CHAT_TAMANHO_FILA', '16'))
+        )
+        self._marcar_etapa("executor de perguntas", inicio)
         
         # Estado do usuário
         self.current_user = None
         
         print("✅ Backend AURALIS inicializado com Supabase")
     
+    def _marcar_etapa(self, etapa: str, inicio: float) -> float:
+        """Registra a duração de uma etapa da inicialização e retorna o instante atual"""
+        fim = time.perf_counter()
+        self.tempos_inicializacao.append((etapa, inicio, fim))
+        return fim
+    
     def hash_password(self, password: str) -> str:
         """Hash de senha usando SHA-256"""
         return hashlib.sha256(password.encode()).hexdigest()
@@ -117,39 +137,62 @@ class AURALISBackend:
         """
         try:
             self.processador_embeddings.processar_pasta(caminho_pasta)
+            # Reingestões trocam chunks: índices locais e cache recarregam do banco
+            self.assistente_reunioes.invalidar_dados()
             return True
         except Exception as e:
             print(f"Erro ao processar pasta: {e}")
             return False
     
-    def buscar_informacao_reuniao(self, pergunta: str) -> str:
+    def buscar_informacao_reuniao(self, pergunta: str, sessao: Optional[str] = None) -> str:
         """
         Busca informação nas reuniões usando IA
         """
-        return self.assistente_reunioes.processar_pergunta(pergunta)
+        return self.assistente_reunioes.processar_pergunta(pergunta, sessao)
+    
+    def buscar_informacao_reuniao_stream(self, pergunta: str, sessao: Optional[str] = None) -> Iterator[str]:
+        """
+        Busca informação nas reuniões gerando a resposta em trechos
+        (cada sessão tem sua própria memória de conversa)
+        """
+        return self.assistente_reunioes.processar_pergunta_stream(pergunta, sessao)
+    
+    def obter_estatisticas(self) -> Dict:
+        """
+        Estatísticas do atendimento de perguntas e dos caches do assistente
+        """
+        return {
+            'requisicoes': self.executor_requisicoes.obter_estatisticas(),
+            **self.assistente_reunioes.obter_estatisticas_cache()
+        }
+    
+    def encerrar(self):
+        """
+        Encerra o backend: cancela perguntas pendentes, aguarda os workers e
+        fecha os clientes de API (o backend não pode ser usado depois disso)
+        """
+        self.executor_requisicoes.encerrar()
+        self.clientes.fechar()
 
 def process_message_async(backend: AURALISBackend, message: str, 
                          callback: Callable[[str], None], 
-                         error_callback: Callable[[str], None]):
+                         error_callback: Callable[[str], None],
+                         token_callback: Optional[Callable[[str], None]] = None,
+                         sessao: str = 'padrao'):
     """
     Processa mensagem de forma assíncrona
-    """
-    def _process():
-        try:
-            # Processar com o assistente de reuniões
-            response = backend.buscar_informacao_reuniao(message)
-            callback(response)
-        except Exception as e:
-            error_callback(str(e))
     
-    thread = threading.Thread(target=_process)
-    thread.daemon = True
-    thread.start()
+    A pergunta entra na fila do executor do backend. Com token_callback, cada
+    trecho da resposta é entregue assim que chega e callback recebe a
+    resposta completa no final. Uma nova pergunta da mesma sessão cancela
+    a anterior, que não recebe mais callbacks.
+    """
+    backend.executor_requisicoes.enviar(sessao, message, callback, error_callback, token_callback)
 
 # Função para inicializar usuários padrão
-def init_default_users():
+def init_default_users(backend: Optional[AURALISBackend] = None):
     """Cria usuários padrão se não existirem"""
-    backend = AURALISBackend()
+    backend = backend or AURALISBackend()
     
     usuarios_padrao = [
         {
@@ -182,9 +225,9 @@ def init_default_users():
             print(f"Erro ao criar usuário padrão: {e}")
 
 # Função para processar reuniões de teste
-def processar_reunioes_teste():
+def processar_reunioes_teste(backend: Optional[AURALISBackend] = None):
     """Processa arquivos de teste na pasta teste_reuniao"""
-    backend = AURALISBackend()
+    backend = backend or AURALISBackend()
     pasta_teste = Path(__file__).parent / "teste_reuniao"
     
     if pasta_teste.exists():
@@ -196,17 +239,19 @@ def processar_reunioes_teste():
 if __name__ == "__main__":
     print("\n=== INICIALIZAÇÃO DO BACKEND AURALIS ===\n")
     
+    # Um único backend para todas as etapas
+    backend = AURALISBackend()
+    
     # Criar usuários padrão
     print("1. Criando usuários padrão...")
-    init_default_users()
+    init_default_users(backend)
     
     # Processar reuniões de teste
     print("\n2. Processando reuniões de teste...")
-    processar_reunioes_teste()
+    processar_reunioes_teste(backend)
     
     # Testar autenticação
     print("\n3. Testando autenticação...")
-    backend = AURALISBackend()
     user = backend.authenticate('admin', 'admin123')
     if user:
         print(f"   ✅ Login bem-sucedido: {user['username']} ({user['cargo']})")
@@ -216,4 +261,5 @@ if __name__ == "__main__":
         resposta = backend.buscar_informacao_reuniao("Quais foram as principais decisões?")
         print(f"   Resposta: {resposta[:100]}...")
     
+    backend.encerrar()
     print("\n=== BACKEND PRONTO ===\n")
\ No newline at end of file
@@ -52,7 +52,12 @@ def processar_arquivo_unico(processador: ProcessadorBaseConhecimento, caminho: s
         print(f"📁 Categoria: {resultado['categoria']}")
         print(f"🏷️  Tags: {', '.join(resultado['tags'])}")
         print(f"📊 Chunks: {resultado['chunks_processados']}/{resultado['total_chunks']}")
+        if resultado['embeddings_economizados']:
+            print(f"♻️  Reaproveitados: {resultado['chunks_reaproveitados']} "
+                  f"(embeddings economizados) | Desativados: {resultado['chunks_desativados']}")
         print(f"🔐 Hash: {resultado['hash'][:16]}...")
+        print(f"⚡ Vazão: {resultado['chunks_por_segundo']} chunks/s | "
+              f"{resultado['tokens_por_segundo']} tokens/s ({resultado['duracao_segundos']}s)")
         
         if resultado['erros']:
             print(f"\n⚠️  Erros encontrados: {len(resultado['erros'])}")
@@ -73,7 +78,7 @@ def processar_arquivo_unico(processador: ProcessadorBaseConhecimento, caminho: s
     return resultado['status'] == 'sucesso'
 
 
-def processar_pasta_completa(processador: ProcessadorBaseConhecimento, caminho: str):
+def processar_pasta_completa(processador: ProcessadorBaseConhecimento, caminho: str, workers: int = 4):
     """Processa todos os arquivos TXT em uma pasta"""
     print(f"\n📁 Processando pasta: {caminho}")
     
@@ -81,7 +86,7 @@ def processar_pasta_completa(processador: ProcessadorBaseConhecimento, caminho:
         print(f"❌ Erro: Pasta não encontrada: {caminho}")
         return
     
-    resultados = processador.processar_pasta(caminho)
+    resultados = processador.processar_pasta(caminho, max_workers=workers)
     
     # Exibe resumo geral
     print("\n" + "="*60)
@@ -188,6 +193,7 @@ def main():
 Exemplos de uso:
   python processar_base_conhecimento.py base_conhecimento.txt
   python processar_base_conhecimento.py --pasta documentos/
+  python processar_base_conhecimento.py --pasta documentos/ --workers 8
   python processar_base_conhecimento.py --buscar
   python processar_base_conhecimento.py --listar
         """
@@ -196,6 +202,7 @@ Exemplos de uso:
     parser.add_argument('arquivo', nargs='?', help='Arquivo TXT para processar')
     parser.add_argument('--pasta', help='Processar todos os TXT de uma pasta')
     parser.add_argument('--versao', default='1.0', help='Versão do documento (padrão: 1.0)')
+    parser.add_argument('--workers', type=int, default=4, help='Arquivos processados em paralelo (padrão: 4)')
     parser.add_argument('--buscar', action='store_true', help='Modo de busca interativa')
     parser.add_argument('--listar', action='store_true', help='Listar documentos processados')
     
@@ -223,7 +230,7 @@ Exemplos de uso:
         listar_documentos(processador)
     
     elif args.pasta:
-        processar_pasta_completa(processador, args.pasta)
+        processar_pasta_completa(processador, args.pasta, args.workers)
     
     elif args.arquivo:
         sucesso = processar_arquivo_unico(processador, args.arquivo, args.versao)
@@ -255,7 +262,7 @@ Exemplos de uso:
             elif opcao == '2':
                 pasta = input("\nDigite o caminho da pasta: ").strip()
                 if pasta:
-                    processar_pasta_completa(processador, pasta)
+                    processar_pasta_completa(processador, pasta, args.workers)
             
             elif opcao == '3':
                 buscar_conhecimento(processador)
@@ -0,0 +1,167 @@
+-- Criação da extensão vector se ainda não existir
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- Índice ANN para busca semântica nos chunks de reuniões
+-- (a tabela reunioes_embbed já existe; aqui só adicionamos índices e funções)
+CREATE INDEX IF NOT EXISTS idx_reunioes_embbed_embedding ON reunioes_embbed
+USING ivfflat (embedding vector_cosine_ops)
+WITH (lists = 100);
+
+CREATE INDEX IF NOT EXISTS idx_reunioes_embbed_data_reuniao ON reunioes_embbed(data_reuniao);
+CREATE INDEX IF NOT EXISTS idx_reunioes_embbed_responsavel ON reunioes_embbed(responsavel);
+CREATE INDEX IF NOT EXISTS idx_reunioes_embbed_arquivo_origem ON reunioes_embbed(arquivo_origem);
+
+-- Busca lexical: texto do chunk em tsvector (configuração portuguese) com índice GIN
+ALTER TABLE reunioes_embbed ADD COLUMN IF NOT EXISTS chunk_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(chunk_texto, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_reunioes_embbed_chunk_tsv ON reunioes_embbed USING GIN(chunk_tsv);
+
+-- Função para busca semântica em reuniões com peso temporal
+-- Busca os candidatos mais próximos pelo índice ANN e reordena pelo peso temporal,
+-- devolvendo apenas os top-k chunks (evita baixar a tabela inteira)
+-- Remove a versão anterior (sem a curva de recência) para não haver sobrecarga ambígua
+DROP FUNCTION IF EXISTS buscar_reunioes_similar(vector, INTEGER, DATE, DATE, TEXT, INTEGER);
+CREATE OR REPLACE FUNCTION buscar_reunioes_similar(
+    query_embedding vector(1536),
+    limite INTEGER DEFAULT 15,
+    data_inicio DATE DEFAULT NULL,
+    data_fim DATE DEFAULT NULL,
+    responsavel_filtro TEXT DEFAULT NULL,
+    fator_candidatos INTEGER DEFAULT 4,
+    meia_vida_dias FLOAT DEFAULT 30,
+    peso_maximo FLOAT DEFAULT 1.2,
+    peso_minimo FLOAT DEFAULT 0.9
+)
+RETURNS TABLE (
+    id UUID,
+    arquivo_origem TEXT,
+    chunk_numero INTEGER,
+    chunk_texto TEXT,
+    titulo TEXT,
+    responsavel TEXT,
+    data_reuniao DATE,
+    hora_inicio TEXT,
+    observacoes TEXT,
+    metadados JSONB,
+    created_at TIMESTAMP WITH TIME ZONE,
+    similaridade FLOAT,
+    similaridade_temporal FLOAT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        c.id,
+        c.arquivo_origem,
+        c.chunk_numero,
+        c.chunk_texto,
+        c.titulo,
+        c.responsavel,
+        c.data_reuniao,
+        c.hora_inicio,
+        c.observacoes,
+        c.metadados,
+        c.created_at,
+        c.similaridade,
+        -- Peso temporal contínuo (mesma curva do cliente, src/peso_temporal.py):
+        -- peso_minimo + (peso_maximo - peso_minimo) * 0.5 ^ (idade_dias / meia_vida_dias)
+        LEAST(
+            c.similaridade * CASE
+                WHEN c.created_at IS NULL THEN 1.0
+                ELSE peso_minimo + (peso_maximo - peso_minimo) * POWER(
+                    0.5,
+                    GREATEST(EXTRACT(EPOCH FROM (NOW() - c.created_at)), 0) / 86400.0
+                        / GREATEST(meia_vida_dias, 0.001)
+                )
+            END,
+            1.0
+        ) AS similaridade_temporal
+    FROM (
+        -- Candidatos pelo índice ANN (ordem pela distância pura)
+        SELECT
+            re.id,
+            re.arquivo_origem,
+            re.chunk_numero,
+            re.chunk_texto,
+            re.titulo,
+            re.responsavel,
+            re.data_reuniao,
+            re.hora_inicio::TEXT AS hora_inicio,
+            re.observacoes,
+            re.metadados,
+            re.created_at,
+            1 - (re.embedding <=> query_embedding) AS similaridade
+        FROM reunioes_embbed re
+        WHERE
+            re.embedding IS NOT NULL
+            AND (data_inicio IS NULL OR re.data_reuniao >= data_inicio)
+            AND (data_fim IS NULL OR re.data_reuniao <= data_fim)
+            AND (responsavel_filtro IS NULL OR re.responsavel ILIKE responsavel_filtro)
+        ORDER BY re.embedding <=> query_embedding
+        LIMIT limite * GREATEST(fator_candidatos, 1)
+    ) c
+    ORDER BY 13 DESC -- similaridade_temporal (posição evita ambiguidade com a coluna de saída)
+    LIMIT limite;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para busca lexical (termos exatos: nomes, siglas, números) nos chunks
+-- Os termos da consulta são combinados com OU; ts_rank_cd favorece chunks que
+-- contêm mais termos e mais próximos. A fusão com a busca vetorial é feita no cliente
+CREATE OR REPLACE FUNCTION buscar_reunioes_texto(
+    consulta TEXT,
+    limite INTEGER DEFAULT 15
+)
+RETURNS TABLE (
+    id UUID,
+    arquivo_origem TEXT,
+    chunk_numero INTEGER,
+    chunk_texto TEXT,
+    titulo TEXT,
+    responsavel TEXT,
+    data_reuniao DATE,
+    hora_inicio TEXT,
+    observacoes TEXT,
+    metadados JSONB,
+    created_at TIMESTAMP WITH TIME ZONE,
+    relevancia FLOAT
+) AS $$
+DECLARE
+    termos tsquery := NULLIF(replace(plainto_tsquery('portuguese', consulta)::TEXT, '&', '|'), '')::tsquery;
+BEGIN
+    IF termos IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        re.id,
+        re.arquivo_origem,
+        re.chunk_numero,
+        re.chunk_texto,
+        re.titulo,
+        re.responsavel,
+        re.data_reuniao,
+        re.hora_inicio::TEXT AS hora_inicio,
+        re.observacoes,
+        re.metadados,
+        re.created_at,
+        ts_rank_cd(re.chunk_tsv, termos)::FLOAT AS relevancia
+    FROM reunioes_embbed re
+    WHERE re.chunk_tsv @@ termos
+    ORDER BY 12 DESC -- relevancia
+    LIMIT limite;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Coluna computada com o embedding em binário (formato do pgvector em base64)
+-- Pedida pelo índice local via select('..., embedding_b64'): cerca de 8 KB por
+-- vetor em vez do texto com 1536 números, lido direto em float32 pelo cliente
+CREATE OR REPLACE FUNCTION embedding_b64(r reunioes_embbed)
+RETURNS TEXT AS $$
+    SELECT encode(vector_send(r.embedding), 'base64');
+$$ LANGUAGE sql STABLE;
+
+-- Comentários explicativos
+COMMENT ON FUNCTION buscar_reunioes_similar IS 'Busca semântica top-k nos chunks de reuniões usando índice ANN, filtros por data/responsável e peso temporal contínuo (meia-vida) calculado no banco';
+COMMENT ON FUNCTION buscar_reunioes_texto IS 'Busca lexical (full-text em português, índice GIN) nos chunks de reuniões, para fusão com a busca vetorial';
+COMMENT ON FUNCTION embedding_b64(reunioes_embbed) IS 'Embedding do chunk em binário (vector_send) codificado em base64 para transporte compacto';
@@ -10,46 +10,113 @@ Agente de IA universal para busca semântica em múltiplas fontes
 
 import os
 import re
-from typing import List, Dict, Optional, Tuple
-import json
-from datetime import datetime, timedelta
+import time
+import threading
+from typing import Iterator, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
-from openai import OpenAI
-from supabase import create_client, Client
+from supabase import Client
 import numpy as np
 from dotenv import load_dotenv
 
 # Importar sistema de memória
 try:
-    from .memoria_contextual import obter_gerenciador_memoria
+    from .memoria_contextual import GerenciadorMemoria, obter_gerenciador_memoria
     from .clarificador_intencao import ClarificadorIntencao
+    from .matcher_intencao import SinaisPergunta
+    from .busca_local import BuscaSemanticaLocal
+    from .cache_embeddings import CacheEmbeddings
+    from .clientes import RegistroClientes, obter_registro_clientes
+    from .cache_respostas import CacheRespostas
+    from .limpeza_resposta import limpar_fluxo
+    from .peso_temporal import obter_peso_temporal
 except ImportError:
-    from memoria_contextual import obter_gerenciador_memoria
+    from memoria_contextual import GerenciadorMemoria, obter_gerenciador_memoria
     from clarificador_intencao import ClarificadorIntencao
+    from matcher_intencao import SinaisPergunta
+    from busca_local import BuscaSemanticaLocal
+    from cache_embeddings import CacheEmbeddings
+    from clientes import RegistroClientes, obter_registro_clientes
+    from cache_respostas import CacheRespostas
+    from limpeza_resposta import limpar_fluxo
+    from peso_temporal import obter_peso_temporal
 
 load_dotenv()
 
+# Perguntas genéricas sobre uma reunião específica (o grupo captura o nome)
+PADROES_REUNIAO_ESPECIFICA = [
+    re.compile(r'me (?:fale|conte|diga) sobre a reuni[ãa]o (?:de |do |da )?(.+)'),
+    re.compile(r'o que (?:teve|houve|aconteceu) na reuni[ãa]o (?:de |do |da )?(.+)'),
+    re.compile(r'(?:sobre|qual foi) a reuni[ãa]o (?:de |do |da )?(.+)'),
+]
+
+# Pedidos que já dizem o que se quer da reunião (não precisam de opções)
+TERMOS_PEDIDO_ESPECIFICO = ('resumo', 'decisões', 'participantes')
+
 class AgenteBuscaMelhorado:
-    def __init__(self):
-        # Configurar OpenAI
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY não encontrada no .env")
-        self.client = OpenAI(api_key=self.openai_api_key)
+    def __init__(self, clientes: Optional[RegistroClientes] = None):
+        # Clientes OpenAI e Supabase compartilhados (pool de conexões keep-alive)
+        clientes = clientes or obter_registro_clientes()
+        self.client = clientes.openai()
+        self.supabase: Client = clientes.supabase('service_role')
         
-        # Configurar Supabase
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("Credenciais Supabase não encontradas no .env")
+        # Cache para embeddings (LRU em memória + SQLite opcional)
+        self.embedding_model = "text-embedding-ada-002"
+        self._cache_embeddings = CacheEmbeddings(
+            capacidade_maxima=int(os.getenv('EMBEDDINGS_CACHE_SIZE', '1000')),
+            caminho_persistencia=os.getenv('EMBEDDINGS_CACHE_PATH') or None
+        )
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        # Cache semântico de respostas (invalidado quando chegam novos dados)
+        self.cache_respostas = CacheRespostas(
+            capacidade_maxima=int(os.getenv('RESPOSTAS_CACHE_SIZE', '500')),
+            ttl_segundos=float(os.getenv('CACHE_TTL_MINUTES', '60')) * 60,
+            limiar_com_chunks=float(os.getenv('RESPOSTAS_CACHE_LIMIAR_CHUNKS', '0.92'))
+        )
+        self.intervalo_versao_dados = float(os.getenv('RESPOSTAS_CACHE_VERIFICACAO_S', '30'))
+        self._versao_dados_atual = None
+        self._versao_dados_verificada_em = 0.0
+        self._lock_versao = threading.Lock()
         
-        # Cache para embeddings
-        self._cache_embeddings = {}
+        # Curva de recência usada na reordenação (local e na RPC de reuniões)
+        self.peso_temporal = obter_peso_temporal()
+        
+        # Índices locais (fallback quando as RPCs não estão disponíveis)
+        # Colunas explícitas: o embedding vem em binário e fica em float32
+        intervalo_reconciliacao = float(os.getenv('BUSCA_LOCAL_RECONCILIACAO_S', '600'))
+        self.busca_local = BuscaSemanticaLocal(
+            self.supabase,
+            colunas='id, arquivo_origem, chunk_numero, chunk_texto, titulo, responsavel, '
+                    'data_reuniao, hora_inicio, observacoes, metadados, created_at',
+            coluna_texto='chunk_texto',
+            intervalo_reconciliacao=intervalo_reconciliacao
+        )
+        self.busca_local_conhecimento = BuscaSemanticaLocal(
+            self.supabase,
+            tabela='base_conhecimento',
+            coluna_marca='data_processamento',
+            filtros={'ativo': True},
+            colunas='id, conteudo, documento_origem, tipo_documento, categoria, tags, '
+                    'data_processamento',
+            coluna_texto='conteudo',
+            intervalo_reconciliacao=intervalo_reconciliacao
+        )
         
-        # Sistema de memória contextual
+        # Peso da busca lexical (termos exatos) na fusão com a similaridade vetorial
+        self.peso_busca_lexica = float(os.getenv('PESO_BUSCA_LEXICA', '0.5'))
+        
+        # Busca concorrente nas fontes (reuniões e base de conhecimento, vetorial e lexical)
+        self._executor_busca = ThreadPoolExecutor(max_workers=8, thread_name_prefix='auralis-busca')
+        self.timeout_fontes = {
+            'reuniao': float(os.getenv('TIMEOUT_BUSCA_REUNIOES', '10')),
+            'documento': float(os.getenv('TIMEOUT_BUSCA_CONHECIMENTO', '10'))
+        }
+        
+        # Sistema de memória contextual (padrão) e uma memória por sessão do chat,
+        # para que perguntas de sessões diferentes não se misturem
         self.gerenciador_memoria = obter_gerenciador_memoria()
+        self._memorias_sessao: Dict[str, GerenciadorMemoria] = {}
+        self._lock_memorias = threading.Lock()
         
         # Sistema de clarificação de intenção
         self.clarificador = ClarificadorIntencao()
@@ -70,55 +137,11 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
 
     def _detectar_pergunta_simples(self, pergunta: str) -> bool:
         """Detecta se é uma pergunta simples que requer resposta direta"""
-        pergunta_lower = pergunta.lower().strip()
-        
-        # Perguntas diretas e objetivas
-        padroes_simples = [
-            r'^o que é\s+\w+',  # "O que é X?"
-            r'^quem é\s+\w+',   # "Quem é X?"
-            r'^quando\s+',      # "Quando...?"
-            r'^onde\s+',        # "Onde...?"
-            r'^qual\s+',        # "Qual...?"
-            r'^quantos?\s+',    # "Quanto/Quantos...?"
-        ]
-        
-        # Verificar se a pergunta tem menos de 10 palavras (geralmente simples)
-        if len(pergunta.split()) < 10:
-            import re
-            for padrao in padroes_simples:
-                if re.match(padrao, pergunta_lower):
-                    return True
-        
-        # Perguntas sobre informações específicas
-        termos_especificos = ['data', 'horário', 'nome', 'valor', 'número', 'telefone', 
-                              'email', 'endereço', 'cpf', 'cnpj', 'código']
-        if any(termo in pergunta_lower for termo in termos_especificos):
-            return True
-        
-        # Perguntas sim/não
-        if pergunta_lower.startswith(('é possível', 'posso', 'tem como', 'existe', 'há')):
-            return True
-            
-        return False
+        return self.clarificador.analisar(pergunta).pergunta_simples
     
     def detectar_busca_temporal(self, pergunta: str) -> Dict:
         """Detecta se a pergunta busca informações temporais"""
-        pergunta_lower = pergunta.lower()
-        
-        indicadores_recente = ['última', 'ultima', 'mais recente', 'recente', 'últimas', 'ultimas']
-        indicadores_primeira = ['primeira', 'mais antiga', 'inicial']
-        indicadores_data = ['hoje', 'ontem', 'semana', 'mês', 'mes', 'data', 'quando']
-        
-        return {
-            'busca_recente': any(ind in pergunta_lower for ind in indicadores_recente),
-            'busca_primeira': any(ind in pergunta_lower for ind in indicadores_primeira),
-            'busca_data': any(ind in pergunta_lower for ind in indicadores_data),
-            'tem_contexto_temporal': any([
-                any(ind in pergunta_lower for ind in indicadores_recente),
-                any(ind in pergunta_lower for ind in indicadores_primeira),
-                any(ind in pergunta_lower for ind in indicadores_data)
-            ])
-        }
+        return self.clarificador.analisar(pergunta).contexto_temporal()
     
     def buscar_reuniao_mais_recente(self) -> Optional[Dict]:
         """Busca a reunião mais recente no banco"""
@@ -149,115 +172,168 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
             print(f"Erro ao buscar reunião mais recente: {e}")
             return None
     
+    def _versao_dados(self) -> Optional[Tuple]:
+        """
+        Marca que muda sempre que reuniões ou documentos são inseridos/alterados
+
+        Último registro e contagem de cada tabela, consultados no máximo a cada
+        `intervalo_versao_dados` segundos. Na base de conhecimento só contam os
+        chunks ativos: a reingestão desativa chunks sem mudar `data_atualizacao`. Retorna None se não for possível
+        consultar (o cache de respostas fica desativado nesse caso).
+        """
+        with self._lock_versao:
+            agora = time.monotonic()
+            if (self._versao_dados_atual is not None and
+                    agora - self._versao_dados_verificada_em < self.intervalo_versao_dados):
+                return self._versao_dados_atual
+
+            try:
+                reunioes = self.supabase.table('reunioes_embbed').select(
+                    'created_at', count='exact'
+                ).order('created_at', desc=True).limit(1).execute()
+                conhecimento = self.supabase.table('base_conhecimento').select(
+                    'data_atualizacao', count='exact'
+                ).eq('ativo', True).order('data_atualizacao', desc=True).limit(1).execute()
+            except Exception as e:
+                print(f"⚠️  Não foi possível verificar novos dados (cache de respostas ignorado): {e}")
+                self._versao_dados_atual = None
+                return None
+
+            versao = (
+                reunioes.count, reunioes.data[0].get('created_at') if reunioes.data else None,
+                conhecimento.count, conhecimento.data[0].get('data_atualizacao') if conhecimento.data else None
+            )
+            if self._versao_dados_atual is not None and versao != self._versao_dados_atual:
+                print("🔄 Novos dados detectados: respostas em cache invalidadas")
+            self._versao_dados_atual = versao
+            self._versao_dados_verificada_em = agora
+            return versao
+
+    def invalidar_dados(self):
+        """
+        Descarta índices locais e respostas em cache (chamar após uma ingestão
+        que troca chunks; a próxima busca recarrega tudo do banco)
+        """
+        self.busca_local.limpar_cache()
+        self.busca_local_conhecimento.limpar_cache()
+        self.cache_respostas.invalidar()
+
+    def memoria_da_sessao(self, sessao: Optional[str] = None) -> GerenciadorMemoria:
+        """Memória de conversa de uma sessão do chat (sem sessão, a memória padrão)"""
+        if sessao is None:
+            return self.gerenciador_memoria
+        with self._lock_memorias:
+            if sessao not in self._memorias_sessao:
+                self._memorias_sessao[sessao] = GerenciadorMemoria()
+            return self._memorias_sessao[sessao]
+
+    def obter_estatisticas_cache(self) -> Dict:
+        """Estatísticas dos caches de respostas e de embeddings"""
+        return {
+            'respostas': self.cache_respostas.obter_estatisticas(),
+            'embeddings': self._cache_embeddings.obter_estatisticas()
+        }
+
+    def _calcular_peso_temporal(self, data_documento: Optional[str] = None) -> float:
+        """Calcula o peso temporal de um documento (prioriza documentos recentes)"""
+        return self.peso_temporal.peso(data_documento)
+    
     def calcular_similaridade_com_peso_temporal(self, embedding1: List[float], embedding2: List[float], 
                                                data_documento: Optional[str] = None) -> float:
         """Calcula similaridade com peso temporal para priorizar documentos recentes"""
         # Similaridade cosseno básica
-        embedding1_np = np.array(embedding1)
-        embedding2_np = np.array(embedding2)
+        embedding1_np = np.asarray(embedding1, dtype=np.float32)
+        embedding2_np = np.asarray(embedding2, dtype=np.float32)
         
-        similaridade = np.dot(embedding1_np, embedding2_np) / (
+        similaridade = float(np.dot(embedding1_np, embedding2_np) / (
             np.linalg.norm(embedding1_np) * np.linalg.norm(embedding2_np)
-        )
+        ))
         
         # Aplicar peso temporal se houver data
-        if data_documento:
-            try:
-                # Parse da data
-                if isinstance(data_documento, str):
-                    # Tentar diferentes formatos
-                    for fmt in ['%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d']:
-                        try:
-                            data_doc = datetime.strptime(data_documento.replace('+00:00', ''), fmt.replace('%z', ''))
-                            break
-                        except:
-                            continue
-                    else:
-                        return similaridade
-                else:
-                    data_doc = data_documento
-                
-                # Calcular diferença em dias
-                dias_diferenca = (datetime.now() - data_doc).days
-                
-                # Peso temporal (decai com o tempo)
-                # Documentos recentes (< 7 dias) recebem boost
-                if dias_diferenca < 7:
-                    peso_temporal = 1.2
-                elif dias_diferenca < 30:
-                    peso_temporal = 1.1
-                elif dias_diferenca < 90:
-                    peso_temporal = 1.0
-                else:
-                    peso_temporal = 0.9
-                
-                similaridade *= peso_temporal
-                
-            except Exception as e:
-                print(f"Erro ao calcular peso temporal: {e}")
+        similaridade *= self._calcular_peso_temporal(data_documento)
         
         return min(similaridade, 1.0)  # Garantir que não passe de 1.0
     
-    def _buscar_em_reunioes(self, pergunta: str) -> List[Dict]:
-        """Busca chunks relevantes nas reuniões"""
+    def _buscar_em_reunioes(self, pergunta: str, limite: int = 15, filtros: Dict = None,
+                            embedding_pergunta: Optional[List[float]] = None) -> List[Dict]:
+        """Busca chunks relevantes nas reuniões via RPC (top-k calculado no banco)"""
         try:
-            # Buscar todos os embeddings de reuniões
-            resultado = self.supabase.table('reunioes_embbed').select('*').execute()
+            # Gerar embedding da pergunta (se não foi compartilhado pelo coordenador)
+            if embedding_pergunta is None:
+                embedding_pergunta = self.gerar_embedding_pergunta(pergunta)
+            
+            # Prepara parâmetros da função SQL
+            params = {
+                'query_embedding': embedding_pergunta,
+                'limite': limite,
+                'meia_vida_dias': self.peso_temporal.meia_vida_dias,
+                'peso_maximo': self.peso_temporal.peso_maximo,
+                'peso_minimo': self.peso_temporal.peso_minimo
+            }
+            
+            if filtros:
+                if 'data_inicio' in filtros:
+                    params['data_inicio'] = str(filtros['data_inicio'])
+                if 'data_fim' in filtros:
+                    params['data_fim'] = str(filtros['data_fim'])
+                if 'responsavel' in filtros:
+                    params['responsavel_filtro'] = filtros['responsavel']
+            
+            # Usar função RPC do Supabase (índice ANN + peso temporal no SQL)
+            resultado = self.supabase.rpc('buscar_reunioes_similar', params).execute()
             
             if not resultado.data:
                 return []
             
+            resultados_formatados = []
+            for item in resultado.data:
+                chunk = dict(item)
+                chunk['similarity'] = item.get('similaridade_temporal', item.get('similaridade', 0))
+                chunk['fonte'] = 'reuniao'
+                resultados_formatados.append(chunk)
+            
+            return resultados_formatados
+            
+        except Exception as e:
+            print(f"Erro ao buscar em reuniões via RPC: {e}")
+            # Fallback: busca direta se RPC não existir
+            try:
+                return self._buscar_em_reunioes_direto(pergunta, limite)
+            except:
+                return []
+    
+    def _buscar_em_reunioes_direto(self, pergunta: str, limite: int = 15) -> List[Dict]:
+        """Busca direta nas reuniões usando o índice local em memória (fallback)"""
+        try:
             # Gerar embedding da pergunta
             embedding_pergunta = self.gerar_embedding_pergunta(pergunta)
             
-            # Calcular similaridades
-            resultados_com_score = []
-            for chunk in resultado.data:
-                try:
-                    # Obter embedding
-                    embedding_chunk = chunk.get('embedding', [])
-                    
-                    # Se for string JSON, converter para array
-                    if isinstance(embedding_chunk, str):
-                        try:
-                            embedding_chunk = json.loads(embedding_chunk)
-                        except json.JSONDecodeError:
-                            print(f"Erro ao decodificar embedding do chunk {chunk.get('id')}")
-                            continue
-                    
-                    # Verificar dimensões
-                    if not embedding_chunk or len(embedding_chunk) != 1536:
-                        continue
-                    
-                    # Calcular similaridade com peso temporal
-                    similaridade = self.calcular_similaridade_com_peso_temporal(
-                        embedding_pergunta,
-                        embedding_chunk,
-                        chunk.get('created_at')
-                    )
-                    
-                    chunk['similarity'] = similaridade
-                    chunk['fonte'] = 'reuniao'
-                    resultados_com_score.append(chunk)
-                    
-                except Exception as e:
-                    print(f"Erro ao processar chunk de reunião {chunk.get('id')}: {e}")
-                    continue
+            # Índice local com peso temporal vetorizado (datas já convertidas na indexação)
+            resultados = self.busca_local.buscar_similares(
+                embedding_pergunta,
+                threshold=0.0,
+                limit=limite,
+                peso_temporal=self.peso_temporal
+            )
             
-            return resultados_com_score
+            for chunk in resultados:
+                chunk['fonte'] = 'reuniao'
+            return resultados
             
         except Exception as e:
             print(f"Erro ao buscar em reuniões: {e}")
             return []
     
-    def _buscar_em_base_conhecimento(self, pergunta: str) -> List[Dict]:
+    def _buscar_em_base_conhecimento(self, pergunta: str,
+                                     embedding_pergunta: Optional[List[float]] = None) -> List[Dict]:
         """Busca chunks relevantes na base de conhecimento"""
         try:
             # Normalizar pergunta para melhor busca
             pergunta_normalizada = pergunta.replace('"', '').replace("'", "")
             
-            # Gerar embedding da pergunta
-            embedding_pergunta = self.gerar_embedding_pergunta(pergunta_normalizada)
+            # Gerar embedding da pergunta (se não foi compartilhado pelo coordenador)
+            if embedding_pergunta is None:
+                embedding_pergunta = self.gerar_embedding_pergunta(pergunta_normalizada)
             
             # Usar função RPC do Supabase para busca
             resultado = self.supabase.rpc('buscar_conhecimento_similar', {
@@ -269,24 +345,10 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
                 return []
             
             # Formatar resultados para compatibilidade
-            resultados_formatados = []
-            for item in resultado.data:
-                chunk_formatado = {
-                    'id': item.get('id'),
-                    'chunk_texto': item.get('conteudo'),
-                    'arquivo_origem': item.get('documento_origem'),
-                    'titulo': item.get('tipo_documento', '').title(),
-                    'responsavel': 'Sistema',
-                    'data_reuniao': 'N/A',
-                    'similarity': item.get('similaridade', 0),
-                    'fonte': 'documento',
-                    'tipo_documento': item.get('tipo_documento'),
-                    'categoria': item.get('categoria'),
-                    'tags': item.get('tags', [])
-                }
-                resultados_formatados.append(chunk_formatado)
-            
-            return resultados_formatados
+            return [
+                self._formatar_chunk_conhecimento(item, item.get('similaridade', 0))
+                for item in resultado.data
+            ]
             
         except Exception as e:
             print(f"Erro ao buscar na base de conhecimento: {e}")
@@ -296,65 +358,177 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
             except:
                 return []
     
-    def _buscar_base_conhecimento_direto(self, pergunta: str) -> List[Dict]:
-        """Busca direta na base de conhecimento (fallback)"""
+    def _buscar_base_conhecimento_direto(self, pergunta: str, limite: int = 15) -> List[Dict]:
+        """Busca direta na base de conhecimento usando o índice local em memória (fallback)"""
         try:
-            # Buscar todos os registros
-            resultado = self.supabase.table('base_conhecimento').select('*').eq('ativo', True).execute()
-            
-            if not resultado.data:
-                return []
-            
             # Gerar embedding da pergunta
             embedding_pergunta = self.gerar_embedding_pergunta(pergunta)
             
-            resultados_com_score = []
-            for doc in resultado.data:
-                try:
-                    # Obter embedding
-                    embedding_doc = doc.get('embedding', [])
-                    
-                    # Se for string JSON, converter
-                    if isinstance(embedding_doc, str):
-                        embedding_doc = json.loads(embedding_doc)
-                    
-                    # Verificar dimensões
-                    if not embedding_doc or len(embedding_doc) != 1536:
-                        continue
-                    
-                    # Calcular similaridade
-                    similaridade = self.calcular_similaridade_com_peso_temporal(
-                        embedding_pergunta,
-                        embedding_doc,
-                        doc.get('data_processamento')
-                    )
-                    
-                    # Formatar resultado
-                    chunk_formatado = {
-                        'id': doc.get('id'),
-                        'chunk_texto': doc.get('conteudo'),
-                        'arquivo_origem': doc.get('documento_origem'),
-                        'titulo': doc.get('tipo_documento', '').title(),
-                        'responsavel': 'Sistema',
-                        'data_reuniao': 'N/A',
-                        'similarity': similaridade,
-                        'fonte': 'documento',
-                        'tipo_documento': doc.get('tipo_documento'),
-                        'categoria': doc.get('categoria'),
-                        'tags': doc.get('tags', [])
-                    }
-                    resultados_com_score.append(chunk_formatado)
-                    
-                except Exception as e:
-                    print(f"Erro ao processar documento {doc.get('id')}: {e}")
-                    continue
+            # Índice local com peso temporal vetorizado (datas já convertidas na indexação)
+            resultados = self.busca_local_conhecimento.buscar_similares(
+                embedding_pergunta,
+                threshold=0.0,
+                limit=limite,
+                peso_temporal=self.peso_temporal
+            )
             
-            return resultados_com_score
+            return [self._formatar_chunk_conhecimento(doc, doc['similarity']) for doc in resultados]
             
         except Exception as e:
             print(f"Erro na busca direta: {e}")
             return []
     
+    def _formatar_chunk_conhecimento(self, item: Dict, similaridade: float) -> Dict:
+        """Formata um registro da base de conhecimento no formato dos chunks de reunião"""
+        return {
+            'id': item.get('id'),
+            'chunk_texto': item.get('conteudo'),
+            'arquivo_origem': item.get('documento_origem'),
+            'titulo': (item.get('tipo_documento') or '').title(),
+            'responsavel': 'Sistema',
+            'data_reuniao': 'N/A',
+            'similarity': similaridade,
+            'fonte': 'documento',
+            'tipo_documento': item.get('tipo_documento'),
+            'categoria': item.get('categoria'),
+            'tags': item.get('tags', [])
+        }
+    
+    def _buscar_em_base_conhecimento_multi(self, consultas: List[str], limite: int = 15) -> List[List[Dict]]:
+        """
+        Busca várias consultas na base de conhecimento de uma vez:
+        um único pedido de embeddings e uma única RPC (ou produto matricial local)
+        
+        Returns:
+            Uma lista ranqueada de resultados por consulta
+        """
+        if not consultas:
+            return []
+        
+        try:
+            embeddings = self.gerar_embeddings_perguntas(consultas)
+        except Exception as e:
+            print(f"Erro ao gerar embeddings das consultas: {e}")
+            return [[] for _ in consultas]
+        
+        try:
+            resultado = self.supabase.rpc('buscar_conhecimento_similar_multi', {
+                'query_embeddings': embeddings,
+                'limite': limite
+            }).execute()
+            
+            listas = [[] for _ in consultas]
+            for item in resultado.data or []:
+                indice = item.get('consulta_indice', 0)
+                if 0 <= indice < len(listas):
+                    listas[indice].append(
+                        self._formatar_chunk_conhecimento(item, item.get('similaridade', 0))
+                    )
+            return listas
+            
+        except Exception as e:
+            print(f"Erro na busca múltipla via RPC: {e}")
+            # Fallback: produto matricial no índice local
+            try:
+                listas_locais = self.busca_local_conhecimento.buscar_similares_multi(
+                    embeddings, threshold=0.0, limit=limite
+                )
+                return [
+                    [self._formatar_chunk_conhecimento(doc, doc['similarity']) for doc in lista]
+                    for lista in listas_locais
+                ]
+            except Exception as e:
+                print(f"Erro na busca múltipla local: {e}")
+                return [[] for _ in consultas]
+    
+    def _buscar_texto_reunioes(self, pergunta: str, limite: int = 15) -> List[Dict]:
+        """Busca lexical nas reuniões (full-text no banco; BM25 local como fallback)"""
+        try:
+            resultado = self.supabase.rpc('buscar_reunioes_texto', {
+                'consulta': pergunta,
+                'limite': limite
+            }).execute()
+            resultados = [dict(item) for item in resultado.data or []]
+        except Exception as e:
+            print(f"Erro na busca lexical em reuniões via RPC: {e}")
+            try:
+                resultados = self.busca_local.buscar_texto(pergunta, limite)
+            except Exception:
+                return []
+        
+        for chunk in resultados:
+            chunk['fonte'] = 'reuniao'
+        return resultados
+    
+    def _buscar_texto_conhecimento(self, pergunta: str, limite: int = 15) -> List[Dict]:
+        """Busca lexical na base de conhecimento (full-text no banco; BM25 local como fallback)"""
+        try:
+            resultado = self.supabase.rpc('buscar_conhecimento_texto', {
+                'consulta': pergunta,
+                'limite': limite
+            }).execute()
+            itens = resultado.data or []
+        except Exception as e:
+            print(f"Erro na busca lexical na base de conhecimento via RPC: {e}")
+            try:
+                itens = self.busca_local_conhecimento.buscar_texto(pergunta, limite)
+            except Exception:
+                return []
+        
+        return [
+            {**self._formatar_chunk_conhecimento(item, 0.0), 'relevancia': item.get('relevancia', 0)}
+            for item in itens
+        ]
+    
+    def _fundir_lexico(self, vetoriais: List[Dict], lexicais: List[Dict]) -> List[Dict]:
+        """
+        Funde os resultados vetoriais de uma fonte com os da busca lexical
+        
+        A relevância lexical é normalizada pela maior da lista (0 a 1) e somada à
+        similaridade: max(sim, (1 - peso) * sim + peso * lexical), então um termo
+        exato só aumenta o score. Chunks achados apenas pela busca lexical recebem
+        como similaridade a menor da lista vetorial (ficaram fora do top-k dela).
+        """
+        if not lexicais:
+            return vetoriais
+        
+        maior = max(r.get('relevancia', 0) for r in lexicais) or 1.0
+        piso = min((r['similarity'] for r in vetoriais), default=0.0)
+        peso = self.peso_busca_lexica
+        
+        fundidos = {r.get('id', r.get('arquivo_origem', '')): dict(r) for r in vetoriais}
+        for resultado in lexicais:
+            chave = resultado.get('id', resultado.get('arquivo_origem', ''))
+            if chave not in fundidos:
+                fundidos[chave] = {**resultado, 'similarity': piso}
+            
+            lexical = resultado.get('relevancia', 0) / maior
+            similaridade = fundidos[chave]['similarity']
+            fundidos[chave]['relevancia_lexica'] = round(lexical, 4)
+            fundidos[chave]['similarity'] = min(
+                max(similaridade, (1 - peso) * similaridade + peso * lexical), 1.0
+            )
+        
+        return sorted(fundidos.values(), key=lambda x: x['similarity'], reverse=True)
+    
+    def _fundir_rrf(self, listas: List[List[Dict]], k: int = 60) -> List[Dict]:
+        """
+        Funde listas ranqueadas com Reciprocal Rank Fusion
+        
+        Cada chunk recebe sum(1 / (k + posição)); a similaridade mantida é a maior
+        """
+        fundidos = {}
+        for lista in listas:
+            for posicao, resultado in enumerate(lista, start=1):
+                chave = resultado.get('id', resultado.get('arquivo_origem', ''))
+                if chave not in fundidos:
+                    fundidos[chave] = {**resultado, 'rrf_score': 0.0}
+                elif resultado.get('similarity', 0) > fundidos[chave].get('similarity', 0):
+                    fundidos[chave].update({**resultado, 'rrf_score': fundidos[chave]['rrf_score']})
+                fundidos[chave]['rrf_score'] += 1.0 / (k + posicao)
+        
+        return sorted(fundidos.values(), key=lambda x: x['rrf_score'], reverse=True)
+    
     def _diversificar_resultados(self, resultados: List[Dict], num_resultados: int) -> List[Dict]:
         """Diversifica resultados para incluir diferentes fontes"""
         resultados_finais = []
@@ -382,25 +556,119 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
         """Gera embedding para a pergunta do usuário"""
         try:
             # Normalizar pergunta removendo aspas e variações
-            pergunta_normalizada = pergunta.replace('"', '').replace("'", "")
+            pergunta_normalizada = CacheEmbeddings.normalizar_texto(pergunta)
+            
+            # Reaproveitar embedding já calculado
+            embedding = self._cache_embeddings.obter(self.embedding_model, pergunta_normalizada)
+            if embedding is not None:
+                return embedding
             
             response = self.client.embeddings.create(
-                model="text-embedding-ada-002",
+                model=self.embedding_model,
                 input=pergunta_normalizada
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            self._cache_embeddings.guardar(self.embedding_model, pergunta_normalizada, embedding)
+            return embedding
         except Exception as e:
             print(f"Erro ao gerar embedding da pergunta: {e}")
             raise
     
-    def buscar_chunks_relevantes(self, pergunta: str, num_resultados: int = 5) -> List[Dict]:
+    def gerar_embeddings_perguntas(self, perguntas: List[str]) -> List[List[float]]:
+        """Gera embeddings para várias consultas em um único pedido (usa o cache)"""
+        normalizadas = [CacheEmbeddings.normalizar_texto(p) for p in perguntas]
+        embeddings: List[Optional[List[float]]] = [
+            self._cache_embeddings.obter(self.embedding_model, texto) for texto in normalizadas
+        ]
+        
+        # Apenas os textos fora do cache vão para a API (sem repetidos)
+        pendentes = list(dict.fromkeys(
+            texto for texto, emb in zip(normalizadas, embeddings) if emb is None
+        ))
+        
+        if pendentes:
+            try:
+                response = self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=pendentes
+                )
+            except Exception as e:
+                print(f"Erro ao gerar embeddings em lote: {e}")
+                raise
+            
+            gerados = {}
+            for texto, item in zip(pendentes, sorted(response.data, key=lambda d: d.index)):
+                gerados[texto] = item.embedding
+                self._cache_embeddings.guardar(self.embedding_model, texto, item.embedding)
+            
+            embeddings = [
+                emb if emb is not None else gerados[texto]
+                for texto, emb in zip(normalizadas, embeddings)
+            ]
+        
+        return embeddings
+    
+    def _buscar_fontes_em_paralelo(self, pergunta: str) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+        """
+        Busca em reuniões e na base de conhecimento ao mesmo tempo
+        
+        A busca lexical começa enquanto o embedding da pergunta é gerado; o
+        embedding é gerado uma vez e compartilhado pelas buscas vetoriais. Cada
+        fonte tem seu próprio timeout; se uma demorar, retorna o que as outras
+        encontraram.
+        
+        Returns:
+            (reunioes_vetorial, conhecimento_vetorial, reunioes_lexical, conhecimento_lexical)
+        """
+        futuros = {
+            ('reuniao', 'lexical'): self._executor_busca.submit(self._buscar_texto_reunioes, pergunta),
+            ('documento', 'lexical'): self._executor_busca.submit(self._buscar_texto_conhecimento, pergunta)
+        }
+        
+        try:
+            embedding_pergunta = self.gerar_embedding_pergunta(pergunta)
+        except Exception:
+            # Sem embedding não há busca semântica possível (a lexical continua)
+            embedding_pergunta = None
+        
+        inicio = time.monotonic()
+        if embedding_pergunta is not None:
+            futuros[('reuniao', 'vetorial')] = self._executor_busca.submit(
+                self._buscar_em_reunioes, pergunta, embedding_pergunta=embedding_pergunta
+            )
+            futuros[('documento', 'vetorial')] = self._executor_busca.submit(
+                self._buscar_em_base_conhecimento, pergunta, embedding_pergunta=embedding_pergunta
+            )
+        
+        resultados = {}
+        for (fonte, tipo), futuro in futuros.items():
+            restante = max(0.0, inicio + self.timeout_fontes[fonte] - time.monotonic())
+            try:
+                resultados[(fonte, tipo)] = futuro.result(timeout=restante)
+            except FuturesTimeoutError:
+                print(f"⚠️  Busca {tipo} em '{fonte}' excedeu {self.timeout_fontes[fonte]:.1f}s; usando resultados parciais")
+                resultados[(fonte, tipo)] = []
+            except Exception as e:
+                print(f"Erro na busca {tipo} em '{fonte}': {e}")
+                resultados[(fonte, tipo)] = []
+        
+        print(f"⏱️  Busca paralela concluída em {time.monotonic() - inicio:.2f}s")
+        return (
+            resultados.get(('reuniao', 'vetorial'), []),
+            resultados.get(('documento', 'vetorial'), []),
+            resultados[('reuniao', 'lexical')],
+            resultados[('documento', 'lexical')]
+        )
+    
+    def buscar_chunks_relevantes(self, pergunta: str, num_resultados: int = 5,
+                                 sinais: Optional[SinaisPergunta] = None) -> List[Dict]:
         """Busca chunks relevantes em reuniões e base de conhecimento"""
         try:
             # Detectar contexto temporal
-            contexto_temporal = self.detectar_busca_temporal(pergunta)
+            sinais = sinais or self.clarificador.analisar(pergunta)
             
             # Se busca a última reunião, retornar diretamente
-            if contexto_temporal['busca_recente'] and 'reunião' in pergunta.lower():
+            if sinais.busca_recente and sinais.menciona_reuniao:
                 reuniao_recente = self.buscar_reuniao_mais_recente()
                 if reuniao_recente:
                     return [{
@@ -409,33 +677,48 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
                         'fonte': 'reuniao'
                     }]
             
-            # Buscar em ambas as fontes
-            resultados_reunioes = self._buscar_em_reunioes(pergunta)
-            resultados_conhecimento = self._buscar_em_base_conhecimento(pergunta)
+            # Buscar em ambas as fontes (vetorial e lexical ao mesmo tempo)
+            (resultados_reunioes, resultados_conhecimento,
+             lexicais_reunioes, lexicais_conhecimento) = self._buscar_fontes_em_paralelo(pergunta)
+            
+            # Fundir a busca lexical (nomes, siglas, números) com a vetorial de cada fonte
+            resultados_reunioes = self._fundir_lexico(resultados_reunioes, lexicais_reunioes)
+            resultados_conhecimento = self._fundir_lexico(resultados_conhecimento, lexicais_conhecimento)
             
             # Combinar resultados
             todos_resultados = resultados_reunioes + resultados_conhecimento
             
-            # Se não encontrou resultados muito relevantes, tentar busca com termos individuais
-            if not todos_resultados or (todos_resultados and max(r['similarity'] for r in todos_resultados) < 0.7):
-                # Quebrar pergunta em termos
-                termos = pergunta.replace('"', '').replace("'", "").split()
-                for termo in termos:
-                    if len(termo) > 3:  # Ignorar termos muito curtos
-                        mais_resultados = self._buscar_em_base_conhecimento(termo)
-                        todos_resultados.extend(mais_resultados)
-            
-            # Remover duplicatas mantendo maior similaridade
-            resultados_unicos = {}
-            for r in todos_resultados:
-                chave = r.get('id', r.get('arquivo_origem', ''))
-                if chave not in resultados_unicos or r['similarity'] > resultados_unicos[chave]['similarity']:
-                    resultados_unicos[chave] = r
+            # Se nenhum termo bateu e a similaridade é baixa, tentar busca com termos individuais
+            sem_termos_exatos = not (lexicais_reunioes or lexicais_conhecimento)
+            fundido_por_rrf = False
+            if sem_termos_exatos and (not todos_resultados or max(r['similarity'] for r in todos_resultados) < 0.7):
+                # Quebrar pergunta em termos (ignorar termos muito curtos)
+                termos = [t for t in pergunta.replace('"', '').replace("'", "").split() if len(t) > 3]
+                if termos:
+                    # Todos os termos em um único lote, fundidos por RRF com a busca original
+                    listas_termos = self._buscar_em_base_conhecimento_multi(termos)
+                    resultados_conhecimento = self._fundir_rrf([resultados_conhecimento] + listas_termos)[:15]
+                    fundido_por_rrf = True
             
-            todos_resultados = list(resultados_unicos.values())
-            
-            # Ordenar todos os resultados por similaridade
-            todos_resultados.sort(key=lambda x: x['similarity'], reverse=True)
+            if fundido_por_rrf:
+                # Documentos mantêm a ordem RRF (já sem duplicatas); cada um ocupa,
+                # na intercalação com as reuniões, a k-ésima maior similaridade dos documentos
+                posicoes = sorted((r['similarity'] for r in resultados_conhecimento), reverse=True)
+                ordem = {id(r): posicao for r, posicao in zip(resultados_conhecimento, posicoes)}
+                todos_resultados = resultados_reunioes + resultados_conhecimento
+                todos_resultados.sort(key=lambda x: ordem.get(id(x), x['similarity']), reverse=True)
+            else:
+                # Remover duplicatas mantendo maior similaridade
+                resultados_unicos = {}
+                for r in todos_resultados:
+                    chave = r.get('id', r.get('arquivo_origem', ''))
+                    if chave not in resultados_unicos or r['similarity'] > resultados_unicos[chave]['similarity']:
+                        resultados_unicos[chave] = r
+                
+                todos_resultados = list(resultados_unicos.values())
+                
+                # Ordenar todos os resultados por similaridade
+                todos_resultados.sort(key=lambda x: x['similarity'], reverse=True)
             
             # Filtrar resultados com similaridade muito baixa
             resultados_relevantes = [r for r in todos_resultados if r.get('similarity', 0) > 0.3]
@@ -453,54 +736,22 @@ PRINCÍPIO: Menos é mais. Responda exatamente o que foi perguntado."""
     
     def _e_pergunta_ambigua(self, pergunta: str) -> bool:
         """Detecta perguntas muito vagas ou ambíguas"""
-        termos_ambiguos = [
-            'isso', 'aquilo', 'ele', 'ela', 'eles',
-            'o que aconteceu', 'me explique', 'como assim',
-            'o que foi', 'qual foi', 'me fale sobre'
-        ]
-        
-        pergunta_limpa = pergunta.lower().strip()
-        
-        # Se muito curta E contém termo ambíguo
-        if len(pergunta_limpa.split()) <= 4:
-            for termo in termos_ambiguos:
-                if termo in pergunta_limpa:
-                    return True
-        return False
+        return self.clarificador.analisar(pergunta).pergunta_ambigua
     
     def _e_pergunta_generica(self, pergunta: str) -> bool:
         """Detecta perguntas conceituais/genéricas"""
-        termos_genericos = [
-            'como melhorar', 'o que é', 'qual a importância',
-            'melhores práticas', 'dicas para', 'estratégias de',
-            'o que você acha', 'sua opinião sobre'
-        ]
-        
-        pergunta_lower = pergunta.lower()
-        for termo in termos_genericos:
-            if termo in pergunta_lower:
-                return True
-        return False
+        return self.clarificador.analisar(pergunta).pergunta_generica
     
     def _e_pergunta_sobre_reuniao_especifica(self, pergunta: str) -> tuple[bool, str]:
         """Detecta perguntas genéricas sobre reuniões específicas"""
-        import re
-        
         pergunta_lower = pergunta.lower()
         
-        # Padrões comuns
-        padroes_reuniao = [
-            r'me (?:fale|conte|diga) sobre a reuni[ãa]o (?:de |do |da )?(.+)',
-            r'o que (?:teve|houve|aconteceu) na reuni[ãa]o (?:de |do |da )?(.+)',
-            r'(?:sobre|qual foi) a reuni[ãa]o (?:de |do |da )?(.+)',
-        ]
-        
         # Se já pede algo específico, não precisa contexto
-        if any(termo in pergunta_lower for termo in ['resumo', 'decisões', 'participantes']):
+        if any(termo in pergunta_lower for termo in TERMOS_PEDIDO_ESPECIFICO):
             return False, ""
         
-        for padrao in padroes_reuniao:
-            match = re.search(padrao, pergunta_lower)
+        for padrao in PADROES_REUNIAO_ESPECIFICA:
+            match = padrao.search(pergunta_lower)
             if match and match.groups():
                 return True, match.group(1).strip()
         
@@ -521,28 +772,7 @@ Especifique sua necessidade para uma resposta mais precisa."""
     
     def _e_pedido_ajuda_vago(self, pergunta: str) -> bool:
         """Detecta pedidos de ajuda genéricos sem especificar o problema"""
-        pergunta_lower = pergunta.lower()
-        
-        # Padrões de pedido de ajuda vago
-        padroes_vagos = [
-            r'(?:pode|poderia|consegue) me ajudar',
-            r'(?:to|tô|estou) com (?:um |)problema',
-            r'preciso de (?:ajuda|auxílio|socorro)',
-            r'(?:tem|teria) como (?:me |)ajudar',
-            r'(?:ajuda|socorro|help)(?:\s|$)',
-            r'(?:não sei|nao sei) o que fazer',
-            r'(?:tá|está) difícil'
-        ]
-        
-        # Verifica se é pedido vago (sem detalhes específicos)
-        import re
-        for padrao in padroes_vagos:
-            if re.search(padrao, pergunta_lower):
-                # Verifica se a mensagem tem menos de 10 palavras (muito curta)
-                if len(pergunta.split()) < 10:
-                    return True
-        
-        return False
+        return self.clarificador.analisar(pergunta).pedido_ajuda_vago
     
     def _gerar_resposta_ajuda_concisa(self) -> str:
         """Gera resposta concisa para pedidos de ajuda vagos"""
@@ -558,44 +788,83 @@ Especifique sua necessidade para uma resposta mais precisa."""
         import random
         return random.choice(respostas_possiveis)
     
-    def processar_pergunta(self, pergunta: str) -> str:
+    def processar_pergunta(self, pergunta: str, sessao: Optional[str] = None) -> str:
         """Processa uma pergunta e retorna a resposta"""
+        return "".join(self.processar_pergunta_stream(pergunta, sessao))
+    
+    def processar_pergunta_stream(self, pergunta: str, sessao: Optional[str] = None) -> Iterator[str]:
+        """
+        Processa uma pergunta e gera a resposta em trechos, à medida que o modelo escreve
+        
+        Respostas prontas (clarificação, cache, sem resultados) saem num único
+        trecho. A concatenação dos trechos é a resposta registrada na memória
+        da sessão (sem sessão, na memória padrão do agente).
+        """
+        memoria = self.memoria_da_sessao(sessao)
+        resposta, geracao = self._preparar_resposta(pergunta, memoria)
+        if geracao is None:
+            yield resposta
+            return
+        
+        partes = []
+        falhou = False
+        try:
+            for trecho in self._gerar_resposta_stream(
+                    pergunta, geracao['contexto'], geracao['contexto_memoria']):
+                partes.append(trecho)
+                yield trecho
+        except Exception as e:
+            falhou = True
+            if partes:
+                print(f"⚠️  Resposta interrompida: {e}")
+            else:
+                partes.append(f"Erro ao processar resposta: {str(e)}")
+                yield partes[0]
+        
+        self._concluir_resposta(pergunta, "".join(partes), geracao, memoria, guardar_cache=not falhou)
+    
+    def _preparar_resposta(self, pergunta: str, memoria: GerenciadorMemoria) -> Tuple[str, Optional[Dict]]:
+        """
+        Faz as verificações e a busca que antecedem a geração da resposta
+        
+        Returns:
+            (resposta pronta, None) ou ("", dados para gerar a resposta com o modelo)
+        """
         print(f"Processando pergunta: {pergunta}")
         
+        # Uma única análise da pergunta alimenta todas as verificações abaixo
+        sinais = self.clarificador.analisar(pergunta)
+        
         # Primeiro, verificar se a pergunta precisa clarificação
-        precisa_clarificacao, mensagem_clarificacao = self.clarificador.processar_pergunta(pergunta)
+        precisa_clarificacao, mensagem_clarificacao = self.clarificador.processar_pergunta(pergunta, sinais)
         
         if precisa_clarificacao:
             # Registrar na memória e retornar mensagem de clarificação
-            self.gerenciador_memoria.processar_interacao(pergunta, mensagem_clarificacao)
-            return mensagem_clarificacao
+            memoria.processar_interacao(pergunta, mensagem_clarificacao)
+            return mensagem_clarificacao, None
         
         # Verificar se é pergunta muito curta sem contexto (1-2 caracteres)
         if len(pergunta.strip()) <= 2 and pergunta.strip() not in ['ok', 'tá']:
             resposta = "Não entendi. Pode elaborar sua pergunta?"
-            self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-            return resposta
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
         # Verificar expressões de confusão ou reação (apenas se for muito curta)
-        if len(pergunta.split()) <= 3:
-            expressoes_confusao = ['wtf', 'ue', 'uai', 'ué', 'mas eu nem', 
-                                  'não perguntei', 'nao perguntei', 'como assim']
-            for expr in expressoes_confusao:
-                if expr in pergunta_lower:
-                    resposta = "Desculpe se houve alguma confusão. Como posso ajudar?"
-                    self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-                    return resposta
+        if sinais.expressao_confusao:
+            resposta = "Desculpe se houve alguma confusão. Como posso ajudar?"
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
         # NOVO: Verificar pedidos de ajuda vagos ANTES de outras verificações
-        if self._e_pedido_ajuda_vago(pergunta):
+        if sinais.pedido_ajuda_vago:
             resposta = self._gerar_resposta_ajuda_concisa()
-            self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-            return resposta
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
         # NOVO: Verificar ambiguidade primeiro
-        if self._e_pergunta_ambigua(pergunta):
+        if sinais.pergunta_ambigua:
             # Verificar se há contexto anterior na memória
-            contexto_anterior = self.gerenciador_memoria.obter_contexto()
+            contexto_anterior = memoria.obter_contexto()
             
             if not contexto_anterior or len(contexto_anterior) < 50:
                 resposta = "Sua pergunta está um pouco vaga. Você poderia fornecer mais detalhes? Por exemplo:\n"
@@ -603,41 +872,58 @@ Especifique sua necessidade para uma resposta mais precisa."""
                 resposta += "- Qual assunto ou tema você está procurando?\n"
                 resposta += "- Em que período isso ocorreu?"
                 
-                self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-                return resposta
+                memoria.processar_interacao(pergunta, resposta)
+                return resposta, None
         
         # NOVO: Verificar se é pergunta sobre reunião específica mas genérica
         e_sobre_reuniao, nome_reuniao = self._e_pergunta_sobre_reuniao_especifica(pergunta)
         if e_sobre_reuniao:
             # Fazer busca rápida para confirmar que a reunião existe
-            chunks_teste = self.buscar_chunks_relevantes(pergunta, num_resultados=1)
+            chunks_teste = self.buscar_chunks_relevantes(pergunta, num_resultados=1, sinais=sinais)
             
             if chunks_teste:
                 # Reunião encontrada - solicitar contexto
                 resposta = self._gerar_opcoes_contexto_reuniao(nome_reuniao)
-                self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-                return resposta
+                memoria.processar_interacao(pergunta, resposta)
+                return resposta, None
+        
+        # Cache de respostas: a mesma pergunta, no mesmo ponto da conversa,
+        # responde sem busca nem LLM (perguntas ambíguas não passam pelo cache)
+        versao_dados = None if sinais.pergunta_ambigua else self._versao_dados()
+        contexto_memoria = memoria.obter_contexto()
+        chave_texto = CacheRespostas.chave_texto(pergunta, contexto_memoria)
+        embedding_pergunta = None
+        if versao_dados is not None:
+            em_cache = self.cache_respostas.obter_por_texto(chave_texto, versao_dados)
+            if em_cache:
+                print("⚡ Resposta do cache (pergunta repetida)")
+                return self._registrar_resposta_cache(pergunta, em_cache, memoria), None
+            
+            try:
+                embedding_pergunta = self.gerar_embedding_pergunta(pergunta)
+            except Exception:
+                embedding_pergunta = None
         
         # Verificar se é pergunta genérica e ajustar número de chunks
-        if self._e_pergunta_generica(pergunta):
+        if sinais.pergunta_generica:
             # Buscar apenas 2-3 chunks para contexto opcional
-            chunks_relevantes = self.buscar_chunks_relevantes(pergunta, num_resultados=2)
+            chunks_relevantes = self.buscar_chunks_relevantes(pergunta, num_resultados=2, sinais=sinais)
         else:
             # Busca normal com 5 chunks
-            chunks_relevantes = self.buscar_chunks_relevantes(pergunta, num_resultados=5)
+            chunks_relevantes = self.buscar_chunks_relevantes(pergunta, num_resultados=5, sinais=sinais)
         
         if not chunks_relevantes:
             # Resposta concisa quando não há informação
             resposta = "Não encontrei informações sobre isso nos registros disponíveis."
             # Registrar na memória
-            self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-            return resposta
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
         # Verificar se realmente há contexto relevante
         if not chunks_relevantes or all(chunk.get('similarity', 0) < 0.4 for chunk in chunks_relevantes):
             resposta = "Não encontrei informações sobre isso nos registros disponíveis."
-            self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-            return resposta
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
         # Preparar contexto
         contexto = self._preparar_contexto(chunks_relevantes)
@@ -645,27 +931,64 @@ Especifique sua necessidade para uma resposta mais precisa."""
         # Se o contexto estiver vazio mesmo com chunks, evitar resposta
         if not contexto.strip():
             resposta = "Não encontrei informações relevantes sobre isso."
-            self.gerenciador_memoria.processar_interacao(pergunta, resposta)
-            return resposta
+            memoria.processar_interacao(pergunta, resposta)
+            return resposta, None
         
-        # Obter contexto da memória
-        contexto_memoria = self.gerenciador_memoria.obter_contexto()
+        # Pergunta parecida que recuperou os mesmos chunks: mesma resposta
+        ids_chunks = CacheRespostas.ids_chunks(chunks_relevantes)
+        if embedding_pergunta is not None:
+            em_cache = self.cache_respostas.obter_por_evidencias(
+                embedding_pergunta, ids_chunks, versao_dados, contexto_memoria
+            )
+            if em_cache:
+                print("⚡ Resposta do cache (mesmos chunks)")
+                return self._registrar_resposta_cache(pergunta, em_cache, memoria), None
         
-        # Gerar resposta com contexto completo
-        resposta = self._gerar_resposta(pergunta, contexto, contexto_memoria)
+        return "", {
+            'contexto': contexto,
+            'contexto_memoria': contexto_memoria,
+            'chunks': chunks_relevantes,
+            'ids_chunks': ids_chunks,
+            'embedding_pergunta': embedding_pergunta,
+            'versao_dados': versao_dados
+        }
+    
+    def _concluir_resposta(self, pergunta: str, resposta: str, geracao: Dict,
+                           memoria: GerenciadorMemoria, guardar_cache: bool = True):
+        """Guarda a resposta gerada no cache e a registra na memória"""
+        chunks_relevantes = geracao['chunks']
         
         # Extrair reuniões mencionadas
         reunioes_mencionadas = list(set([chunk.get('arquivo_origem', '') for chunk in chunks_relevantes[:3]]))
+        confianca = chunks_relevantes[0].get('similarity', 0) if chunks_relevantes else 0
+        
+        # Guardar no cache (erros e respostas interrompidas não são reaproveitados)
+        if guardar_cache and geracao['embedding_pergunta'] is not None:
+            self.cache_respostas.guardar(
+                pergunta, geracao['embedding_pergunta'], geracao['ids_chunks'], resposta,
+                geracao['versao_dados'],
+                extras={'reunioes_encontradas': reunioes_mencionadas, 'confidence_score': confianca},
+                contexto_conversa=geracao['contexto_memoria']
+            )
         
         # Registrar na memória
-        self.gerenciador_memoria.processar_interacao(
+        memoria.processar_interacao(
             pergunta, 
             resposta,
             reunioes_encontradas=reunioes_mencionadas,
-            confidence_score=chunks_relevantes[0].get('similarity', 0) if chunks_relevantes else 0
+            confidence_score=confianca
         )
-        
-        return resposta
+    
+    def _registrar_resposta_cache(self, pergunta: str, em_cache: Dict,
+                                  memoria: GerenciadorMemoria) -> str:
+        """Registra na memória uma resposta vinda do cache e a retorna"""
+        memoria.processar_interacao(
+            pergunta,
+            em_cache['resposta'],
+            reunioes_encontradas=em_cache.get('reunioes_encontradas'),
+            confidence_score=em_cache.get('confidence_score', 0)
+        )
+        return em_cache['resposta']
     
     def _preparar_contexto(self, chunks: List[Dict]) -> str:
         """Prepara o contexto dos chunks para o LLM de forma concisa"""
@@ -714,13 +1037,13 @@ Especifique sua necessidade para uma resposta mais precisa."""
         
         return contexto.strip()
     
-    def _gerar_resposta(self, pergunta: str, contexto: str, contexto_memoria: str = "") -> str:
-        """Gera resposta usando o contexto encontrado e histórico da conversa"""
+    def _montar_prompt(self, pergunta: str, contexto: str, contexto_memoria: str = "") -> Tuple[str, int]:
+        """Monta o prompt e o limite de tokens conforme o tipo de pergunta"""
         
-        # Detectar tipo de pergunta
-        e_simples = self._detectar_pergunta_simples(pergunta)
-        e_generica = self._e_pergunta_generica(pergunta)
-        contexto_temporal = self.detectar_busca_temporal(pergunta)
+        # Detectar tipo de pergunta (uma passada)
+        sinais = self.clarificador.analisar(pergunta)
+        e_simples = sinais.pergunta_simples
+        e_generica = sinais.pergunta_generica
         
         # Ajustar max_tokens baseado no tipo de pergunta
         max_tokens = 150 if e_simples else 400
@@ -736,7 +1059,7 @@ CONTEXTO DISPONÍVEL:
         else:
             # Para perguntas específicas, prompt mais focado
             instrucao_temporal = ""
-            if contexto_temporal['busca_recente']:
+            if sinais.busca_recente:
                 instrucao_temporal = "Use a primeira reunião (mais recente). "
             
             prompt = f"""{instrucao_temporal}Responda diretamente baseado no contexto.
@@ -748,58 +1071,51 @@ CONTEXTO:
 
 {pergunta}"""
         
+        return prompt, max_tokens
+    
+    def _gerar_resposta_stream(self, pergunta: str, contexto: str, contexto_memoria: str = "") -> Iterator[str]:
+        """
+        Gera a resposta em streaming, já sem as frases desnecessárias
+        
+        Erros da API são propagados para quem consome o fluxo.
+        """
+        prompt, max_tokens = self._montar_prompt(pergunta, contexto, contexto_memoria)
+        
+        inicio = time.monotonic()
+        response = self.client.chat.completions.create(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,  # Reduzir para respostas mais focadas
+            max_tokens=max_tokens,
+            stream=True
+        )
+        
+        def _tokens():
+            primeiro = True
+            for parte in response:
+                if not parte.choices:
+                    continue
+                token = parte.choices[0].delta.content
+                if token:
+                    if primeiro:
+                        print(f"⏱️  Primeiro token em {time.monotonic() - inicio:.2f}s")
+                        primeiro = False
+                    yield token
+        
+        # Limpar resposta de frases desnecessárias enquanto chega
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Reduzir para respostas mais focadas
-                max_tokens=max_tokens
-            )
-            
-            resposta = response.choices[0].message.content
-            
-            # Limpar resposta de frases desnecessárias
-            frases_remover = [
-                "Com base no contexto fornecido,",
-                "De acordo com as informações disponíveis,",
-                "Posso ajudar com mais alguma coisa?",
-                "Se precisar de mais informações,",
-                "Espero ter ajudado",
-                "Fico à disposição",
-                "Baseado no contexto,",
-                "Conforme o contexto,",
-                "Segundo as informações,",
-                "Como posso ajudar mais?",
-                "Algo mais que",
-                "Mais alguma coisa?",
-                "Há algo mais",
-                "Você perguntou sobre",
-                "Você questionou",
-                "Sua pergunta foi sobre",
-                "Em relação à sua pergunta",
-                "Sobre sua dúvida",
-                "Se desejar,",
-                "Se quiser,",
-                "Quer que eu",
-                "Gostaria que eu",
-                "Considerações importantes:",
-                "Consideração importante:",
-                "Pontos a considerar:",
-                "Vale destacar que",
-                "Vale lembrar que",
-                "Vale ressaltar que",
-                "É importante notar que"
-            ]
-            
-            for frase in frases_remover:
-                resposta = resposta.replace(frase, "").strip()
-            
-            # Remover linhas vazias extras
-            resposta = "\n".join(line for line in resposta.split("\n") if line.strip())
-            
-            return resposta
+            yield from limpar_fluxo(_tokens())
+        finally:
+            # Libera a conexão se quem consome parar antes do fim (pergunta cancelada)
+            if hasattr(response, 'close'):
+                response.close()
+    
+    def _gerar_resposta(self, pergunta: str, contexto: str, contexto_memoria: str = "") -> str:
+        """Gera resposta usando o contexto encontrado e histórico da conversa"""
+        try:
+            return "".join(self._gerar_resposta_stream(pergunta, contexto, contexto_memoria))
         except Exception as e:
-            return f"Erro ao processar resposta: {str(e)}"
\ No newline at end of file
+            return f"Erro ao processar resposta: {str(e)}"
@@ -4,29 +4,617 @@ Grava, fragmenta e transcreve áudio usando OpenAI Whisper
 """
 
 import os
+import re
+import json
 import wave
 import pyaudio
 import threading
 import time
+import bisect
+from collections import deque
 from pathlib import Path
-from typing import List, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Deque
 import math
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
-from openai import OpenAI
+import numpy as np
 from dotenv import load_dotenv
 
+try:
+    from .ingestao_paralela import executar_com_retry
+    from .clientes import RegistroClientes, obter_registro_clientes
+except ImportError:
+    from ingestao_paralela import executar_com_retry
+    from clientes import RegistroClientes, obter_registro_clientes
+
+# Codificador opcional (libsndfile) para FLAC/OGG; sem ele as partes ficam em WAV
+try:
+    import soundfile as sf
+    SOUNDFILE_DISPONIVEL = True
+except ImportError:
+    SOUNDFILE_DISPONIVEL = False
+
 load_dotenv()
 
+# Extensões aceitas como partes de áudio para transcrição
+EXTENSOES_AUDIO = ('.wav', '.flac', '.ogg')
+
+# Energia (dBFS) abaixo da qual um buffer é considerado silêncio
+LIMIAR_SILENCIO_DB = -45.0
+
+# Linha gravada na transcrição no lugar de uma parte que falhou
+_MARCADOR_ERRO = re.compile(r'\[Erro na transcrição d[ao] \w+ \d+\]')
+
+
+def marcador_erro_transcricao(rotulo: str, numero: int) -> str:
+    """Texto que ocupa o lugar de uma parte/segmento que não foi transcrito"""
+    return f"[Erro na transcrição {'da' if rotulo == 'parte' else 'do'} {rotulo} {numero}]"
+
+
+def remover_marcadores_erro(texto: str) -> str:
+    """Remove as linhas de partes que falharam (não devem ser ingeridas como conteúdo)"""
+    return "\n".join(
+        linha for linha in texto.split("\n") if not _MARCADOR_ERRO.fullmatch(linha.strip())
+    )
+
+
+def resolver_formato_compressao(formato: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Resolve o formato comprimido pedido para (formato, subtipo, extensão) do libsndfile
+    
+    Returns:
+        None se o formato for 'wav' ou não estiver disponível (usar WAV)
+    """
+    if not SOUNDFILE_DISPONIVEL:
+        return None
+    
+    formato = formato.lower()
+    formatos = sf.available_formats()
+    if formato == 'flac' and 'FLAC' in formatos:
+        return 'FLAC', 'PCM_16', '.flac'
+    if formato == 'ogg' and 'OGG' in formatos:
+        # Opus (libsndfile >= 1.0.29) comprime melhor voz; Vorbis como alternativa
+        subtipos = sf.available_subtypes('OGG')
+        subtipo = 'OPUS' if 'OPUS' in subtipos else 'VORBIS'
+        if subtipo in subtipos:
+            return 'OGG', subtipo, '.ogg'
+    return None
+
+
+def escrever_audio(caminho_sem_extensao: Path, dados: bytes, channels: int,
+                   sample_width: int, rate: int,
+                   formato: Optional[Tuple[str, str, str]] = None) -> Path:
+    """Grava um trecho PCM int16 no formato indicado (WAV se None)"""
+    if formato and sample_width == 2:
+        formato_sf, subtipo, extensao = formato
+        caminho = Path(f"{caminho_sem_extensao}{extensao}")
+        amostras = np.frombuffer(dados, dtype=np.int16).reshape(-1, channels)
+        sf.write(str(caminho), amostras, rate, format=formato_sf, subtype=subtipo)
+        return caminho
+    
+    caminho = Path(f"{caminho_sem_extensao}.wav")
+    with wave.open(str(caminho), 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(dados)
+    return caminho
+
+
+def duracao_arquivo_audio(caminho: Path) -> Optional[float]:
+    """Duração (s) de uma parte de áudio em disco; None se não for possível ler"""
+    try:
+        if caminho.suffix == '.wav':
+            with wave.open(str(caminho), 'rb') as wf:
+                return wf.getnframes() / wf.getframerate()
+        if SOUNDFILE_DISPONIVEL:
+            return float(sf.info(str(caminho)).duration)
+    except Exception:
+        pass
+    return None
+
+
+def ler_resposta_whisper(resposta) -> Tuple[str, List[Dict], Optional[float]]:
+    """
+    Texto, segmentos e duração de uma resposta verbose_json do Whisper
+    
+    Aceita o objeto da biblioteca, um dicionário ou texto puro (sem segmentos).
+    
+    Returns:
+        (texto, [{'inicio', 'fim', 'texto'}], duração do áudio ou None)
+    """
+    if isinstance(resposta, str):
+        return resposta, [], None
+    
+    def campo(objeto, nome):
+        return objeto.get(nome) if isinstance(objeto, dict) else getattr(objeto, nome, None)
+    
+    segmentos = [
+        {
+            'inicio': float(campo(segmento, 'start')),
+            'fim': float(campo(segmento, 'end')),
+            'texto': (campo(segmento, 'text') or '').strip()
+        }
+        for segmento in campo(resposta, 'segments') or []
+    ]
+    duracao = campo(resposta, 'duration')
+    return campo(resposta, 'text') or '', segmentos, float(duracao) if duracao is not None else None
+
+
+@dataclass
+class NivelAudio:
+    """Medição de um buffer de áudio"""
+    nivel: float  # Nível normalizado para a interface (0-1)
+    rms: float  # RMS em amplitude int16
+    pico: int  # Maior amplitude absoluta do buffer
+    clipping: bool  # Se alguma amostra atingiu o limite de saturação
+    energia_db: float  # Energia em dBFS (usada para detecção de voz)
+
+
+class MedidorNivel:
+    """
+    Mede nível, pico e energia dos buffers de áudio com NumPy
+    
+    A medição é feita em todo buffer (barata), mas a notificação da
+    interface é limitada à taxa de atualização da tela.
+    """
+    
+    def __init__(self, taxa_atualizacao_hz: float = 20.0, limiar_clipping: int = 32000):
+        self.intervalo_notificacao = 1.0 / taxa_atualizacao_hz
+        self.limiar_clipping = limiar_clipping
+        self._ultima_notificacao = 0.0
+        
+        # Estatísticas da gravação
+        self.buffers_medidos = 0
+        self.buffers_com_clipping = 0
+        
+    def medir(self, data: bytes) -> NivelAudio:
+        """Calcula RMS, pico, clipping e energia de um buffer int16"""
+        amostras = np.frombuffer(data, dtype=np.int16)
+        if amostras.size == 0:
+            return NivelAudio(0.0, 0.0, 0, False, -120.0)
+        
+        # float32 evita overflow ao elevar ao quadrado
+        amostras_f = amostras.astype(np.float32)
+        energia = float(np.dot(amostras_f, amostras_f) / amostras.size)
+        rms = math.sqrt(energia)
+        pico = int(np.max(np.abs(amostras_f)))
+        clipping = pico >= self.limiar_clipping
+        
+        self.buffers_medidos += 1
+        if clipping:
+            self.buffers_com_clipping += 1
+        
+        return NivelAudio(
+            nivel=min(1.0, rms / 32768.0 * 10),  # Normalizar para 0-1
+            rms=rms,
+            pico=pico,
+            clipping=clipping,
+            energia_db=10 * math.log10(energia / (32768.0 ** 2) + 1e-12)
+        )
+        
+    def deve_notificar(self) -> bool:
+        """Indica se já passou o intervalo mínimo desde a última notificação"""
+        agora = time.monotonic()
+        if agora - self._ultima_notificacao >= self.intervalo_notificacao:
+            self._ultima_notificacao = agora
+            return True
+        return False
+
+
+class GravadorPartesWav:
+    """
+    Escreve o áudio direto em arquivos WAV de no máximo `max_bytes`
+    
+    Cada buffer é gravado assim que chega; ao atingir o limite a parte atual
+    é fechada e a próxima (_partNNN.wav) é aberta. A memória fica constante.
+    """
+    
+    # Tamanho reservado para o cabeçalho WAV
+    TAMANHO_CABECALHO = 1024
+    
+    def __init__(self, base_path: Path, channels: int, sample_width: int, rate: int, max_bytes: int):
+        self.base_path = base_path
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.max_bytes = max_bytes
+        
+        # Bytes de áudio por quadro (todas as amostras de um instante)
+        self.bytes_por_quadro = channels * sample_width
+        
+        self.partes: List[Path] = []
+        self._arquivo_atual = None
+        self._bytes_parte_atual = 0
+        self.bytes_audio = 0  # PCM recebido (para comparar com o tamanho em disco)
+        
+    def _abrir_nova_parte(self):
+        """Fecha a parte atual (se houver) e abre a próxima"""
+        self._fechar_parte_atual()
+        
+        caminho = Path(f"{self.base_path}_part{len(self.partes):03d}.wav")
+        wf = wave.open(str(caminho), 'wb')
+        wf.setnchannels(self.channels)
+        wf.setsampwidth(self.sample_width)
+        wf.setframerate(self.rate)
+        
+        self._arquivo_atual = wf
+        self._bytes_parte_atual = 0
+        self.partes.append(caminho)
+        
+    def _fechar_parte_atual(self):
+        """Fecha a parte atual, atualizando o cabeçalho WAV"""
+        if self._arquivo_atual is None:
+            return
+        self._arquivo_atual.close()
+        self._arquivo_atual = None
+        caminho = self.partes[-1]
+        print(f"✅ Salvo: {caminho} ({os.path.getsize(caminho) / 1024 / 1024:.1f}MB)")
+        
+    def escrever(self, data: bytes):
+        """Grava um buffer, abrindo nova parte se o limite for atingido"""
+        limite = self.max_bytes - self.TAMANHO_CABECALHO
+        
+        while data:
+            # Nova parte quando não cabe nem mais um quadro inteiro
+            if self._arquivo_atual is None or self._bytes_parte_atual + self.bytes_por_quadro > limite:
+                self._abrir_nova_parte()
+            
+            # Quanto ainda cabe nesta parte (múltiplo do tamanho do quadro)
+            espaco = limite - self._bytes_parte_atual
+            espaco -= espaco % self.bytes_por_quadro
+            trecho, data = data[:espaco], data[espaco:]
+            
+            # writeframesraw não reescreve o cabeçalho a cada buffer
+            self._arquivo_atual.writeframesraw(trecho)
+            self._bytes_parte_atual += len(trecho)
+            self.bytes_audio += len(trecho)
+            
+    def fechar(self) -> List[Path]:
+        """Finaliza a gravação e retorna as partes geradas"""
+        self._fechar_parte_atual()
+        return self.partes
+
+
+class GravadorPartesComprimidas:
+    """
+    Escreve o áudio direto em partes comprimidas (FLAC ou OGG) via libsndfile
+    
+    O tamanho comprimido não é conhecido de antemão: a cada poucos segundos o
+    arquivo é descarregado e o tamanho em disco conferido. A margem reservada
+    é o pior caso (PCM sem compressão) de um intervalo de verificação.
+    """
+    
+    # Segundos de áudio entre verificações do tamanho em disco
+    INTERVALO_VERIFICACAO_S = 5.0
+    
+    def __init__(self, base_path: Path, channels: int, sample_width: int, rate: int,
+                 max_bytes: int, formato: Tuple[str, str, str]):
+        self.base_path = base_path
+        self.channels = channels
+        self.rate = rate
+        self.formato, self.subtipo, self.extensao = formato
+        
+        bytes_intervalo = int(rate * channels * sample_width * self.INTERVALO_VERIFICACAO_S)
+        self.bytes_intervalo = bytes_intervalo
+        self.limite = max_bytes - bytes_intervalo
+        
+        self.partes: List[Path] = []
+        self._arquivo_atual = None
+        self._bytes_desde_verificacao = 0
+        self.bytes_audio = 0
+        
+    def _abrir_nova_parte(self):
+        """Fecha a parte atual (se houver) e abre a próxima"""
+        self._fechar_parte_atual()
+        
+        caminho = Path(f"{self.base_path}_part{len(self.partes):03d}{self.extensao}")
+        self._arquivo_atual = sf.SoundFile(
+            str(caminho), mode='w', samplerate=self.rate, channels=self.channels,
+            format=self.formato, subtype=self.subtipo
+        )
+        self._bytes_desde_verificacao = 0
+        self.partes.append(caminho)
+        
+    def _fechar_parte_atual(self):
+        """Fecha a parte atual (finaliza o stream do codificador)"""
+        if self._arquivo_atual is None:
+            return
+        self._arquivo_atual.close()
+        self._arquivo_atual = None
+        caminho = self.partes[-1]
+        print(f"✅ Salvo: {caminho} ({os.path.getsize(caminho) / 1024 / 1024:.1f}MB)")
+        
+    def escrever(self, data: bytes):
+        """Codifica um buffer, abrindo nova parte se o limite for atingido"""
+        if self._arquivo_atual is None:
+            self._abrir_nova_parte()
+        
+        amostras = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+        self._arquivo_atual.write(amostras)
+        self._bytes_desde_verificacao += len(data)
+        self.bytes_audio += len(data)
+        
+        if self._bytes_desde_verificacao >= self.bytes_intervalo:
+            self._bytes_desde_verificacao = 0
+            self._arquivo_atual.flush()
+            if os.path.getsize(self.partes[-1]) >= self.limite:
+                self._fechar_parte_atual()
+            
+    def fechar(self) -> List[Path]:
+        """Finaliza a gravação e retorna as partes geradas"""
+        self._fechar_parte_atual()
+        return self.partes
+
+
+class RemovedorSilencio:
+    """
+    Comprime os silêncios longos antes da gravação e da transcrição
+    
+    De cada trecho de silêncio são mantidos só `margem_s` do início e do fim
+    (pausas naturais continuam audíveis); o meio é descartado sem ficar em
+    memória. Um mapa de tempo (segundos gravados -> segundos reais) permite
+    levar offsets da transcrição de volta ao horário da reunião.
+    """
+    
+    def __init__(self, bytes_por_segundo: int, limiar_silencio_db: float = LIMIAR_SILENCIO_DB,
+                 margem_s: float = 0.5):
+        self.bytes_por_segundo = bytes_por_segundo
+        self.limiar_silencio_db = limiar_silencio_db
+        self.margem = int(margem_s * bytes_por_segundo)
+        
+        self._bytes_silencio = 0  # Silêncio contínuo até agora
+        self._cauda = deque()  # Fim do silêncio atual: (buffer, energia_db)
+        self._bytes_cauda = 0
+        self._cortou = False
+        
+        self.bytes_entrada = 0
+        self.bytes_saida = 0
+        self.bytes_removidos = 0
+        
+        # Âncoras (segundos na saída, segundos na entrada) a cada corte
+        self._ancoras_saida: List[float] = [0.0]
+        self._ancoras_entrada: List[float] = [0.0]
+        
+    def processar(self, data: bytes, energia_db: float) -> List[Tuple[bytes, float]]:
+        """
+        Recebe um buffer e devolve os buffers (com energia) que devem seguir adiante
+        """
+        self.bytes_entrada += len(data)
+        
+        if energia_db < self.limiar_silencio_db:
+            silencio_anterior = self._bytes_silencio
+            self._bytes_silencio += len(data)
+            
+            # Início do silêncio: segue direto
+            if silencio_anterior < self.margem:
+                return self._emitir([(data, energia_db)])
+            
+            # Depois: só a cauda mais recente fica retida
+            self._cauda.append((data, energia_db))
+            self._bytes_cauda += len(data)
+            while self._bytes_cauda - len(self._cauda[0][0]) >= self.margem:
+                descartado, _ = self._cauda.popleft()
+                self._bytes_cauda -= len(descartado)
+                self.bytes_removidos += len(descartado)
+                self._cortou = True
+            return []
+        
+        # Voz: libera a cauda do silêncio e registra o corte no mapa de tempo
+        if self._cortou:
+            inicio_cauda = self.bytes_entrada - len(data) - self._bytes_cauda
+            self._ancoras_saida.append(self.bytes_saida / self.bytes_por_segundo)
+            self._ancoras_entrada.append(inicio_cauda / self.bytes_por_segundo)
+        
+        saida = list(self._cauda) + [(data, energia_db)]
+        self._cauda.clear()
+        self._bytes_cauda = 0
+        self._bytes_silencio = 0
+        self._cortou = False
+        return self._emitir(saida)
+        
+    def _emitir(self, buffers: List[Tuple[bytes, float]]) -> List[Tuple[bytes, float]]:
+        self.bytes_saida += sum(len(data) for data, _ in buffers)
+        return buffers
+        
+    def finalizar(self):
+        """Descarta o silêncio retido no fim da gravação"""
+        self.bytes_removidos += self._bytes_cauda
+        self._cauda.clear()
+        self._bytes_cauda = 0
+        
+    def mapear_tempo(self, segundos_gravados: float) -> float:
+        """Converte uma posição no áudio gravado para a posição real na reunião"""
+        i = bisect.bisect_right(self._ancoras_saida, segundos_gravados) - 1
+        return self._ancoras_entrada[i] + (segundos_gravados - self._ancoras_saida[i])
+        
+    def resumo(self) -> Dict[str, float]:
+        """Quanto foi removido (segundos, bytes PCM e proporção)"""
+        return {
+            'segundos_originais': round(self.bytes_entrada / self.bytes_por_segundo, 2),
+            'segundos_removidos': round(self.bytes_removidos / self.bytes_por_segundo, 2),
+            'bytes_removidos': self.bytes_removidos,
+            'proporcao_removida': self.bytes_removidos / max(self.bytes_entrada, 1)
+        }
+
+
+class SegmentadorVoz:
+    """
+    Corta o áudio capturado em segmentos nas pausas de fala
+    
+    Detecção de voz por energia: um buffer abaixo do limiar (dBFS) conta como
+    silêncio. O segmento é cortado quando há silêncio suficiente depois de um
+    tamanho mínimo, ou ao atingir o tamanho máximo. Segmentos sem nenhum
+    buffer de voz são descartados (evita alucinações do Whisper em silêncio).
+    """
+    
+    def __init__(self, rate: int, sample_width: int, channels: int,
+                 limiar_silencio_db: float = LIMIAR_SILENCIO_DB, silencio_minimo_s: float = 0.8,
+                 segmento_minimo_s: float = 15.0, segmento_maximo_s: float = 120.0):
+        self.bytes_por_segundo = rate * sample_width * channels
+        self.limiar_silencio_db = limiar_silencio_db
+        self.silencio_minimo_s = silencio_minimo_s
+        self.segmento_minimo_s = segmento_minimo_s
+        self.segmento_maximo_s = segmento_maximo_s
+        
+        self._buffers: List[bytes] = []
+        self._bytes = 0
+        self._bytes_silencio = 0  # Silêncio contínuo no fim do segmento
+        self._tem_voz = False
+        
+        # Posição (s) do último segmento cortado no áudio gravado; segmentos sem
+        # voz são descartados, então os enviados não são contíguos
+        self._bytes_anteriores = 0
+        self.inicio_ultimo_s = 0.0
+        
+    def adicionar(self, data: bytes, energia_db: float) -> Optional[bytes]:
+        """Acumula um buffer; retorna o segmento quando houver um ponto de corte"""
+        self._buffers.append(data)
+        self._bytes += len(data)
+        
+        if energia_db < self.limiar_silencio_db:
+            self._bytes_silencio += len(data)
+        else:
+            self._bytes_silencio = 0
+            self._tem_voz = True
+        
+        duracao = self._bytes / self.bytes_por_segundo
+        silencio = self._bytes_silencio / self.bytes_por_segundo
+        
+        if duracao >= self.segmento_maximo_s or (
+                duracao >= self.segmento_minimo_s and silencio >= self.silencio_minimo_s):
+            return self._cortar()
+        return None
+        
+    def finalizar(self) -> Optional[bytes]:
+        """Retorna o que restou como último segmento"""
+        return self._cortar()
+        
+    def _cortar(self) -> Optional[bytes]:
+        """Fecha o segmento atual e começa um novo"""
+        dados = b"".join(self._buffers) if self._tem_voz else None
+        self.inicio_ultimo_s = self._bytes_anteriores / self.bytes_por_segundo
+        self._bytes_anteriores += self._bytes
+        self._buffers = []
+        self._bytes = 0
+        self._bytes_silencio = 0
+        self._tem_voz = False
+        return dados
+
+
+class TranscricaoAoVivo:
+    """
+    Transcreve segmentos em segundo plano durante a gravação
+    
+    Cada segmento vira um arquivo (_segNNN) enviado ao Whisper por um pool
+    pequeno. O texto parcial é repassado ao callback na ordem dos segmentos,
+    a partir da thread do pool e fora do lock (o callback pode bloquear).
+    Segmentos que falharam não são repassados: o marcador de erro fica só no
+    relatório e no texto exibido.
+    """
+    
+    def __init__(self, base_path: Path, channels: int, sample_width: int, rate: int,
+                 transcrever: Callable[[int, Path], Dict],
+                 callback_parcial: Optional[Callable[[str], None]] = None,
+                 max_workers: int = 2, formato: Optional[Tuple[str, str, str]] = None):
+        self.base_path = base_path
+        self.formato = formato
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.transcrever = transcrever
+        self.callback_parcial = callback_parcial
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='auralis-ao-vivo')
+        self._resultados: Dict[int, Dict] = {}
+        self._inicios: Dict[int, float] = {}  # Posição de cada segmento no áudio gravado
+        self._textos_emitidos: List[str] = []
+        self._proximo = 0  # Próximo segmento a repassar ao callback
+        self._total = 0
+        self.lock = threading.Lock()
+        
+        # Textos prontos para o callback, em ordem; uma thread por vez os entrega
+        self._a_repassar: Deque[str] = deque()
+        self._lock_callback = threading.Lock()
+        
+    def enviar(self, dados: bytes, inicio_s: Optional[float] = None):
+        """
+        Salva o segmento em disco e agenda a transcrição
+        
+        Args:
+            inicio_s: Posição do segmento no áudio gravado (para o horário real)
+        """
+        indice = self._total
+        self._total += 1
+        if inicio_s is not None:
+            self._inicios[indice] = inicio_s
+        
+        caminho = escrever_audio(Path(f"{self.base_path}_seg{indice:03d}"), dados,
+                                 self.channels, self.sample_width, self.rate, self.formato)
+        
+        self._executor.submit(self._processar, indice, caminho)
+        
+    def _processar(self, indice: int, caminho: Path):
+        """Transcreve um segmento e repassa ao callback os que já estão em ordem"""
+        registro = self.transcrever(indice, caminho)
+        if indice in self._inicios:
+            registro['inicio_s'] = self._inicios[indice]
+        
+        # Segmentos transcritos não precisam mais do áudio
+        if registro['sucesso']:
+            try:
+                caminho.unlink()
+            except OSError:
+                pass
+        
+        with self.lock:
+            self._resultados[indice] = registro
+            while self._proximo in self._resultados:
+                pronto = self._resultados[self._proximo]
+                texto = pronto['texto']
+                self._proximo += 1
+                if texto and texto.strip():
+                    self._textos_emitidos.append(texto)
+                    if pronto['sucesso'] and self.callback_parcial:
+                        self._a_repassar.append(texto)
+        
+        self._repassar()
+        
+    def _repassar(self):
+        """Entrega ao callback os textos na fila, em ordem, sem segurar self.lock"""
+        with self._lock_callback:
+            while True:
+                with self.lock:
+                    if not self._a_repassar:
+                        return
+                    texto = self._a_repassar.popleft()
+                try:
+                    self.callback_parcial(texto)
+                except Exception as e:
+                    print(f"⚠️  Erro no callback de transcrição parcial: {e}")
+        
+    def texto_parcial(self) -> str:
+        """Texto já transcrito (em ordem) até o momento"""
+        with self.lock:
+            return "\n".join(self._textos_emitidos)
+        
+    def finalizar(self) -> List[Dict]:
+        """Aguarda os segmentos pendentes e retorna o relatório em ordem"""
+        self._executor.shutdown(wait=True)
+        return [self._resultados[i] for i in range(self._total)]
+
+
 class AudioProcessor:
     """Gerencia gravação, fragmentação e transcrição de áudio"""
     
-    def __init__(self, output_dir: str = "audio_temp"):
-        # Configurar OpenAI
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY não encontrada no .env")
-        self.client = OpenAI(api_key=self.openai_api_key)
+    def __init__(self, output_dir: str = "audio_temp", clientes: Optional[RegistroClientes] = None):
+        # Cliente OpenAI compartilhado; uploads de áudio têm timeout próprio e são
+        # repetidos só por executar_com_retry (sem as tentativas da biblioteca)
+        clientes = clientes or obter_registro_clientes()
+        self.client = clientes.openai(timeout_s=float(os.getenv('WHISPER_TIMEOUT_S', '300')), max_retries=0)
         
         # Configurações de áudio
         self.chunk = 1024
@@ -36,9 +624,17 @@ class AudioProcessor:
         
         # Controle de gravação
         self.recording = False
-        self.frames = []
         self.p = None
         self.stream = None
+        self._thread_gravacao = None
+        
+        # Gravação em disco por partes (sem manter o áudio em memória)
+        self.gravador = None
+        self.base_path_atual = None
+        
+        # Medição de nível (interface) e energia (detecção de voz)
+        self.medidor = MedidorNivel()
+        self.ultimo_nivel: Optional[NivelAudio] = None
         
         # Diretório de saída
         self.output_dir = Path(output_dir)
@@ -47,22 +643,42 @@ class AudioProcessor:
         # Limite de tamanho (25MB em bytes)
         self.max_size_bytes = 25 * 1024 * 1024
         
+        # Formato das partes enviadas ao Whisper: ogg (Opus/Vorbis), flac ou wav
+        self.formato_audio = os.getenv('AUDIO_FORMATO', 'ogg').lower()
+        
+        # Compressão de silêncios longos antes da gravação/transcrição
+        self.remover_silencio = os.getenv('REMOVER_SILENCIO', 'true').lower() == 'true'
+        self.removedor: Optional[RemovedorSilencio] = None
+        self.inicio_gravacao: Optional[datetime] = None
+        
         # Armazenar último arquivo de transcrição para limpeza
         self.last_transcription_file = None
         
-    def start_recording(self, callback: Optional[Callable[[float], None]] = None):
+        # Transcrição paralela das partes
+        self.max_transcricoes_paralelas = 4
+        self.tentativas_transcricao = 3
+        self.ultimo_relatorio_transcricao: List[Dict] = []
+        self.ultimas_marcacoes: List[Dict] = []  # Trechos com horário real (verbose_json)
+        
+        # Transcrição ao vivo (segmentos cortados nas pausas durante a gravação)
+        self.segmentador: Optional[SegmentadorVoz] = None
+        self.transcricao_ao_vivo: Optional[TranscricaoAoVivo] = None
+        
+    def start_recording(self, callback: Optional[Callable[[float], None]] = None,
+                        callback_parcial: Optional[Callable[[str], None]] = None,
+                        ao_vivo: bool = False):
         """
         Inicia a gravação de áudio
         
         Args:
             callback: Função opcional chamada com o nível de áudio (0-1)
+            callback_parcial: Função opcional chamada com cada trecho transcrito
+                durante a gravação (ativa o modo ao vivo)
+            ao_vivo: Transcreve segmentos durante a gravação
         """
         if self.recording:
             return
             
-        self.recording = True
-        self.frames = []
-        
         # Inicializar PyAudio com tratamento de erro
         try:
             self.p = pyaudio.PyAudio()
@@ -92,35 +708,84 @@ class AudioProcessor:
                 self.p.terminate()
             raise Exception(f"Erro ao inicializar áudio: {str(e)}")
         
+        # Arquivos de saída: as partes são escritas durante a gravação
+        self.inicio_gravacao = datetime.now()
+        timestamp = self.inicio_gravacao.strftime("%Y%m%d_%H%M%S")
+        self.base_path_atual = self.output_dir / f"reuniao_{timestamp}"
+        sample_width = pyaudio.get_sample_size(self.format)
+        formato = resolver_formato_compressao(self.formato_audio)
+        if formato:
+            self.gravador = GravadorPartesComprimidas(
+                self.base_path_atual,
+                channels=self.channels,
+                sample_width=sample_width,
+                rate=self.rate,
+                max_bytes=self.max_size_bytes,
+                formato=formato
+            )
+        else:
+            if self.formato_audio != 'wav':
+                print(f"⚠️  Formato '{self.formato_audio}' indisponível (instale soundfile); gravando em WAV")
+            self.gravador = GravadorPartesWav(
+                self.base_path_atual,
+                channels=self.channels,
+                sample_width=sample_width,
+                rate=self.rate,
+                max_bytes=self.max_size_bytes
+            )
+        self.medidor = MedidorNivel()
+        self.removedor = (
+            RemovedorSilencio(self.rate * sample_width * self.channels)
+            if self.remover_silencio else None
+        )
+        
+        if ao_vivo or callback_parcial:
+            self.segmentador = SegmentadorVoz(self.rate, sample_width, self.channels)
+            self.transcricao_ao_vivo = TranscricaoAoVivo(
+                self.base_path_atual,
+                channels=self.channels,
+                sample_width=sample_width,
+                rate=self.rate,
+                transcrever=lambda indice, caminho: self._transcrever_parte(indice, caminho, rotulo="segmento"),
+                callback_parcial=callback_parcial,
+                formato=formato
+            )
+        else:
+            self.segmentador = None
+            self.transcricao_ao_vivo = None
+        
+        self.recording = True
+        
         # Thread de gravação
         def record():
             while self.recording:
                 try:
                     data = self.stream.read(self.chunk, exception_on_overflow=False)
-                    self.frames.append(data)
                     
-                    # Calcular nível de áudio para callback
-                    if callback:
-                        audio_data = list(data)
-                        # Converter bytes para valores numéricos
-                        values = []
-                        for i in range(0, len(audio_data), 2):
-                            if i + 1 < len(audio_data):
-                                value = audio_data[i] | (audio_data[i+1] << 8)
-                                if value > 32767:
-                                    value -= 65536
-                                values.append(value)
+                    # Medir nível em todo buffer; notificar na taxa da interface
+                    self.ultimo_nivel = self.medidor.medir(data)
+                    if callback and self.medidor.deve_notificar():
+                        callback(self.ultimo_nivel.nivel)
+                    
+                    # Silêncios longos são comprimidos antes de gravar
+                    if self.removedor:
+                        trechos = self.removedor.processar(data, self.ultimo_nivel.energia_db)
+                    else:
+                        trechos = [(data, self.ultimo_nivel.energia_db)]
+                    
+                    for trecho, energia_db in trechos:
+                        self.gravador.escrever(trecho)
                         
-                        # Calcular RMS (Root Mean Square)
-                        if values:
-                            rms = math.sqrt(sum(x**2 for x in values) / len(values))
-                            # Normalizar para 0-1
-                            level = min(1.0, rms / 32768.0 * 10)
-                            callback(level)
+                        # Modo ao vivo: enviar o segmento ao chegar numa pausa
+                        if self.segmentador:
+                            segmento = self.segmentador.adicionar(trecho, energia_db)
+                            if segmento:
+                                self.transcricao_ao_vivo.enviar(segmento, self.segmentador.inicio_ultimo_s)
                 except Exception as e:
                     print(f"Erro na gravação: {e}")
         
-        threading.Thread(target=record, daemon=True).start()
+        self._thread_gravacao = threading.Thread(target=record, daemon=True)
+        self._thread_gravacao.start()
         
     def stop_recording(self) -> str:
         """
@@ -133,7 +798,26 @@ class AudioProcessor:
             return ""
             
         self.recording = False
-        time.sleep(0.1)  # Aguardar thread terminar
+        
+        # Aguardar a thread terminar o buffer em andamento
+        if self._thread_gravacao:
+            self._thread_gravacao.join(timeout=1.0)
+            self._thread_gravacao = None
+        
+        if self.removedor:
+            self.removedor.finalizar()
+            resumo = self.removedor.resumo()
+            print(f"🔇 Silêncio removido: {resumo['segundos_removidos']:.1f}s de "
+                  f"{resumo['segundos_originais']:.1f}s "
+                  f"({resumo['bytes_removidos'] / 1024 / 1024:.1f}MB PCM, "
+                  f"{resumo['proporcao_removida']:.0%})")
+        
+        # Modo ao vivo: só o último segmento fica para depois da parada
+        if self.segmentador:
+            restante = self.segmentador.finalizar()
+            if restante:
+                self.transcricao_ao_vivo.enviar(restante, self.segmentador.inicio_ultimo_s)
+            self.segmentador = None
         
         # Fechar stream
         if self.stream:
@@ -142,52 +826,142 @@ class AudioProcessor:
         if self.p:
             self.p.terminate()
             
-        # Salvar arquivos fragmentados
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_path = self.output_dir / f"reuniao_{timestamp}"
+        # As partes já estão em disco; só falta fechar a última
+        partes = self.gravador.fechar()
+        if partes:
+            bytes_disco = sum(os.path.getsize(parte) for parte in partes)
+            bytes_pcm = self.gravador.bytes_audio
+            print(f"📦 {len(partes)} parte(s), {bytes_disco / 1024 / 1024:.1f}MB em disco "
+                  f"(PCM: {bytes_pcm / 1024 / 1024:.1f}MB, "
+                  f"{bytes_pcm / max(bytes_disco, 1):.1f}x menor)")
+        self.gravador = None
         
-        self._save_fragmented_audio(base_path)
+        return str(self.base_path_atual)
         
-        return str(base_path)
+    def horario_real(self, segundos_gravados: float) -> Optional[datetime]:
+        """
+        Converte um offset do áudio gravado (ex.: da transcrição) no horário real
         
-    def _save_fragmented_audio(self, base_path: Path):
+        Considera os silêncios removidos; as partes são contíguas, então o
+        offset é contado desde o início da primeira parte.
         """
-        Salva o áudio em fragmentos de no máximo 25MB
+        if not self.inicio_gravacao:
+            return None
+        if self.removedor:
+            segundos_gravados = self.removedor.mapear_tempo(segundos_gravados)
+        return self.inicio_gravacao + timedelta(seconds=segundos_gravados)
         
-        Args:
-            base_path: Caminho base para os arquivos (sem extensão)
+    def _transcrever_parte(self, indice: int, audio_file: Path, total: Optional[int] = None,
+                           rotulo: str = "parte") -> Dict:
         """
-        if not self.frames:
-            return
-            
-        # Calcular tamanho total
-        total_size = len(b''.join(self.frames))
-        bytes_per_frame = len(self.frames[0]) if self.frames else 0
+        Transcreve uma parte, repetindo apenas ela em caso de erro transitório
+        
+        Returns:
+            Registro da parte com texto (ou marcador de erro), duração, tentativas,
+            duração do áudio e os segmentos do Whisper (início/fim relativos à parte)
+        """
+        inicio = time.monotonic()
+        tentativas = 0
+        
+        def _enviar():
+            nonlocal tentativas
+            tentativas += 1
+            with open(audio_file, "rb") as f:
+                # Usar Whisper API
+                return self.client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=f,
+                    language="pt",  # Português
+                    response_format="verbose_json"  # Texto + segmentos com tempos
+                )
+        
+        segmentos: List[Dict] = []
+        duracao_audio = None
+        try:
+            resposta = executar_com_retry(_enviar, tentativas=self.tentativas_transcricao)
+            texto, segmentos, duracao_audio = ler_resposta_whisper(resposta)
+            sucesso = True
+            posicao = f"{indice+1}/{total}" if total else f"{indice+1}"
+            print(f"   ✅ Transcrito: {rotulo} {posicao}")
+        except Exception as e:
+            print(f"   ❌ Erro ao transcrever {audio_file.name}: {e}")
+            texto = marcador_erro_transcricao(rotulo, indice + 1)
+            sucesso = False
+        
+        if duracao_audio is None:
+            duracao_audio = duracao_arquivo_audio(audio_file)
+        
+        return {
+            'parte': indice + 1,
+            'arquivo': audio_file.name,
+            'texto': texto,
+            'sucesso': sucesso,
+            'tentativas': tentativas,
+            'duracao_segundos': round(time.monotonic() - inicio, 2),
+            'duracao_audio': duracao_audio,
+            'segmentos': segmentos
+        }
+        
+    def _mesclar_com_anterior(self, arquivo_partes: Path, relatorio: List[Dict]) -> List[Dict]:
+        """
+        Junta o relatório desta execução ao da anterior que deixou partes com falha
+        
+        Cada parte reenviada ocupa a posição (e o número) que tinha na primeira
+        execução; uma nova falha não apaga um texto já transcrito.
+        
+        Returns:
+            Relatório completo, na ordem original das partes
+        """
+        if not arquivo_partes.exists():
+            return relatorio
+        
+        try:
+            with open(arquivo_partes, "r", encoding="utf-8") as f:
+                anterior = json.load(f)
+        except Exception as e:
+            print(f"   ⚠️  Não foi possível ler {arquivo_partes.name}: {e}")
+            return relatorio
+        
+        novas = {parte['arquivo']: parte for parte in relatorio}
+        mesclado = []
+        for parte in anterior:
+            nova = novas.pop(parte['arquivo'], None)
+            if nova is not None and nova['sucesso']:
+                parte = {**nova, 'parte': parte['parte']}
+            mesclado.append(parte)
+        mesclado.extend(novas.values())
+        
+        print(f"🔁 {len(relatorio)} parte(s) reenviada(s) mesclada(s) à transcrição anterior")
+        return mesclado
+        
+    def marcar_horarios(self, relatorio: List[Dict]) -> List[Dict]:
+        """
+        Horário real de cada segmento do Whisper
+        
+        Partes gravadas são contíguas (offset acumulado pela duração de cada
+        uma); segmentos ao vivo trazem a própria posição ('inicio_s').
+        
+        Returns:
+            Lista de {'horario', 'inicio_s', 'texto'} em ordem (vazia sem início de gravação)
+        """
+        if not self.inicio_gravacao:
+            return []
+        
+        marcacoes = []
+        inicio_parte = 0.0
+        for parte in relatorio:
+            if parte.get('inicio_s') is not None:
+                inicio_parte = parte['inicio_s']
+            for segmento in parte.get('segmentos') or []:
+                posicao = inicio_parte + segmento['inicio']
+                marcacoes.append({
+                    'horario': self.horario_real(posicao),
+                    'inicio_s': round(posicao, 2),
+                    'texto': segmento['texto']
+                })
+            inicio_parte += parte.get('duracao_audio') or 0.0
+        return marcacoes
         
-        if bytes_per_frame == 0:
-            return
-            
-        # Calcular quantos frames cabem em 25MB (com margem de segurança)
-        # Considerando header WAV (~44 bytes)
-        max_frames_per_file = (self.max_size_bytes - 1024) // bytes_per_frame
-        
-        # Dividir e salvar
-        file_count = 0
-        for i in range(0, len(self.frames), max_frames_per_file):
-            chunk_frames = self.frames[i:i + max_frames_per_file]
-            
-            # Criar arquivo WAV
-            filename = f"{base_path}_part{file_count:03d}.wav"
-            wf = wave.open(filename, 'wb')
-            wf.setnchannels(self.channels)
-            wf.setsampwidth(self.p.get_sample_size(self.format))
-            wf.setframerate(self.rate)
-            wf.writeframes(b''.join(chunk_frames))
-            wf.close()
-            
-            print(f"✅ Salvo: {filename} ({os.path.getsize(filename) / 1024 / 1024:.1f}MB)")
-            file_count += 1
-            
     def transcribe_audio_files(self, base_path: str) -> str:
         """
         Transcreve todos os arquivos de áudio fragmentados
@@ -199,34 +973,50 @@ class AudioProcessor:
             Texto completo transcrito
         """
         base_path = Path(base_path)
-        audio_files = sorted(base_path.parent.glob(f"{base_path.name}_part*.wav"))
+        audio_files = sorted(
+            arquivo for arquivo in base_path.parent.glob(f"{base_path.name}_part*")
+            if arquivo.suffix in EXTENSOES_AUDIO
+        )
         
         if not audio_files:
             raise ValueError(f"Nenhum arquivo de áudio encontrado com base: {base_path}")
+        
+        inicio = time.monotonic()
+        ao_vivo = self.transcricao_ao_vivo
+        if ao_vivo and Path(ao_vivo.base_path) == base_path:
+            # Modo ao vivo: os segmentos já foram enviados durante a gravação
+            print("🎤 Aguardando os segmentos transcritos ao vivo...")
+            relatorio = ao_vivo.finalizar()
+            self.transcricao_ao_vivo = None
+            workers = None
+        else:
+            print(f"🎤 Transcrevendo {len(audio_files)} arquivo(s) de áudio...")
             
-        print(f"🎤 Transcrevendo {len(audio_files)} arquivo(s) de áudio...")
+            # Transcrever as partes em paralelo; a ordem é mantida pelo índice
+            workers = max(1, min(self.max_transcricoes_paralelas, len(audio_files)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='auralis-whisper') as executor:
+                relatorio = list(executor.map(
+                    lambda item: self._transcrever_parte(item[0], item[1], len(audio_files)),
+                    enumerate(audio_files)
+                ))
         
-        transcriptions = []
+        # Reenvio das partes mantidas: completa a transcrição anterior em vez de substituí-la
+        execucao = relatorio
+        arquivo_partes = base_path.parent / f"{base_path.name}_transcricao_partes.json"
+        relatorio = self._mesclar_com_anterior(arquivo_partes, relatorio)
         
-        for i, audio_file in enumerate(audio_files):
-            print(f"   Processando {audio_file.name}...")
-            
-            try:
-                with open(audio_file, "rb") as f:
-                    # Usar Whisper API
-                    response = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=f,
-                        language="pt",  # Português
-                        response_format="text"
-                    )
-                    
-                    transcriptions.append(response)
-                    print(f"   ✅ Parte {i+1}/{len(audio_files)} transcrita")
-                    
-            except Exception as e:
-                print(f"   ❌ Erro ao transcrever {audio_file.name}: {e}")
-                transcriptions.append(f"[Erro na transcrição da parte {i+1}]")
+        transcriptions = [parte['texto'] for parte in relatorio if parte['texto'].strip()]
+        self.ultimo_relatorio_transcricao = relatorio
+        
+        falhas = [parte for parte in relatorio if not parte['sucesso']]
+        paralelismo = f"{workers} em paralelo" if workers else "ao vivo"
+        print(f"⏱️  {len(execucao)} trecho(s) em {time.monotonic() - inicio:.1f}s "
+              f"({paralelismo}; soma das partes: "
+              f"{sum(p['duracao_segundos'] for p in execucao):.1f}s)")
+        for parte in execucao:
+            status = "✅" if parte['sucesso'] else "❌"
+            print(f"   {status} {parte['arquivo']}: {parte['duracao_segundos']:.1f}s "
+                  f"({parte['tentativas']} tentativa(s))")
         
         # Juntar todas as transcrições
         full_text = "\n".join(transcriptions)
@@ -238,11 +1028,36 @@ class AudioProcessor:
         
         print(f"✅ Transcrição completa salva em: {text_file}")
         
+        # Trechos com o horário real (silêncios removidos já compensados)
+        self.ultimas_marcacoes = self.marcar_horarios(relatorio)
+        if self.ultimas_marcacoes:
+            arquivo_horarios = base_path.parent / f"{base_path.name}_horarios.txt"
+            with open(arquivo_horarios, "w", encoding="utf-8") as f:
+                for marcacao in self.ultimas_marcacoes:
+                    f.write(f"[{marcacao['horario']:%H:%M:%S}] {marcacao['texto']}\n")
+            print(f"🕒 {len(self.ultimas_marcacoes)} trecho(s) com horário em: {arquivo_horarios}")
+        
         # Armazenar o caminho do arquivo para limpeza posterior
         self.last_transcription_file = text_file
         
+        # O registro por parte só é necessário enquanto houver partes para reenviar
+        try:
+            if falhas:
+                with open(arquivo_partes, "w", encoding="utf-8") as f:
+                    json.dump(relatorio, f, ensure_ascii=False)
+            elif arquivo_partes.exists():
+                arquivo_partes.unlink()
+        except Exception as e:
+            print(f"   ⚠️  Não foi possível atualizar {arquivo_partes.name}: {e}")
+        
         # Limpar arquivos de áudio temporários após transcrição
+        # (partes com falha são mantidas para poderem ser reenviadas)
+        arquivos_com_falha = {parte['arquivo'] for parte in falhas}
+        for nome in sorted(arquivos_com_falha):
+            print(f"   ⚠️  Mantido para reenvio: {nome}")
         for audio_file in audio_files:
+            if audio_file.name in arquivos_com_falha:
+                continue
             try:
                 audio_file.unlink()
                 print(f"   🗑️  Arquivo removido: {audio_file.name}")
@@ -269,20 +1084,27 @@ class AudioProcessor:
 class AudioRecorder:
     """Interface simplificada para gravação de áudio no frontend"""
     
-    def __init__(self):
-        self.processor = AudioProcessor()
+    def __init__(self, clientes: Optional[RegistroClientes] = None):
+        self.processor = AudioProcessor(clientes=clientes)
         self.is_recording = False
         self.audio_level = 0.0
         self.base_path = ""
         self.transcription_file_path = None  # Armazenar caminho do arquivo de transcrição
         
+        # Transcrição ao vivo durante a gravação
+        self.live_mode = os.getenv('TRANSCRICAO_AO_VIVO', 'true').lower() == 'true'
+        self.on_partial_text: Optional[Callable[[str], None]] = None
+        
     def toggle_recording(self) -> bool:
         """Alterna entre gravar/parar"""
         if self.is_recording:
             self.base_path = self.processor.stop_recording()
             self.is_recording = False
         else:
-            self.processor.start_recording(self._update_level)
+            self.processor.start_recording(
+                self._update_level,
+                callback_parcial=self._update_partial if self.live_mode else None
+            )
             self.is_recording = True
             
         return self.is_recording
@@ -291,6 +1113,17 @@ class AudioRecorder:
         """Atualiza nível de áudio"""
         self.audio_level = level
         
+    def _update_partial(self, text: str):
+        """Repassa o trecho transcrito ao vivo (chamado fora da thread principal)"""
+        if self.on_partial_text:
+            self.on_partial_text(text)
+            
+    def get_partial_transcription(self) -> str:
+        """Texto transcrito até agora durante a gravação (modo ao vivo)"""
+        if self.processor.transcricao_ao_vivo:
+            return self.processor.transcricao_ao_vivo.texto_parcial()
+        return ""
+        
     def get_transcription(self) -> Optional[str]:
         """Obtém transcrição do último áudio gravado"""
         if not self.base_path:
@@ -309,6 +1142,10 @@ class AudioRecorder:
     def get_audio_level(self) -> float:
         """Retorna nível atual do áudio (0-1)"""
         return self.audio_level
+        
+    def get_audio_stats(self) -> Optional[NivelAudio]:
+        """Retorna a última medição completa (RMS, pico, clipping, energia)"""
+        return self.processor.ultimo_nivel
     
     def cleanup_transcription_file(self):
         """Remove o arquivo de transcrição após processamento"""
@@ -13,29 +13,44 @@ import re
 from pathlib import Path
 
 import numpy as np
-from openai import OpenAI
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
 
+try:
+    from .lotes_embeddings import dividir_em_lotes, gerar_embeddings_lote, estimar_tokens, RelatorioVazao
+    from .ingestao_paralela import obter_limitador_openai, processar_arquivos_em_paralelo
+    from .deduplicacao_chunks import planejar_reingestao
+    from .clientes import RegistroClientes, obter_registro_clientes
+except ImportError:
+    from lotes_embeddings import dividir_em_lotes, gerar_embeddings_lote, estimar_tokens, RelatorioVazao
+    from ingestao_paralela import obter_limitador_openai, processar_arquivos_em_paralelo
+    from deduplicacao_chunks import planejar_reingestao
+    from clientes import RegistroClientes, obter_registro_clientes
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
 class ProcessadorBaseConhecimento:
     """Processa documentos da base de conhecimento para busca semântica"""
     
-    def __init__(self):
-        """Inicializa o processador com clientes OpenAI e Supabase"""
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.supabase_client: Client = create_client(
-            os.getenv('SUPABASE_URL'),
-            os.getenv('SUPABASE_ANON_KEY')
-        )
+    def __init__(self, clientes: Optional[RegistroClientes] = None):
+        """Inicializa o processador com os clientes OpenAI e Supabase compartilhados"""
+        clientes = clientes or obter_registro_clientes()
+        self.openai_client = clientes.openai()
+        self.supabase_client: Client = clientes.supabase('anon')
         
         # Configurações de chunking
         self.chunk_size = 1500  # Caracteres por chunk
         self.chunk_overlap = 200  # Overlap entre chunks
         self.embedding_model = "text-embedding-ada-002"
         
+        # Configurações de lote (embeddings e inserção)
+        self.max_tokens_lote = 100_000  # tokens estimados por requisição
+        self.max_itens_lote = 100  # chunks por requisição/inserção
+        
+        # Limite de taxa compartilhado para a OpenAI (requisições/tokens por minuto)
+        self.limitador = obter_limitador_openai()
+        
         print("✅ Processador de Base de Conhecimento inicializado")
     
     def calcular_hash_documento(self, conteudo: str) -> str:
@@ -167,13 +182,96 @@ class ProcessadorBaseConhecimento:
         # Remove duplicatas
         return list(set(tags))
     
+    def _obter_chunks_existentes(self, documento_origem: str) -> List[Dict]:
+        """Obtém os chunks ativos já salvos de um documento"""
+        try:
+            resultado = self.supabase_client.table('base_conhecimento').select(
+                'id, conteudo, chunk_index'
+            ).eq('documento_origem', documento_origem).eq('ativo', True).execute()
+            return resultado.data or []
+        except Exception as e:
+            print(f"⚠️  Não foi possível consultar chunks existentes: {e}")
+            return []
+    
+    def _atualizar_chunks_mantidos(self, mantidos: List[Tuple[Dict, Dict]], hash_documento: str,
+                                   versao: str, erros: List[str]):
+        """Associa os chunks reaproveitados à nova versão e corrige posições que mudaram"""
+        if not mantidos:
+            return
+        
+        try:
+            # Uma única atualização para os metadados da versão
+            self.supabase_client.table('base_conhecimento').update({
+                'hash_documento': hash_documento,
+                'versao_documento': versao
+            }).in_('id', [existente['id'] for _, existente in mantidos]).execute()
+        except Exception as e:
+            erros.append(f"Atualização de versão: {str(e)}")
+            print(f"⚠️  Erro ao atualizar versão dos chunks reaproveitados: {e}")
+        
+        # Apenas chunks que mudaram de posição precisam de atualização própria
+        for chunk, existente in mantidos:
+            if chunk['chunk_index'] == existente.get('chunk_index'):
+                continue
+            try:
+                self.supabase_client.table('base_conhecimento').update({
+                    'chunk_index': chunk['chunk_index']
+                }).eq('id', existente['id']).execute()
+            except Exception as e:
+                erros.append(f"Chunk {chunk['chunk_index']}: {str(e)}")
+    
+    def _desativar_chunks(self, ids: List[str], erros: List[str]) -> int:
+        """Marca como inativos (ativo=false) os chunks que saíram do documento"""
+        if not ids:
+            return 0
+        
+        try:
+            self.supabase_client.table('base_conhecimento').update({
+                'ativo': False
+            }).in_('id', ids).execute()
+            return len(ids)
+        except Exception as e:
+            erros.append(f"Desativação de chunks: {str(e)}")
+            print(f"⚠️  Erro ao desativar chunks removidos: {e}")
+            return 0
+    
+    def _inserir_lote(self, linhas: List[Dict], erros: List[str]) -> int:
+        """
+        Insere um lote de chunks com uma única requisição
+        
+        Se a inserção em lote falhar, insere linha a linha para registrar
+        exatamente quais chunks falharam.
+        
+        Returns:
+            Número de chunks inseridos
+        """
+        if not linhas:
+            return 0
+        
+        try:
+            self.supabase_client.table('base_conhecimento').insert(linhas).execute()
+            return len(linhas)
+        except Exception as e:
+            print(f"⚠️  Inserção em lote falhou ({e}); inserindo chunk a chunk")
+        
+        inseridos = 0
+        for linha in linhas:
+            try:
+                self.supabase_client.table('base_conhecimento').insert(linha).execute()
+                inseridos += 1
+            except Exception as e:
+                erros.append(f"Chunk {linha['chunk_index']}: {str(e)}")
+                print(f"❌ Erro no chunk {linha['chunk_index']}: {e}")
+        return inseridos
+    
     def processar_documento(self, caminho_arquivo: str, versao: str = "1.0", notas_versao: str = "") -> Dict[str, any]:
         """
         Processa um documento completo:
         1. Lê o arquivo
         2. Cria chunks
-        3. Gera embeddings
-        4. Salva no Supabase
+        3. Reaproveita chunks já salvos com o mesmo conteúdo
+        4. Gera embeddings só dos chunks novos/alterados (em lotes limitados por tokens)
+        5. Salva no Supabase (inserção em lote) e desativa chunks que sumiram
         """
         print(f"\n🔄 Iniciando processamento de: {caminho_arquivo}")
         
@@ -197,7 +295,7 @@ class ProcessadorBaseConhecimento:
             # Verifica se documento já existe
             resultado_existente = self.supabase_client.table('base_conhecimento').select('id').eq(
                 'hash_documento', hash_documento
-            ).execute()
+            ).eq('ativo', True).limit(1).execute()
             
             if resultado_existente.data:
                 print("⚠️  Documento já processado com este conteúdo")
@@ -210,19 +308,42 @@ class ProcessadorBaseConhecimento:
             # Cria chunks
             chunks = self.criar_chunks(conteudo)
             
-            # Processa cada chunk
-            chunks_salvos = 0
+            # Deduplicação por conteúdo contra a versão já salva deste documento
+            existentes = self._obter_chunks_existentes(nome_arquivo)
+            chunks_a_inserir, mantidos, removidos = planejar_reingestao(
+                chunks, existentes, lambda c: c['conteudo'], lambda l: l.get('conteudo')
+            )
+            if existentes:
+                print(f"♻️  {len(mantidos)} chunks reaproveitados | "
+                      f"{len(chunks_a_inserir)} novos/alterados | {len(removidos)} removidos")
+            
             erros = []
+            self._atualizar_chunks_mantidos(mantidos, hash_documento, versao, erros)
             
-            for i, chunk in enumerate(chunks):
+            # Processa em lotes: um pedido de embeddings e uma inserção por lote
+            chunks_salvos = 0
+            relatorio = RelatorioVazao(len(chunks_a_inserir))
+            
+            for lote in dividir_em_lotes(chunks_a_inserir, lambda c: c['conteudo'],
+                                         self.max_tokens_lote, self.max_itens_lote):
+                tokens_lote = sum(estimar_tokens(c['conteudo']) for c in lote)
+                
                 try:
-                    print(f"🔄 Processando chunk {i+1}/{len(chunks)}...", end='\r')
-                    
-                    # Gera embedding
-                    embedding = self.gerar_embedding(chunk['conteudo'])
-                    
-                    # Prepara dados para inserção
-                    dados_chunk = {
+                    # Gera embeddings do lote
+                    embeddings = gerar_embeddings_lote(
+                        self.openai_client, self.embedding_model, [c['conteudo'] for c in lote],
+                        limitador=self.limitador
+                    )
+                except Exception as e:
+                    for chunk in lote:
+                        erros.append(f"Chunk {chunk['chunk_index']}: {str(e)}")
+                    print(f"❌ Erro ao gerar embeddings do lote: {e}")
+                    relatorio.registrar_lote(0, 0)
+                    continue
+                
+                # Prepara dados para inserção
+                linhas = [
+                    {
                         'conteudo': chunk['conteudo'],
                         'embedding': embedding,
                         'chunk_index': chunk['chunk_index'],
@@ -239,16 +360,27 @@ class ProcessadorBaseConhecimento:
                             'tamanho_original': len(conteudo)
                         }
                     }
-                    
-                    # Salva no Supabase
-                    self.supabase_client.table('base_conhecimento').insert(dados_chunk).execute()
-                    chunks_salvos += 1
-                    
-                except Exception as e:
-                    erros.append(f"Chunk {i}: {str(e)}")
-                    print(f"\n❌ Erro no chunk {i}: {e}")
+                    for chunk, embedding in zip(lote, embeddings)
+                ]
+                
+                # Salva no Supabase
+                salvos = self._inserir_lote(linhas, erros)
+                chunks_salvos += salvos
+                relatorio.registrar_lote(salvos, tokens_lote)
             
-            print(f"\n✅ {chunks_salvos}/{len(chunks)} chunks salvos com sucesso")
+            # Desativa chunks que não existem mais no documento, só se a nova versão
+            # foi gravada por completo (senão a versão antiga continua ativa)
+            chunks_desativados = 0
+            if removidos:
+                if not erros and chunks_salvos == len(chunks_a_inserir):
+                    chunks_desativados = self._desativar_chunks([linha['id'] for linha in removidos], erros)
+                else:
+                    print(f"⚠️  Gravação incompleta: {len(removidos)} chunks antigos continuam ativos")
+            
+            vazao = relatorio.resumo()
+            print(f"✅ {chunks_salvos}/{len(chunks_a_inserir)} chunks salvos com sucesso "
+                  f"em {vazao['duracao_segundos']:.1f}s ({vazao['chunks_por_segundo']:.1f} chunks/s, "
+                  f"{vazao['tokens_por_segundo']:.0f} tokens/s)")
             
             # Registra versão do documento
             try:
@@ -268,10 +400,17 @@ class ProcessadorBaseConhecimento:
                 'tipo': tipo_documento,
                 'categoria': categoria,
                 'tags': tags,
-                'chunks_processados': chunks_salvos,
+                'chunks_processados': chunks_salvos + len(mantidos),
                 'total_chunks': len(chunks),
+                'chunks_novos': chunks_salvos,
+                'chunks_reaproveitados': len(mantidos),
+                'chunks_desativados': chunks_desativados,
+                'embeddings_economizados': len(mantidos),
                 'hash': hash_documento,
-                'erros': erros
+                'erros': erros,
+                'duracao_segundos': vazao['duracao_segundos'],
+                'chunks_por_segundo': round(vazao['chunks_por_segundo'], 2),
+                'tokens_por_segundo': round(vazao['tokens_por_segundo'], 1)
             }
             
         except Exception as e:
@@ -282,8 +421,8 @@ class ProcessadorBaseConhecimento:
                 'erro': str(e)
             }
     
-    def processar_pasta(self, caminho_pasta: str) -> List[Dict[str, any]]:
-        """Processa todos os arquivos TXT em uma pasta"""
+    def processar_pasta(self, caminho_pasta: str, max_workers: int = 4) -> List[Dict[str, any]]:
+        """Processa todos os arquivos TXT em uma pasta (em paralelo, até max_workers por vez)"""
         resultados = []
         pasta = Path(caminho_pasta)
         
@@ -291,7 +430,7 @@ class ProcessadorBaseConhecimento:
             print(f"❌ Pasta não encontrada: {caminho_pasta}")
             return resultados
         
-        arquivos_txt = list(pasta.glob("*.txt"))
+        arquivos_txt = sorted(pasta.glob("*.txt"))
         
         if not arquivos_txt:
             print(f"⚠️  Nenhum arquivo TXT encontrado em: {caminho_pasta}")
@@ -299,8 +438,20 @@ class ProcessadorBaseConhecimento:
         
         print(f"📁 Encontrados {len(arquivos_txt)} arquivos TXT para processar")
         
-        for arquivo in arquivos_txt:
-            resultado = self.processar_documento(str(arquivo))
+        registros = processar_arquivos_em_paralelo(
+            arquivos_txt,
+            self.processar_documento,
+            max_workers,
+            sucesso=lambda r: r.get('status') in ('sucesso', 'ja_existe')
+        )
+        
+        for registro in registros:
+            resultado = registro['resultado'] or {
+                'status': 'erro',
+                'documento': registro['caminho'],
+                'erro': registro.get('erro', 'erro desconhecido')
+            }
+            resultado['duracao_segundos'] = registro['duracao_segundos']
             resultados.append(resultado)
         
         return resultados
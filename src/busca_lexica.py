@@ -0,0 +1,112 @@
+"""
+Índice invertido BM25 para busca lexical nos textos dos chunks
+Complementa a busca vetorial em termos exatos (nomes, siglas, números)
+- Tokenização sem acentos e sem stopwords do português
+- Atualização incremental (documentos recebem a mesma posição do índice vetorial)
+- Busca sem chamadas de API: só as listas de postings dos termos da consulta
+"""
+
+import re
+import math
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_PALAVRA = re.compile(r'\w+')
+
+# Stopwords do português (sem acentos, como os tokens)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele
+deles depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta estas
+este estes eu foi foram ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha minhas
+muito na nas nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos
+por qual quais quando que quem se sem ser seu seus so sua suas tambem te tem teu tua voce
+voces um uma umas uns sobre teve houve sao estao estava
+""".split())
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Minúsculas, sem acentos e sem stopwords; números e siglas são mantidos"""
+    if not texto:
+        return []
+    sem_acentos = unicodedata.normalize('NFKD', texto.lower())
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return [
+        token for token in _PALAVRA.findall(sem_acentos)
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class IndiceBM25:
+    """
+    Índice invertido com pontuação Okapi BM25
+
+    O documento na posição i do índice corresponde à linha i da matriz do
+    índice vetorial, então os resultados podem ser cruzados pelos mesmos chunks.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: Saturação da frequência do termo
+            b: Peso da normalização pelo tamanho do documento
+        """
+        self.k1 = k1
+        self.b = b
+        self.limpar()
+
+    def limpar(self):
+        """Remove todos os documentos"""
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}  # termo -> (documentos, frequências)
+        self._tamanhos: List[int] = []
+        self._soma_tamanhos = 0
+
+    @property
+    def total_documentos(self) -> int:
+        return len(self._tamanhos)
+
+    def adicionar(self, texto: Optional[str]) -> int:
+        """Indexa um documento e retorna sua posição"""
+        posicao = len(self._tamanhos)
+        tokens = tokenizar(texto)
+        for termo, frequencia in Counter(tokens).items():
+            documentos, frequencias = self._postings.setdefault(termo, ([], []))
+            documentos.append(posicao)
+            frequencias.append(frequencia)
+        self._tamanhos.append(len(tokens))
+        self._soma_tamanhos += len(tokens)
+        return posicao
+
+    def buscar(self, consulta: str, limite: int = 15) -> List[Tuple[int, float]]:
+        """
+        Documentos com maior pontuação BM25 para a consulta
+
+        Returns:
+            Lista de (posição, pontuação) em ordem decrescente (só pontuação > 0)
+        """
+        total = len(self._tamanhos)
+        termos = set(tokenizar(consulta))
+        if total == 0 or not termos or limite <= 0:
+            return []
+
+        tamanhos = np.asarray(self._tamanhos, dtype=np.float32)
+        media = self._soma_tamanhos / total or 1.0
+        normalizacao = self.k1 * (1 - self.b + self.b * tamanhos / media)
+
+        pontuacoes = np.zeros(total, dtype=np.float32)
+        for termo in termos:
+            if termo not in self._postings:
+                continue
+            documentos, frequencias = self._postings[termo]
+            docs = np.asarray(documentos)
+            tf = np.asarray(frequencias, dtype=np.float32)
+            idf = math.log(1 + (total - len(documentos) + 0.5) / (len(documentos) + 0.5))
+            pontuacoes[docs] += idf * tf * (self.k1 + 1) / (tf + normalizacao[docs])
+
+        candidatos = np.flatnonzero(pontuacoes > 0)
+        if len(candidatos) > limite:
+            candidatos = candidatos[np.argpartition(pontuacoes[candidatos], -limite)[-limite:]]
+        candidatos = candidatos[np.argsort(pontuacoes[candidatos])[::-1]]
+        return [(int(i), float(pontuacoes[i])) for i in candidatos]
@@ -1,112 +1,430 @@
 """
 Sistema de busca local por similaridade
 Implementa busca semântica sem depender de funções RPC do Supabase
+- Índice residente em memória (matriz float32 contígua, linhas normalizadas)
+- Score via um único produto matriz-vetor + argpartition para o top-k
+- Atualização incremental por marca d'água (created_at/id)
+- Reconciliação periódica dos IDs (linhas apagadas/desativadas saem do índice,
+  linhas que voltaram ou chegaram com marca antiga entram)
+- Busca com várias consultas de uma vez (produto matriz-matriz)
+- Embeddings baixados em binário (embedding_b64) e lidos direto em float32
+- Datas convertidas para épocas na indexação (peso temporal vetorizado)
+- Índice BM25 opcional sobre o texto dos mesmos chunks (busca lexical)
 """
 
+import time
+import threading
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from supabase import Client
 
+try:
+    from .vetores import converter_embedding, vetor_de_pgvector_b64
+    from .peso_temporal import PesoTemporal, epoca_de_data
+    from .busca_lexica import IndiceBM25
+except ImportError:
+    from vetores import converter_embedding, vetor_de_pgvector_b64
+    from peso_temporal import PesoTemporal, epoca_de_data
+    from busca_lexica import IndiceBM25
+
 class BuscaSemanticaLocal:
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, tabela: str = 'reunioes_embbed',
+                 dimensao: int = 1536, intervalo_atualizacao: float = 60.0,
+                 coluna_marca: str = 'created_at', filtros: Optional[Dict] = None,
+                 colunas: Optional[str] = None, coluna_texto: Optional[str] = None,
+                 intervalo_reconciliacao: float = 600.0):
         self.supabase = supabase_client
-        self._cache_chunks = None
-        self._cache_embeddings = None
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calcula similaridade de cosseno entre dois vetores"""
-        # Converter para numpy arrays
-        v1 = np.array(vec1)
-        v2 = np.array(vec2)
-        
-        # Calcular similaridade
-        dot_product = np.dot(v1, v2)
-        norm_v1 = np.linalg.norm(v1)
-        norm_v2 = np.linalg.norm(v2)
-        
-        if norm_v1 == 0 or norm_v2 == 0:
-            return 0.0
-            
-        return float(dot_product / (norm_v1 * norm_v2))
-    
-    def _load_all_chunks(self) -> Tuple[List[Dict], List[List[float]]]:
-        """Carrega todos os chunks e embeddings do banco"""
-        if self._cache_chunks is not None:
-            return self._cache_chunks, self._cache_embeddings
-            
-        print("Carregando chunks do banco de dados...")
-        result = self.supabase.table('reunioes_embbed').select('*').execute()
-        
-        chunks = []
-        embeddings = []
-        
-        for item in result.data:
-            # Verificar se embedding existe e tem tamanho correto
-            embedding = item.get('embedding', [])
-            
-            # Se embedding for string JSON, converter
-            if isinstance(embedding, str):
-                import json
+        self.tabela = tabela
+        self.dimensao = dimensao
+
+        # Coluna usada como marca d'água e filtros de igualdade (ex.: ativo=True)
+        self.coluna_marca = coluna_marca
+        self.filtros = filtros or {}
+
+        # Intervalo mínimo (segundos) entre consultas incrementais ao banco
+        self.intervalo_atualizacao = intervalo_atualizacao
+
+        # Intervalo (segundos) entre conferências dos IDs ainda presentes no
+        # banco; a marca d'água só enxerga inserções, não remoções
+        self.intervalo_reconciliacao = intervalo_reconciliacao
+
+        # Tamanho da página ao baixar linhas (limite padrão do PostgREST)
+        self.tamanho_pagina = 1000
+
+        # IDs por consulta ao buscar linhas específicas (filtro in. vai na URL)
+        self.tamanho_lote_ids = 200
+
+        # Colunas de metadados; com elas o embedding vem em binário (coluna
+        # computada embedding_b64) em vez do texto do pgvector
+        self.colunas = colunas
+        self.transporte_binario = colunas is not None
+
+        # Coluna indexada também no BM25 (ex.: chunk_texto); None desativa
+        self.coluna_texto = coluna_texto
+        self._lexico = IndiceBM25() if coluna_texto else None
+
+        # Lock para atualização e leitura thread-safe (buscas vetorial e lexical
+        # rodam em paralelo sobre o mesmo índice)
+        self.lock = threading.RLock()
+
+        self.limpar_cache()
+
+    def _garantir_capacidade(self, necessario: int):
+        """Cresce a matriz (dobrando) mantendo o bloco contíguo"""
+        if necessario <= self._matriz.shape[0]:
+            return
+        nova_capacidade = max(necessario, self._matriz.shape[0] * 2, 256)
+        nova_matriz = np.zeros((nova_capacidade, self.dimensao), dtype=np.float32)
+        nova_matriz[:self._total] = self._matriz[:self._total]
+        self._matriz = nova_matriz
+
+        novas_epocas = np.full(nova_capacidade, np.nan)
+        novas_epocas[:self._total] = self._epocas[:self._total]
+        self._epocas = novas_epocas
+
+    def _selecao(self) -> str:
+        """Colunas pedidas ao banco (binário quando disponível)"""
+        if self.transporte_binario:
+            return f"{self.colunas}, embedding_b64"
+        return '*'
+
+    def _baixar_novas_linhas(self) -> List[Dict]:
+        """Baixa (paginado) apenas as linhas a partir da marca d'água"""
+        try:
+            return self._baixar_paginas()
+        except Exception as e:
+            if not self.transporte_binario:
+                raise
+            # Banco sem a função embedding_b64: volta para o texto do pgvector
+            print(f"⚠️  Embeddings em binário indisponíveis em {self.tabela} ({e}); usando texto")
+            self.transporte_binario = False
+            return self._baixar_paginas()
+
+    def _baixar_paginas(self, selecao: Optional[str] = None, desde_marca: bool = True) -> List[Dict]:
+        linhas = []
+        inicio = 0
+        while True:
+            query = self.supabase.table(self.tabela).select(selecao or self._selecao())
+            for coluna, valor in self.filtros.items():
+                query = query.eq(coluna, valor)
+            if desde_marca and self._marca is not None:
+                # gte + filtro por id evita perder linhas com a mesma marca
+                query = query.gte(self.coluna_marca, self._marca)
+            resultado = query.order(self.coluna_marca).order('id').range(
+                inicio, inicio + self.tamanho_pagina - 1
+            ).execute()
+
+            pagina = resultado.data or []
+            linhas.extend(pagina)
+            if len(pagina) < self.tamanho_pagina:
+                break
+            inicio += self.tamanho_pagina
+        return linhas
+
+    def _baixar_por_ids(self, ids: List) -> List[Dict]:
+        """Baixa linhas específicas (em lotes de IDs), com os mesmos filtros"""
+        linhas = []
+        for inicio in range(0, len(ids), self.tamanho_lote_ids):
+            query = self.supabase.table(self.tabela).select(self._selecao())
+            for coluna, valor in self.filtros.items():
+                query = query.eq(coluna, valor)
+            resultado = query.in_('id', ids[inicio:inicio + self.tamanho_lote_ids]).execute()
+            linhas.extend(resultado.data or [])
+        return linhas
+
+    def atualizar_indice(self, forcar: bool = False) -> int:
+        """
+        Adiciona ao índice as linhas novas desde a última atualização
+
+        Quem chega durante uma atualização espera por ela (nunca lê um índice
+        pela metade). Se o download falhar, a próxima busca tenta de novo.
+        A cada `intervalo_reconciliacao` segundos também confere os IDs do
+        banco: remove as linhas que saíram (ex.: chunks trocados numa
+        reingestão) e baixa as que faltam (reativadas ou com marca antiga).
+
+        Returns:
+            Número de chunks adicionados
+        """
+        with self.lock:
+            agora = time.monotonic()
+            if (not forcar and self._ultima_atualizacao is not None and
+                    agora - self._ultima_atualizacao < self.intervalo_atualizacao):
+                return 0
+
+            adicionados = self._atualizar()
+            self._ultima_atualizacao = agora
+
+            if self._ultima_reconciliacao is None:
+                # Carga completa: o índice já reflete o banco
+                self._ultima_reconciliacao = agora
+            elif agora - self._ultima_reconciliacao >= self.intervalo_reconciliacao:
                 try:
-                    embedding = json.loads(embedding)
-                except:
-                    continue
-                    
+                    self._reconciliar()
+                    self._ultima_reconciliacao = agora
+                except Exception as e:
+                    print(f"⚠️  Não foi possível conferir os IDs de {self.tabela}: {e}")
+            return adicionados
+
+    def _reconciliar(self) -> Tuple[int, int]:
+        """
+        Alinha os IDs do índice com os do banco
+
+        Remove as linhas que não existem mais (ou não passam mais nos filtros,
+        como ativo=True) e adiciona as que a marca d'água não alcança: linhas
+        reativadas ou gravadas com marca anterior à última atualização.
+
+        Returns:
+            (chunks removidos, chunks adicionados)
+        """
+        presentes = {linha.get('id') for linha in self._baixar_paginas('id', desde_marca=False)}
+        removidos = self._ids - presentes
+        if removidos:
+            self._remover_linhas(removidos)
+
+        faltantes = presentes - self._ids - self._ids_invalidos
+        adicionados = []
+        if faltantes:
+            adicionados = self._adicionar_linhas(self._baixar_por_ids(sorted(faltantes)))
+            if adicionados:
+                print(f"✅ Índice local: +{len(adicionados)} chunks fora da marca d'água (total: {self._total})")
+        return len(removidos), len(adicionados)
+
+    def _remover_linhas(self, ids_removidos: set):
+        """Compacta matriz, épocas, chunks e BM25 sem as linhas removidas"""
+        total = self._total
+        manter = np.fromiter(
+            (chunk.get('id') not in ids_removidos for chunk in self._chunks[:total]), dtype=bool, count=total
+        )
+
+        # Arrays novos: visões já entregues por _instantaneo continuam válidas
+        self._matriz = self._matriz[:total][manter]
+        self._epocas = self._epocas[:total][manter]
+        self._chunks = [chunk for chunk, fica in zip(self._chunks, manter) if fica]
+        self._ids -= ids_removidos
+        self._total = len(self._chunks)
+        if self._lexico is not None:
+            self._lexico.limpar()
+            for item in self._chunks:
+                self._lexico.adicionar(item.get(self.coluna_texto))
+
+        print(f"🧹 Índice local: -{total - self._total} chunks removidos do banco (total: {self._total})")
+
+    def _atualizar(self) -> int:
+        carga_inicial = self._total == 0
+        if carga_inicial:
+            print("Carregando chunks do banco de dados...")
+
+        novos_chunks = self._adicionar_linhas(self._baixar_novas_linhas())
+        for item in novos_chunks:
+            if item.get(self.coluna_marca):
+                self._marca = item[self.coluna_marca]
+
+        if carga_inicial:
+            print(f"✅ Carregados {self._total} chunks válidos")
+        elif novos_chunks:
+            print(f"✅ Índice local: +{len(novos_chunks)} chunks (total: {self._total})")
+
+        return len(novos_chunks)
+
+    def _adicionar_linhas(self, linhas: List[Dict]) -> List[Dict]:
+        """
+        Indexa as linhas ainda fora do índice (a marca d'água não muda aqui)
+
+        Returns:
+            Chunks adicionados, na ordem recebida
+        """
+        novos_ids = set()
+        novos_chunks = []
+        novos_vetores = []
+        novas_epocas = []
+        for item in linhas:
+            item_id = item.get('id')
+            if item_id in self._ids or item_id in novos_ids:
+                continue
+
+            # Embedding direto para float32 (binário ou texto do pgvector)
+            binario = item.pop('embedding_b64', None)
+            texto = item.pop('embedding', None)
+            try:
+                embedding = vetor_de_pgvector_b64(binario) if binario else converter_embedding(texto, self.dimensao)
+            except ValueError:
+                embedding = None
+
             # Verificar tamanho - esperamos 1536 para ada-002
-            if len(embedding) == 1536:
-                chunks.append(item)
-                embeddings.append(embedding)
-            else:
-                print(f"⚠️  Chunk {item.get('id')} tem embedding com tamanho {len(embedding)}")
-        
-        print(f"✅ Carregados {len(chunks)} chunks válidos")
-        
-        # Cachear para próximas buscas
-        self._cache_chunks = chunks
-        self._cache_embeddings = embeddings
-        
-        return chunks, embeddings
-    
-    def buscar_similares(self, 
-                        query_embedding: List[float], 
+            if embedding is None or len(embedding) != self.dimensao:
+                print(f"⚠️  Chunk {item_id} sem embedding válido de tamanho {self.dimensao}")
+                self._ids_invalidos.add(item_id)
+                continue
+
+            novos_ids.add(item_id)
+            novos_chunks.append(item)
+            novos_vetores.append(embedding)
+            novas_epocas.append(epoca_de_data(item.get(self.coluna_marca)))
+
+        # Linhas da matriz, chunks, ids e documentos BM25 entram juntos
+        if novos_vetores:
+            vetores = np.vstack(novos_vetores)
+            # Pré-normalizar linhas: cosseno vira produto escalar
+            normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+            normas[normas == 0] = 1.0
+            vetores /= normas
+
+            self._garantir_capacidade(self._total + len(vetores))
+            self._matriz[self._total:self._total + len(vetores)] = vetores
+            self._epocas[self._total:self._total + len(vetores)] = novas_epocas
+            self._total += len(vetores)
+            self._chunks.extend(novos_chunks)
+            self._ids.update(novos_ids)
+            if self._lexico is not None:
+                for item in novos_chunks:
+                    self._lexico.adicionar(item.get(self.coluna_texto))
+        return novos_chunks
+
+    def _load_all_chunks(self) -> Tuple[List[Dict], np.ndarray]:
+        """Retorna os chunks indexados e a matriz normalizada de embeddings"""
+        chunks, matriz, _ = self._instantaneo()
+        return chunks, matriz
+
+    def _instantaneo(self) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+        """
+        Atualiza e devolve uma visão consistente do índice (chunks, matriz, épocas)
+
+        As linhas já indexadas nunca são alteradas no lugar (crescer ou
+        reconstruir cria arrays novos), então a visão segue válida sem o lock.
+        """
+        with self.lock:
+            self.atualizar_indice()
+            total = self._total
+            return self._chunks[:total], self._matriz[:total], self._epocas[:total]
+
+    def buscar_similares(self,
+                        query_embedding: List[float],
                         threshold: float = 0.7,
-                        limit: int = 5) -> List[Dict]:
-        """Busca chunks similares usando cálculo local"""
-        
+                        limit: int = 5,
+                        peso_temporal: Optional[PesoTemporal] = None) -> List[Dict]:
+        """
+        Busca chunks similares usando cálculo local
+
+        Com peso_temporal, a similaridade de todos os chunks é multiplicada pelo
+        peso de recência (pela data da coluna de marca) antes do top-k.
+        """
+
         # Verificar tamanho do embedding de consulta
-        if len(query_embedding) != 1536:
-            print(f"⚠️  Query embedding tem tamanho {len(query_embedding)}, esperado 1536")
+        if len(query_embedding) != self.dimensao:
+            print(f"⚠️  Query embedding tem tamanho {len(query_embedding)}, esperado {self.dimensao}")
             return []
-        
-        # Carregar todos os chunks
-        chunks, embeddings = self._load_all_chunks()
-        
+
+        # Carregar chunks (incremental)
+        chunks, matriz, epocas = self._instantaneo()
+
         if not chunks:
             print("Nenhum chunk válido encontrado no banco")
             return []
-        
-        # Calcular similaridades
-        similarities = []
-        for i, chunk_embedding in enumerate(embeddings):
-            sim = self._cosine_similarity(query_embedding, chunk_embedding)
-            if sim > threshold:
-                similarities.append((i, sim))
-        
-        # Ordenar por similaridade decrescente
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        # Retornar top N resultados
+
+        consulta = np.asarray(query_embedding, dtype=np.float32)
+        norma = np.linalg.norm(consulta)
+        if norma == 0:
+            return []
+        consulta /= norma
+
+        # Um único produto matriz-vetor para todos os chunks
+        similaridades = matriz @ consulta
+        if peso_temporal is not None:
+            similaridades = peso_temporal.aplicar(similaridades, epocas)
+
+        results = self._top_k(chunks, similaridades, threshold, limit)
+
+        print(f"Encontrados {len(results)} chunks com similaridade > {threshold}")
+
+        return results
+
+    def buscar_similares_multi(self,
+                               query_embeddings: List[List[float]],
+                               threshold: float = 0.7,
+                               limit: int = 5) -> List[List[Dict]]:
+        """Busca várias consultas de uma vez; retorna uma lista ranqueada por consulta"""
+        consultas = [q for q in query_embeddings if len(q) == self.dimensao]
+        if len(consultas) != len(query_embeddings):
+            print(f"⚠️  Embeddings de consulta com tamanho diferente de {self.dimensao}")
+            return [[] for _ in query_embeddings]
+
+        chunks, matriz = self._load_all_chunks()
+
+        if not chunks or not consultas:
+            return [[] for _ in query_embeddings]
+
+        consultas = np.asarray(consultas, dtype=np.float32)
+        normas = np.linalg.norm(consultas, axis=1, keepdims=True)
+        normas[normas == 0] = 1.0
+        consultas /= normas
+
+        # Um único produto matriz-matriz: (chunks x dim) @ (dim x consultas)
+        similaridades = matriz @ consultas.T
+
+        return [
+            self._top_k(chunks, similaridades[:, j], threshold, limit)
+            for j in range(similaridades.shape[1])
+        ]
+
+    def buscar_texto(self, consulta: str, limit: int = 15) -> List[Dict]:
+        """
+        Busca lexical (BM25) no texto dos chunks indexados
+
+        Cada resultado traz a pontuação em 'relevancia' (sem similaridade vetorial).
+        """
+        if self._lexico is None:
+            return []
+
+        with self.lock:
+            chunks, _, _ = self._instantaneo()
+            encontrados = self._lexico.buscar(consulta, limit)
+
         results = []
-        for idx, sim in similarities[:limit]:
+        for idx, pontuacao in encontrados:
+            chunk = chunks[idx].copy()
+            chunk['relevancia'] = pontuacao
+            results.append(chunk)
+
+        return results
+
+    def _top_k(self, chunks: List[Dict], similaridades: np.ndarray,
+               threshold: float, limit: int) -> List[Dict]:
+        """Seleciona os top-k acima do limiar sem ordenar o vetor inteiro"""
+        k = min(limit, len(similaridades))
+        if k <= 0:
+            return []
+        if k < len(similaridades):
+            indices = np.argpartition(similaridades, -k)[-k:]
+        else:
+            indices = np.arange(len(similaridades))
+        indices = indices[np.argsort(similaridades[indices])[::-1]]
+
+        # Retornar top N resultados acima do limiar
+        results = []
+        for idx in indices:
+            sim = float(similaridades[idx])
+            if sim <= threshold:
+                break
             chunk = chunks[idx].copy()
             chunk['similarity'] = sim
             results.append(chunk)
-        
-        print(f"Encontrados {len(results)} chunks com similaridade > {threshold}")
-        
+
         return results
-    
+
     def limpar_cache(self):
-        """Limpa o cache de chunks"""
-        self._cache_chunks = None
-        self._cache_embeddings = None
\ No newline at end of file
+        """Limpa o índice local (a próxima busca recarrega tudo)"""
+        with self.lock:
+            self._limpar()
+
+    def _limpar(self):
+        self._chunks: List[Dict] = []
+        self._ids = set()
+        self._ids_invalidos = set()  # Linhas sem embedding válido (não rebaixar)
+        self._matriz = np.zeros((0, self.dimensao), dtype=np.float32)
+        self._epocas = np.zeros(0)  # Data de cada linha em segundos (NaN sem data)
+        if self._lexico is not None:
+            self._lexico.limpar()
+        self._total = 0
+        self._marca: Optional[str] = None
+        self._ultima_atualizacao: Optional[float] = None
+        self._ultima_reconciliacao: Optional[float] = None
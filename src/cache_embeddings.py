@@ -0,0 +1,157 @@
+"""
+Cache de embeddings com estratégia LRU e persistência opcional em SQLite
+Evita chamadas repetidas à API de embeddings para textos já vistos
+"""
+
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+
+class CacheEmbeddings:
+    """
+    Cache de embeddings em memória (LRU) com persistência opcional em disco
+
+    A chave é o modelo + texto normalizado, então perguntas repetidas ou
+    com pequenas variações de espaço/aspas reaproveitam o mesmo embedding.
+    """
+
+    def __init__(self, capacidade_maxima: int = 1000, caminho_persistencia: Optional[str] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            capacidade_maxima: Número máximo de embeddings mantidos em memória
+            caminho_persistencia: Arquivo SQLite para persistir o cache (opcional)
+        """
+        self.capacidade_maxima = capacidade_maxima
+
+        # OrderedDict mantém ordem de uso para o LRU
+        self.memoria: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        # Lock para operações thread-safe
+        self.lock = threading.Lock()
+
+        # Estatísticas
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+
+        # Persistência em disco (SQLite)
+        self.caminho_persistencia = caminho_persistencia
+        self._conexao: Optional[sqlite3.Connection] = None
+        if caminho_persistencia:
+            try:
+                self._conexao = sqlite3.connect(caminho_persistencia, check_same_thread=False)
+                self._conexao.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "chave TEXT PRIMARY KEY, modelo TEXT NOT NULL, embedding BLOB NOT NULL)"
+                )
+                self._conexao.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Cache de embeddings sem persistência: {e}")
+                self._conexao = None
+
+    @staticmethod
+    def normalizar_texto(texto: str) -> str:
+        """Normaliza o texto removendo aspas e espaços redundantes"""
+        texto = texto.replace('"', '').replace("'", "")
+        return re.sub(r'\s+', ' ', texto).strip()
+
+    @staticmethod
+    def _gerar_chave(modelo: str, texto_normalizado: str) -> str:
+        """Gera a chave do cache a partir do modelo e do texto normalizado"""
+        return hashlib.sha256(f"{modelo}\n{texto_normalizado}".encode()).hexdigest()
+
+    def _guardar_memoria(self, chave: str, vetor: np.ndarray):
+        """Insere na memória respeitando a capacidade (remove o menos usado)"""
+        self.memoria[chave] = vetor
+        self.memoria.move_to_end(chave)
+        while len(self.memoria) > self.capacidade_maxima:
+            self.memoria.popitem(last=False)
+
+    def obter(self, modelo: str, texto: str) -> Optional[List[float]]:
+        """
+        Obtém um embedding do cache
+
+        Returns:
+            Embedding ou None se não estiver em cache
+        """
+        chave = self._gerar_chave(modelo, self.normalizar_texto(texto))
+
+        with self.lock:
+            vetor = self.memoria.get(chave)
+            if vetor is not None:
+                self.memoria.move_to_end(chave)
+                self.hits += 1
+                return vetor.tolist()
+
+            if self._conexao is not None:
+                try:
+                    linha = self._conexao.execute(
+                        "SELECT embedding FROM embeddings WHERE chave = ?", (chave,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    linha = None
+                if linha:
+                    vetor = np.frombuffer(linha[0], dtype=np.float32)
+                    self._guardar_memoria(chave, vetor)
+                    self.hits += 1
+                    self.hits_disco += 1
+                    return vetor.tolist()
+
+            self.misses += 1
+            return None
+
+    def guardar(self, modelo: str, texto: str, embedding: List[float]):
+        """Armazena um embedding no cache (memória e disco, se configurado)"""
+        chave = self._gerar_chave(modelo, self.normalizar_texto(texto))
+        vetor = np.asarray(embedding, dtype=np.float32)
+
+        with self.lock:
+            self._guardar_memoria(chave, vetor)
+
+            if self._conexao is not None:
+                try:
+                    self._conexao.execute(
+                        "INSERT OR REPLACE INTO embeddings (chave, modelo, embedding) VALUES (?, ?, ?)",
+                        (chave, modelo, vetor.tobytes())
+                    )
+                    self._conexao.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Erro ao persistir embedding: {e}")
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Obtém estatísticas de uso do cache"""
+        total_acessos = self.hits + self.misses
+        taxa_acerto = (self.hits / total_acessos * 100) if total_acessos > 0 else 0
+
+        return {
+            'total_entradas': len(self.memoria),
+            'capacidade_usada': f"{len(self.memoria) / self.capacidade_maxima * 100:.1f}%",
+            'total_acessos': total_acessos,
+            'hits': self.hits,
+            'hits_disco': self.hits_disco,
+            'misses': self.misses,
+            'taxa_acerto': f"{taxa_acerto:.1f}%"
+        }
+
+    def limpar(self):
+        """Limpa o cache em memória (o arquivo em disco é mantido)"""
+        with self.lock:
+            self.memoria.clear()
+            self.hits = 0
+            self.hits_disco = 0
+            self.misses = 0
+
+    def fechar(self):
+        """Fecha a conexão com o arquivo de persistência"""
+        with self.lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
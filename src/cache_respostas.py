@@ -0,0 +1,266 @@
+"""
+Cache semântico de respostas do agente
+Perguntas repetidas (ou quase iguais) reaproveitam a resposta já gerada,
+sem nova busca nem nova chamada ao modelo de chat
+- Antes da busca: texto normalizado da pergunta + contexto da conversa (igualdade exata)
+- Depois da busca: embedding da pergunta (similaridade de cosseno) + IDs dos chunks usados
+  + o mesmo contexto de conversa (que também vai no prompt)
+- Expiração por TTL e invalidação quando chegam novos dados nas tabelas
+"""
+
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+_ESPACOS = re.compile(r'\s+')
+
+
+class CacheRespostas:
+    """
+    Cache LRU de respostas indexado pelo embedding da pergunta
+
+    Há dois pontos de consulta:
+    - Antes da busca: a mesma pergunta (texto normalizado) feita com o mesmo
+      contexto de conversa devolve a resposta na hora, sem buscar chunks.
+      Não há comparação semântica aqui: perguntas quase iguais podem diferir
+      justamente na data ou no nome que importam
+    - Depois da busca: pergunta parecida que recuperou exatamente os mesmos
+      chunks reaproveita a resposta, sem chamar o modelo de chat
+
+    Cada entrada guarda a versão dos dados em que foi gerada; quando a versão
+    muda (novas reuniões ou documentos), as entradas antigas deixam de valer.
+    """
+
+    def __init__(self, capacidade_maxima: int = 500, ttl_segundos: float = 3600,
+                 limiar_com_chunks: float = 0.92):
+        """
+        Inicializa o cache
+
+        Args:
+            capacidade_maxima: Número máximo de respostas mantidas
+            ttl_segundos: Tempo de vida de cada resposta
+            limiar_com_chunks: Similaridade mínima quando os chunks recuperados são os mesmos
+        """
+        self.capacidade_maxima = capacidade_maxima
+        self.ttl_segundos = ttl_segundos
+        self.limiar_com_chunks = limiar_com_chunks
+
+        # OrderedDict mantém ordem de uso para o LRU
+        self.entradas: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._proxima_chave = 0
+
+        # Chave textual (pergunta + contexto da conversa) -> chave da entrada
+        self._por_texto: Dict[str, int] = {}
+
+        # Matriz com os embeddings das entradas (uma linha por chave, na ordem de _chaves)
+        self._chaves: List[int] = []
+        self._matriz: Optional[np.ndarray] = None
+
+        # Lock para operações thread-safe
+        self.lock = threading.Lock()
+
+        # Estatísticas
+        self.hits_diretos = 0
+        self.hits_evidencias = 0
+        self.misses = 0
+        self.expirados = 0
+        self.invalidados = 0
+
+    @staticmethod
+    def _normalizar(embedding: List[float]) -> np.ndarray:
+        """Vetor float32 de norma 1 (produto escalar = cosseno)"""
+        vetor = np.asarray(embedding, dtype=np.float32)
+        norma = np.linalg.norm(vetor)
+        return vetor / norma if norma > 0 else vetor
+
+    @staticmethod
+    def ids_chunks(chunks: Iterable[Dict]) -> FrozenSet[str]:
+        """Identificadores estáveis dos chunks recuperados (fonte + id)"""
+        ids = set()
+        for chunk in chunks:
+            identificador = chunk.get('id')
+            if identificador is None:
+                identificador = f"{chunk.get('arquivo_origem', '')}#{chunk.get('chunk_numero', '')}"
+            ids.add(f"{chunk.get('fonte', 'reuniao')}:{identificador}")
+        return frozenset(ids)
+
+    @staticmethod
+    def hash_contexto(contexto_conversa: str = "") -> str:
+        """Hash do contexto da conversa enviado ao modelo junto com a pergunta"""
+        return hashlib.sha1((contexto_conversa or "").encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def chave_texto(pergunta: str, contexto_conversa: str = "") -> str:
+        """
+        Chave exata da pergunta: minúsculas, sem acentos, espaços e pontuação
+        final normalizados, mais um hash do contexto da conversa
+        """
+        texto = unicodedata.normalize('NFKD', pergunta.lower())
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        texto = _ESPACOS.sub(' ', texto).strip().rstrip('?!. ')
+        return f"{texto}|{CacheRespostas.hash_contexto(contexto_conversa)}"
+
+    def _reconstruir_matriz(self):
+        """Refaz a matriz de embeddings após inserções ou remoções"""
+        self._chaves = list(self.entradas.keys())
+        if self._chaves:
+            self._matriz = np.vstack([self.entradas[c]['embedding'] for c in self._chaves])
+        else:
+            self._matriz = None
+
+    def _descartar(self, chave: int, entrada: Dict[str, Any]):
+        """Tira a entrada do índice textual (se ainda apontar para ela)"""
+        if self._por_texto.get(entrada['chave_texto']) == chave:
+            del self._por_texto[entrada['chave_texto']]
+
+    def _remover(self, chaves: List[int]):
+        for chave in chaves:
+            entrada = self.entradas.pop(chave, None)
+            if entrada is not None:
+                self._descartar(chave, entrada)
+        self._reconstruir_matriz()
+
+    def _valida(self, chave: int, versao_dados: Any) -> bool:
+        """Remove a entrada se expirou ou é de outra versão dos dados"""
+        entrada = self.entradas[chave]
+        if entrada['versao_dados'] != versao_dados:
+            self.invalidados += 1
+        elif time.monotonic() - entrada['criado_em'] > self.ttl_segundos:
+            self.expirados += 1
+        else:
+            return True
+        self._remover([chave])
+        return False
+
+    def _candidatos(self, vetor: np.ndarray, versao_dados: Any, limiar: float) -> List[int]:
+        """
+        Chaves com similaridade >= limiar, da mais parecida para a menos
+
+        Entradas expiradas ou de outra versão dos dados são descartadas aqui.
+        """
+        if self._matriz is None:
+            return []
+
+        agora = time.monotonic()
+        descartar = []
+        for chave in self._chaves:
+            entrada = self.entradas[chave]
+            if entrada['versao_dados'] != versao_dados:
+                descartar.append(chave)
+                self.invalidados += 1
+            elif agora - entrada['criado_em'] > self.ttl_segundos:
+                descartar.append(chave)
+                self.expirados += 1
+        if descartar:
+            self._remover(descartar)
+            if self._matriz is None:
+                return []
+
+        similaridades = self._matriz @ vetor
+        ordem = np.argsort(-similaridades)
+        return [self._chaves[i] for i in ordem if similaridades[i] >= limiar]
+
+    def _hit(self, chave: int) -> Dict[str, Any]:
+        self.entradas.move_to_end(chave)
+        entrada = self.entradas[chave]
+        return {'resposta': entrada['resposta'], **entrada['extras']}
+
+    def obter_por_texto(self, chave_texto: str, versao_dados: Any) -> Optional[Dict[str, Any]]:
+        """
+        Consulta antes da busca: a mesma pergunta com o mesmo contexto de conversa
+
+        Args:
+            chave_texto: Chave gerada por chave_texto()
+
+        Returns:
+            Dicionário com 'resposta' e os extras guardados, ou None
+        """
+        with self.lock:
+            chave = self._por_texto.get(chave_texto)
+            if chave is None or not self._valida(chave, versao_dados):
+                return None
+            self.hits_diretos += 1
+            return self._hit(chave)
+
+    def obter_por_evidencias(self, embedding: List[float], ids_chunks: FrozenSet[str],
+                             versao_dados: Any, contexto_conversa: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Consulta depois da busca: pergunta parecida que recuperou os mesmos chunks
+        no mesmo ponto da conversa (a resposta depende do contexto enviado ao modelo)
+
+        Returns:
+            Dicionário com 'resposta' e os extras guardados, ou None (conta como miss)
+        """
+        vetor = self._normalizar(embedding)
+        contexto = self.hash_contexto(contexto_conversa)
+        with self.lock:
+            for chave in self._candidatos(vetor, versao_dados, self.limiar_com_chunks):
+                entrada = self.entradas[chave]
+                if entrada['ids_chunks'] == ids_chunks and entrada['contexto'] == contexto:
+                    self.hits_evidencias += 1
+                    return self._hit(chave)
+            self.misses += 1
+            return None
+
+    def guardar(self, pergunta: str, embedding: List[float], ids_chunks: FrozenSet[str],
+                resposta: str, versao_dados: Any, extras: Optional[Dict[str, Any]] = None,
+                contexto_conversa: str = ""):
+        """
+        Armazena uma resposta gerada (remove a menos usada se estiver cheio)
+
+        Args:
+            contexto_conversa: Contexto da conversa usado ao gerar a resposta
+            extras: Dados devolvidos junto com a resposta num hit (ex.: reuniões citadas)
+        """
+        with self.lock:
+            chave = self._proxima_chave
+            self._proxima_chave += 1
+            chave_texto = self.chave_texto(pergunta, contexto_conversa)
+            self.entradas[chave] = {
+                'pergunta': pergunta,
+                'chave_texto': chave_texto,
+                'contexto': self.hash_contexto(contexto_conversa),
+                'embedding': self._normalizar(embedding),
+                'ids_chunks': ids_chunks,
+                'resposta': resposta,
+                'versao_dados': versao_dados,
+                'extras': dict(extras or {}),
+                'criado_em': time.monotonic()
+            }
+            self._por_texto[chave_texto] = chave
+            while len(self.entradas) > self.capacidade_maxima:
+                self._descartar(*self.entradas.popitem(last=False))
+            self._reconstruir_matriz()
+
+    def invalidar(self):
+        """Descarta todas as respostas (ex.: após ingestão conhecida)"""
+        with self.lock:
+            self.invalidados += len(self.entradas)
+            self.entradas.clear()
+            self._por_texto.clear()
+            self._reconstruir_matriz()
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Obtém estatísticas de uso do cache"""
+        hits = self.hits_diretos + self.hits_evidencias
+        total_acessos = hits + self.misses
+        taxa_acerto = (hits / total_acessos * 100) if total_acessos > 0 else 0
+
+        return {
+            'total_entradas': len(self.entradas),
+            'capacidade_usada': f"{len(self.entradas) / self.capacidade_maxima * 100:.1f}%",
+            'total_acessos': total_acessos,
+            'hits': hits,
+            'hits_diretos': self.hits_diretos,
+            'hits_evidencias': self.hits_evidencias,
+            'misses': self.misses,
+            'expirados': self.expirados,
+            'invalidados': self.invalidados,
+            'taxa_acerto': f"{taxa_acerto:.1f}%"
+        }
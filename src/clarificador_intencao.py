@@ -3,11 +3,15 @@ Sistema de Clarificação de Intenção para Perguntas Ambíguas
 Detecta perguntas vagas e oferece opções específicas ao usuário
 """
 
-import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from .matcher_intencao import MatcherIntencao, SinaisPergunta, ESPACO
+except ImportError:
+    from matcher_intencao import MatcherIntencao, SinaisPergunta, ESPACO
+
 
 class TipoPergunta(Enum):
     """Tipos de pergunta identificados pelo sistema"""
@@ -36,25 +40,28 @@ class ClarificadorIntencao:
     
     def __init__(self):
         # Padrões para identificar tipos de pergunta
+        # (radicais = alternativas da antiga regex de cada tipo)
         self.padroes_pergunta = {
             TipoPergunta.INFORMACAO_SIMPLES: {
                 "palavras": ["o que é", "qual", "quando", "quem", "onde", "quanto"],
-                "regex": r"(o que é|qual|quando|quem|onde|quanto)\s+",
+                "radicais": ["o que é", "qual", "quando", "quem", "onde", "quanto"],
+                "seguido_de": ESPACO,
                 "peso": 0.8
             },
             TipoPergunta.ANALISE_COMPLEXA: {
                 "palavras": ["compare", "analise", "avalie", "projete", "identifique", "relacione"],
-                "regex": r"(compar|analis|avali|projet|identifi|relacion)",
+                "radicais": ["compar", "analis", "avali", "projet", "identifi", "relacion"],
                 "peso": 0.9
             },
             TipoPergunta.ACAO_ESPECIFICA: {
                 "palavras": ["liste", "mostre", "encontre", "busque", "extraia", "resuma"],
-                "regex": r"(list|mostr|encontr|busc|extra|resum)",
+                "radicais": ["list", "mostr", "encontr", "busc", "extra", "resum"],
                 "peso": 0.85
             },
             TipoPergunta.SAUDACAO: {
                 "palavras": ["oi", "olá", "bom dia", "boa tarde", "boa noite", "opa"],
-                "regex": r"^(oi|olá|bom dia|boa tarde|boa noite|opa)",
+                "radicais": ["oi", "olá", "bom dia", "boa tarde", "boa noite", "opa"],
+                "somente_inicio": True,
                 "peso": 0.95
             }
         }
@@ -121,12 +128,25 @@ class ClarificadorIntencao:
             "boa tarde": "Boa tarde! Em que posso ajudar?",
             "boa noite": "Boa noite! Como posso ser útil?"
         }
+        
+        # Todos os termos compilados uma vez num único autômato
+        self.matcher = MatcherIntencao(self.padroes_pergunta, self.perguntas_ambiguas)
+    
+    def analisar(self, pergunta: str) -> SinaisPergunta:
+        """Sinais da pergunta (tipo, ambiguidade, contexto temporal) em uma passada"""
+        return self.matcher.analisar(pergunta)
     
-    def classificar_pergunta(self, pergunta: str) -> ClassificacaoPergunta:
+    def classificar_pergunta(self, pergunta: str,
+                             sinais: Optional[SinaisPergunta] = None) -> ClassificacaoPergunta:
         """
         Classifica uma pergunta e determina se precisa clarificação
+        
+        Args:
+            pergunta: Pergunta do usuário
+            sinais: Análise já feita da pergunta (evita repetir a passada)
         """
-        pergunta_lower = pergunta.lower().strip()
+        sinais = sinais or self.matcher.analisar(pergunta)
+        pergunta_lower = sinais.texto
         
         # Verificar se é uma saudação simples
         if pergunta_lower in self.respostas_diretas:
@@ -137,17 +157,16 @@ class ClarificadorIntencao:
                 precisa_clarificacao=False
             )
         
-        # Verificar se é uma pergunta ambígua conhecida
-        for categoria, info in self.perguntas_ambiguas.items():
-            for variacao in info["variacoes"]:
-                if variacao in pergunta_lower or pergunta_lower in variacao:
-                    return ClassificacaoPergunta(
-                        tipo=TipoPergunta.AMBIGUA,
-                        confianca=0.9,
-                        palavras_chave=[variacao],
-                        precisa_clarificacao=True,
-                        sugestoes_clarificacao=info["sugestoes"]
-                    )
+        # Verificar se é uma pergunta ambígua conhecida (primeira variação na ordem)
+        if sinais.indice_variacao_ambigua is not None:
+            _, variacao, sugestoes = self.matcher.variacoes[sinais.indice_variacao_ambigua]
+            return ClassificacaoPergunta(
+                tipo=TipoPergunta.AMBIGUA,
+                confianca=0.9,
+                palavras_chave=[variacao],
+                precisa_clarificacao=True,
+                sugestoes_clarificacao=sugestoes
+            )
         
         # Tentar classificar por padrões
         melhor_tipo = TipoPergunta.AJUDA_GENERICA
@@ -155,11 +174,12 @@ class ClarificadorIntencao:
         palavras_encontradas = []
         
         for tipo, padrao in self.padroes_pergunta.items():
-            # Verificar palavras-chave
-            palavras_match = [p for p in padrao["palavras"] if p in pergunta_lower]
+            # Verificar palavras-chave (na ordem da lista)
+            encontradas = sinais.palavras_por_tipo.get(tipo, ())
+            palavras_match = [p for p in padrao["palavras"] if p in encontradas]
             
-            # Verificar regex
-            regex_match = re.search(padrao["regex"], pergunta_lower, re.IGNORECASE)
+            # Verificar radicais
+            regex_match = tipo in sinais.tipos_por_radical
             
             # Calcular confiança
             confianca = 0.0
@@ -176,7 +196,7 @@ class ClarificadorIntencao:
         # Determinar se precisa clarificação
         precisa_clarificacao = (
             melhor_confianca < 0.5 or 
-            len(pergunta_lower.split()) <= 2 or
+            sinais.num_palavras <= 2 or
             melhor_tipo == TipoPergunta.AJUDA_GENERICA
         )
         
@@ -211,7 +231,8 @@ class ClarificadorIntencao:
 
 Por favor, reformule sua pergunta com mais detalhes."""
     
-    def processar_pergunta(self, pergunta: str) -> Tuple[bool, Optional[str]]:
+    def processar_pergunta(self, pergunta: str,
+                           sinais: Optional[SinaisPergunta] = None) -> Tuple[bool, Optional[str]]:
         """
         Processa uma pergunta e retorna se precisa clarificação e a mensagem
         
@@ -219,7 +240,7 @@ Por favor, reformule sua pergunta com mais detalhes."""
             (precisa_clarificacao, mensagem_clarificacao)
         """
         # Classificar a pergunta
-        classificacao = self.classificar_pergunta(pergunta)
+        classificacao = self.classificar_pergunta(pergunta, sinais)
         
         # Se precisa clarificação, gerar resposta
         if classificacao.precisa_clarificacao:
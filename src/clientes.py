@@ -0,0 +1,169 @@
+"""
+Registro compartilhado de clientes OpenAI e Supabase
+Um único cliente por serviço para todo o processo, criado só quando usado
+- Pool de conexões keep-alive reaproveitado entre componentes e threads
+- Timeouts e retentativas configurados em um só lugar (.env)
+- Componentes recebem o registro por injeção; sem ele, usam o global
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import OpenAI
+from supabase import create_client, Client
+
+try:
+    from supabase.lib.client_options import ClientOptions
+except ImportError:
+    ClientOptions = None
+
+# Chaves Supabase disponíveis (nome lógico -> variável de ambiente)
+CHAVES_SUPABASE = {
+    'service_role': 'SUPABASE_SERVICE_ROLE_KEY',
+    'anon': 'SUPABASE_ANON_KEY'
+}
+
+
+class RegistroClientes:
+    """
+    Guarda os clientes de API do processo
+
+    `openai()` e `supabase(chave)` constroem o cliente na primeira chamada e
+    devolvem sempre a mesma instância depois. Os clientes são thread-safe,
+    então as conexões abertas por uma pergunta ficam quentes para a próxima.
+
+    Os componentes guardam a instância recebida, então `fechar()` é
+    definitivo: depois dele o registro recusa novos pedidos, e
+    `obter_registro_clientes()` passa a criar um registro novo.
+    """
+
+    def __init__(self, timeout_openai_s: float = 60.0, tentativas_openai: int = 2,
+                 timeout_supabase_s: float = 30.0, max_conexoes: int = 20,
+                 max_conexoes_ociosas: int = 10, keepalive_s: float = 60.0):
+        """
+        Args:
+            timeout_openai_s: Timeout de cada requisição à OpenAI
+            tentativas_openai: Retentativas automáticas da biblioteca da OpenAI
+            timeout_supabase_s: Timeout das consultas ao Supabase (PostgREST)
+            max_conexoes: Conexões simultâneas no pool HTTP da OpenAI
+            max_conexoes_ociosas: Conexões mantidas abertas entre requisições
+            keepalive_s: Tempo que uma conexão ociosa fica aberta
+        """
+        self.timeout_openai_s = timeout_openai_s
+        self.tentativas_openai = tentativas_openai
+        self.timeout_supabase_s = timeout_supabase_s
+        self.max_conexoes = max_conexoes
+        self.max_conexoes_ociosas = max_conexoes_ociosas
+        self.keepalive_s = keepalive_s
+
+        self._openai: Optional[OpenAI] = None
+        self._http_openai: Optional[httpx.Client] = None
+        self._supabase: Dict[str, Client] = {}
+        self._fechado = False
+
+        # Lock para criação thread-safe
+        self.lock = threading.Lock()
+
+    def openai(self, timeout_s: Optional[float] = None, max_retries: Optional[int] = None) -> OpenAI:
+        """
+        Cliente OpenAI compartilhado (criado na primeira chamada)
+
+        Args:
+            timeout_s: Timeout próprio (ex.: upload de áudio); usa o mesmo pool de conexões
+            max_retries: Tentativas próprias da biblioteca (0 quando quem chama já repete)
+        """
+        cliente = self._obter_openai()
+        opcoes = {}
+        if timeout_s:
+            opcoes['timeout'] = timeout_s
+        if max_retries is not None:
+            opcoes['max_retries'] = max_retries
+        return cliente.with_options(**opcoes) if opcoes else cliente
+
+    @property
+    def fechado(self) -> bool:
+        return self._fechado
+
+    def _verificar_aberto(self):
+        if self._fechado:
+            raise RuntimeError("Registro de clientes já foi fechado; crie um novo registro")
+
+    def _obter_openai(self) -> OpenAI:
+        with self.lock:
+            self._verificar_aberto()
+            if self._openai is None:
+                api_key = os.getenv('OPENAI_API_KEY')
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY não encontrada no .env")
+
+                self._http_openai = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_conexoes,
+                        max_keepalive_connections=self.max_conexoes_ociosas,
+                        keepalive_expiry=self.keepalive_s
+                    ),
+                    timeout=self.timeout_openai_s
+                )
+                self._openai = OpenAI(
+                    api_key=api_key,
+                    timeout=self.timeout_openai_s,
+                    max_retries=self.tentativas_openai,
+                    http_client=self._http_openai
+                )
+            return self._openai
+
+    def supabase(self, chave: str = 'service_role') -> Client:
+        """
+        Cliente Supabase compartilhado para a chave indicada
+
+        Args:
+            chave: 'service_role' (ingestão e busca) ou 'anon' (login e backend)
+        """
+        with self.lock:
+            self._verificar_aberto()
+            if chave not in self._supabase:
+                url = os.getenv('SUPABASE_URL')
+                key = os.getenv(CHAVES_SUPABASE[chave])
+                if not url or not key:
+                    raise ValueError("Credenciais Supabase não encontradas no .env")
+
+                if ClientOptions is not None:
+                    opcoes = ClientOptions(postgrest_client_timeout=self.timeout_supabase_s)
+                    self._supabase[chave] = create_client(url, key, options=opcoes)
+                else:
+                    self._supabase[chave] = create_client(url, key)
+            return self._supabase[chave]
+
+    def fechar(self):
+        """
+        Fecha o pool HTTP da OpenAI no encerramento do processo
+
+        Definitivo: clientes já entregues deixam de funcionar e o registro não
+        cria outros (openai()/supabase() levantam RuntimeError).
+        """
+        with self.lock:
+            self._fechado = True
+            if self._http_openai is not None:
+                self._http_openai.close()
+            self._http_openai = None
+            self._openai = None
+
+
+# Instância global do registro (compartilhada por todos os componentes)
+_registro_clientes: Optional[RegistroClientes] = None
+_lock_registro = threading.Lock()
+
+def obter_registro_clientes() -> RegistroClientes:
+    """Obtém ou cria o registro global de clientes (um novo se o anterior foi fechado)"""
+    global _registro_clientes
+    with _lock_registro:
+        if _registro_clientes is None or _registro_clientes.fechado:
+            _registro_clientes = RegistroClientes(
+                timeout_openai_s=float(os.getenv('OPENAI_TIMEOUT_S', '60')),
+                tentativas_openai=int(os.getenv('OPENAI_MAX_RETRIES', '2')),
+                timeout_supabase_s=float(os.getenv('SUPABASE_TIMEOUT_S', '30')),
+                max_conexoes=int(os.getenv('HTTP_MAX_CONEXOES', '20'))
+            )
+    return _registro_clientes
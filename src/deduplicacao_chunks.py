@@ -0,0 +1,51 @@
+"""
+Deduplicação de chunks por conteúdo (content-addressed)
+Compara os chunks de uma nova versão com os já salvos para reaproveitar
+embeddings: só chunks novos ou alterados precisam ser embeddados
+"""
+
+import hashlib
+from typing import List, Dict, Any, Callable, Tuple
+
+
+def calcular_hash_chunk(texto: str) -> str:
+    """Calcula o hash SHA256 do conteúdo de um chunk"""
+    return hashlib.sha256(texto.strip().encode()).hexdigest()
+
+
+def planejar_reingestao(chunks_novos: List[Dict[str, Any]],
+                        existentes: List[Dict[str, Any]],
+                        texto_novo: Callable[[Dict[str, Any]], str],
+                        texto_existente: Callable[[Dict[str, Any]], str]
+                        ) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Separa os chunks em novos, mantidos e removidos
+
+    Chunks repetidos são pareados um a um (um texto que aparece duas vezes
+    no documento precisa de duas linhas salvas).
+
+    Args:
+        chunks_novos: Chunks da versão atual do documento
+        existentes: Linhas já salvas no banco para o mesmo documento
+        texto_novo: Extrai o texto de um chunk novo
+        texto_existente: Extrai o texto de uma linha existente
+
+    Returns:
+        (a_inserir, mantidos como pares (chunk_novo, linha_existente), a_remover)
+    """
+    existentes_por_hash: Dict[str, List[Dict[str, Any]]] = {}
+    for linha in existentes:
+        existentes_por_hash.setdefault(calcular_hash_chunk(texto_existente(linha) or ''), []).append(linha)
+
+    a_inserir = []
+    mantidos = []
+    for chunk in chunks_novos:
+        candidatos = existentes_por_hash.get(calcular_hash_chunk(texto_novo(chunk)))
+        if candidatos:
+            mantidos.append((chunk, candidatos.pop(0)))
+        else:
+            a_inserir.append(chunk)
+
+    a_remover = [linha for linhas in existentes_por_hash.values() for linha in linhas]
+
+    return a_inserir, mantidos, a_remover
@@ -6,89 +6,137 @@ Transforma arquivos de texto em embeddings e salva no Supabase
 import os
 import re
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import hashlib
+import threading
 
-from openai import OpenAI
-from supabase import create_client, Client
+from supabase import Client
 import numpy as np
 from dotenv import load_dotenv
 
+try:
+    from .lotes_embeddings import dividir_em_lotes, gerar_embeddings_lote
+    from .ingestao_paralela import obter_limitador_openai, processar_arquivos_em_paralelo
+    from .deduplicacao_chunks import planejar_reingestao
+    from .clientes import RegistroClientes, obter_registro_clientes
+except ImportError:
+    from lotes_embeddings import dividir_em_lotes, gerar_embeddings_lote
+    from ingestao_paralela import obter_limitador_openai, processar_arquivos_em_paralelo
+    from deduplicacao_chunks import planejar_reingestao
+    from clientes import RegistroClientes, obter_registro_clientes
+
 load_dotenv()
 
-class ProcessadorEmbeddings:
-    def __init__(self):
-        # Configurar OpenAI
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY não encontrada no .env")
-        self.client = OpenAI(api_key=self.openai_api_key)
-        
-        # Configurar Supabase
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("Credenciais Supabase não encontradas no .env")
-        
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+class ChunkerIncremental:
+    """
+    Divide texto em chunks por sentenças, com sobreposição, à medida que chega
+    
+    O texto pode ser entregue em partes (ex.: segmentos transcritos): a última
+    sentença de cada parte fica pendente até a próxima ou até `finalizar`.
+    Entregar o texto inteiro de uma vez gera os mesmos chunks.
+    """
+    
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+        self.chunk_size = chunk_size  # palavras por chunk
+        self.chunk_overlap = chunk_overlap  # palavras de sobreposição
         
-        # Configurações de chunking
-        self.chunk_size = 500  # palavras por chunk
-        self.chunk_overlap = 50  # palavras de sobreposição
+        self._chunk_atual: List[str] = []
+        self._palavras_no_chunk = 0
+        self._pendente = ''
+        self._total = 0
         
-    def criar_chunks_inteligentes(self, texto: str) -> List[Dict[str, any]]:
-        """
-        Cria chunks inteligentes do texto, preservando contexto
-        """
-        # Limpar e normalizar texto
+    def adicionar(self, texto: str) -> List[Dict[str, any]]:
+        """Recebe mais texto e retorna os chunks que ficaram completos"""
         texto = texto.strip()
+        if self._pendente:
+            texto = f"{self._pendente}\n{texto}"
         
         # Dividir em sentenças
         sentencas = re.split(r'(?<=[.!?])\s+', texto)
+        self._pendente = sentencas.pop()
+        return self._processar_sentencas(sentencas)
+        
+    def finalizar(self) -> List[Dict[str, any]]:
+        """Fecha o texto pendente e retorna os últimos chunks"""
+        sentencas = [self._pendente] if self._pendente else []
+        self._pendente = ''
+        chunks = self._processar_sentencas(sentencas)
         
+        # Adicionar último chunk
+        if self._chunk_atual:
+            chunks.append(self._criar_chunk())
+            self._chunk_atual = []
+            self._palavras_no_chunk = 0
+        return chunks
+        
+    def _criar_chunk(self) -> Dict[str, any]:
+        self._total += 1
+        return {
+            'texto': ' '.join(self._chunk_atual),
+            'numero': self._total
+        }
+        
+    def _processar_sentencas(self, sentencas: List[str]) -> List[Dict[str, any]]:
         chunks = []
-        chunk_atual = []
-        palavras_no_chunk = 0
         
         for sentenca in sentencas:
             palavras_sentenca = len(sentenca.split())
             
             # Se adicionar essa sentença exceder o tamanho do chunk
-            if palavras_no_chunk + palavras_sentenca > self.chunk_size and chunk_atual:
+            if self._palavras_no_chunk + palavras_sentenca > self.chunk_size and self._chunk_atual:
                 # Criar chunk
-                chunk_texto = ' '.join(chunk_atual)
-                chunks.append({
-                    'texto': chunk_texto,
-                    'numero': len(chunks) + 1
-                })
+                chunks.append(self._criar_chunk())
                 
                 # Manter overlap - pegar últimas sentenças
                 palavras_overlap = 0
                 chunk_overlap = []
-                for i in range(len(chunk_atual) - 1, -1, -1):
-                    sent_palavras = len(chunk_atual[i].split())
+                for i in range(len(self._chunk_atual) - 1, -1, -1):
+                    sent_palavras = len(self._chunk_atual[i].split())
                     if palavras_overlap + sent_palavras <= self.chunk_overlap:
-                        chunk_overlap.insert(0, chunk_atual[i])
+                        chunk_overlap.insert(0, self._chunk_atual[i])
                         palavras_overlap += sent_palavras
                     else:
                         break
                 
-                chunk_atual = chunk_overlap
-                palavras_no_chunk = palavras_overlap
+                self._chunk_atual = chunk_overlap
+                self._palavras_no_chunk = palavras_overlap
             
-            chunk_atual.append(sentenca)
-            palavras_no_chunk += palavras_sentenca
-        
-        # Adicionar último chunk
-        if chunk_atual:
-            chunk_texto = ' '.join(chunk_atual)
-            chunks.append({
-                'texto': chunk_texto,
-                'numero': len(chunks) + 1
-            })
+            self._chunk_atual.append(sentenca)
+            self._palavras_no_chunk += palavras_sentenca
         
         return chunks
+
+
+class ProcessadorEmbeddings:
+    def __init__(self, clientes: Optional[RegistroClientes] = None):
+        # Clientes OpenAI e Supabase compartilhados (pool de conexões keep-alive)
+        clientes = clientes or obter_registro_clientes()
+        self.client = clientes.openai()
+        self.supabase: Client = clientes.supabase('service_role')
+        
+        # Configurações de chunking
+        self.chunk_size = 500  # palavras por chunk
+        self.chunk_overlap = 50  # palavras de sobreposição
+        
+        # Configurações de lote (embeddings e inserção)
+        self.embedding_model = "text-embedding-ada-002"
+        self.max_tokens_lote = 100_000  # tokens estimados por requisição
+        self.max_itens_lote = 100  # chunks por requisição/inserção
+        
+        # Limite de taxa compartilhado para a OpenAI (requisições/tokens por minuto)
+        self.limitador = obter_limitador_openai()
+        
+        # Embeddings evitados por deduplicação de chunks (acumulado, thread-safe)
+        self.embeddings_economizados = 0
+        self._lock_estatisticas = threading.Lock()
+        
+    def criar_chunks_inteligentes(self, texto: str) -> List[Dict[str, any]]:
+        """
+        Cria chunks inteligentes do texto, preservando contexto
+        """
+        chunker = ChunkerIncremental(self.chunk_size, self.chunk_overlap)
+        return chunker.adicionar(texto) + chunker.finalizar()
     
     def extrair_metadados_completos(self, texto: str, nome_arquivo: str) -> Dict:
         """
@@ -152,13 +200,32 @@ class ProcessadorEmbeddings:
         
         return metadados
     
+    def campos_reuniao(self, metadados: Dict) -> Dict:
+        """Campos da reunião comuns a todos os chunks (prontos para o banco)"""
+        # Converter data para string nos metadados
+        metadados_json = metadados.copy()
+        if 'data_reuniao' in metadados_json:
+            metadados_json['data_reuniao'] = str(metadados_json['data_reuniao'])
+        
+        campos = {
+            'metadados': metadados_json,
+            'titulo': metadados.get('titulo', ''),
+            'responsavel': metadados.get('responsavel', ''),
+            'observacoes': metadados.get('observacoes', '')
+        }
+        if metadados.get('data_reuniao'):
+            campos['data_reuniao'] = str(metadados['data_reuniao'])
+        if metadados.get('hora_inicio'):
+            campos['hora_inicio'] = metadados['hora_inicio']
+        return campos
+    
     def gerar_embedding(self, texto: str) -> List[float]:
         """
         Gera embedding usando OpenAI
         """
         try:
             response = self.client.embeddings.create(
-                model="text-embedding-ada-002",
+                model=self.embedding_model,
                 input=texto
             )
             return response.data[0].embedding
@@ -166,6 +233,96 @@ class ProcessadorEmbeddings:
             print(f"Erro ao gerar embedding: {e}")
             raise
     
+    def _obter_chunks_existentes(self, nome_arquivo: str) -> List[Dict]:
+        """Obtém os chunks já salvos de um arquivo de reunião"""
+        try:
+            resultado = self.supabase.table('reunioes_embbed').select(
+                'id, chunk_texto, chunk_numero'
+            ).eq('arquivo_origem', nome_arquivo).execute()
+            return resultado.data or []
+        except Exception as e:
+            print(f"⚠️  Não foi possível consultar chunks existentes: {e}")
+            return []
+    
+    def _atualizar_chunks_mantidos(self, mantidos: List[Tuple[Dict, Dict]], campos_reuniao: Dict):
+        """Atualiza metadados da reunião nos chunks reaproveitados e corrige a numeração"""
+        if not mantidos:
+            return
+        
+        try:
+            # Uma única atualização para os metadados comuns da reunião
+            self.supabase.table('reunioes_embbed').update(campos_reuniao).in_(
+                'id', [existente['id'] for _, existente in mantidos]
+            ).execute()
+        except Exception as e:
+            print(f"⚠️  Erro ao atualizar metadados dos chunks reaproveitados: {e}")
+        
+        # Apenas chunks que mudaram de posição precisam de atualização própria
+        for chunk, existente in mantidos:
+            if chunk['numero'] == existente.get('chunk_numero'):
+                continue
+            try:
+                self.supabase.table('reunioes_embbed').update({
+                    'chunk_numero': chunk['numero']
+                }).eq('id', existente['id']).execute()
+            except Exception as e:
+                print(f"Erro ao renumerar chunk {chunk['numero']}: {e}")
+    
+    def _remover_chunks(self, ids: List) -> int:
+        """Remove os chunks que saíram da reunião (reunioes_embbed não tem coluna ativo)"""
+        if not ids:
+            return 0
+        
+        try:
+            self.supabase.table('reunioes_embbed').delete().in_('id', ids).execute()
+            return len(ids)
+        except Exception as e:
+            print(f"⚠️  Erro ao remover chunks antigos: {e}")
+            return 0
+    
+    def montar_linha(self, nome_arquivo: str, chunk: Dict, embedding: List[float],
+                     campos_reuniao: Dict) -> Dict:
+        """Monta a linha de reunioes_embbed para um chunk"""
+        # Não converter embedding para string
+        return {
+            'arquivo_origem': nome_arquivo,
+            'chunk_numero': chunk['numero'],
+            'chunk_texto': chunk['texto'],
+            'embedding': embedding,  # Array direto
+            **campos_reuniao
+        }
+    
+    def _inserir_lote(self, linhas: List[Dict]) -> int:
+        """
+        Insere um lote de chunks com uma única requisição
+        
+        Se a inserção em lote falhar, insere linha a linha para saber
+        exatamente quais chunks falharam.
+        
+        Returns:
+            Número de chunks inseridos
+        """
+        if not linhas:
+            return 0
+        
+        try:
+            self.supabase.table('reunioes_embbed').insert(linhas).execute()
+            numeros = [linha['chunk_numero'] for linha in linhas]
+            print(f"Chunks {numeros[0]}-{numeros[-1]} inseridos com sucesso")
+            return len(linhas)
+        except Exception as e:
+            print(f"⚠️  Inserção em lote falhou ({e}); inserindo chunk a chunk")
+        
+        inseridos = 0
+        for linha in linhas:
+            try:
+                self.supabase.table('reunioes_embbed').insert(linha).execute()
+                print(f"Chunk {linha['chunk_numero']} inserido com sucesso")
+                inseridos += 1
+            except Exception as e:
+                print(f"Erro ao processar chunk {linha['chunk_numero']}: {e}")
+        return inseridos
+    
     def processar_arquivo(self, caminho_arquivo: str, excluir_apos_processar: bool = False) -> bool:
         """
         Processa um arquivo de reunião completo
@@ -195,59 +352,57 @@ class ProcessadorEmbeddings:
         
         # Extrair metadados completos do cabeçalho
         metadados = self.extrair_metadados_completos(texto_completo, nome_arquivo)
-        
-        # Extrair campos específicos
-        titulo = metadados.get('titulo', '')
-        responsavel = metadados.get('responsavel', '')
-        data_reuniao = metadados.get('data_reuniao')
-        hora_inicio = metadados.get('hora_inicio', '')
-        observacoes = metadados.get('observacoes', '')
+        campos_reuniao = self.campos_reuniao(metadados)
         
         # Criar chunks
         chunks = self.criar_chunks_inteligentes(texto_completo)
         print(f"Criados {len(chunks)} chunks")
         
-        # Processar cada chunk
+        # Deduplicação por conteúdo contra chunks já salvos deste arquivo
+        existentes = self._obter_chunks_existentes(nome_arquivo)
+        chunks_a_inserir, mantidos, removidos = planejar_reingestao(
+            chunks, existentes, lambda c: c['texto'], lambda l: l.get('chunk_texto')
+        )
+        if existentes:
+            print(f"♻️  {len(mantidos)} chunks reaproveitados (embeddings economizados) | "
+                  f"{len(chunks_a_inserir)} novos/alterados | {len(removidos)} removidos")
+            with self._lock_estatisticas:
+                self.embeddings_economizados += len(mantidos)
+            
+            self._atualizar_chunks_mantidos(mantidos, campos_reuniao)
+        
+        # Processar em lotes: um pedido de embeddings e uma inserção por lote
         chunks_processados = 0
-        for chunk in chunks:
+        for lote in dividir_em_lotes(chunks_a_inserir, lambda c: c['texto'],
+                                     self.max_tokens_lote, self.max_itens_lote):
             try:
-                # Gerar embedding
-                embedding = self.gerar_embedding(chunk['texto'])
-                
-                # Preparar dados para inserção
-                # Converter data para string nos metadados
-                metadados_json = metadados.copy()
-                if 'data_reuniao' in metadados_json:
-                    metadados_json['data_reuniao'] = str(metadados_json['data_reuniao'])
-                
-                # Não converter embedding para string
-                dados = {
-                    'arquivo_origem': nome_arquivo,
-                    'chunk_numero': chunk['numero'],
-                    'chunk_texto': chunk['texto'],
-                    'embedding': embedding,  # Array direto
-                    'metadados': metadados_json,
-                    'titulo': titulo,
-                    'responsavel': responsavel,
-                    'observacoes': observacoes
-                }
-                
-                if data_reuniao:
-                    dados['data_reuniao'] = str(data_reuniao)
-                
-                if hora_inicio:
-                    dados['hora_inicio'] = hora_inicio
-                
-                # Inserir no Supabase
-                resultado = self.supabase.table('reunioes_embbed').insert(dados).execute()
-                print(f"Chunk {chunk['numero']} inserido com sucesso")
-                chunks_processados += 1
-                
+                embeddings = gerar_embeddings_lote(
+                    self.client, self.embedding_model, [c['texto'] for c in lote],
+                    limitador=self.limitador
+                )
             except Exception as e:
-                print(f"Erro ao processar chunk {chunk['numero']}: {e}")
+                for chunk in lote:
+                    print(f"Erro ao processar chunk {chunk['numero']}: {e}")
+                continue
+            
+            linhas = [
+                self.montar_linha(nome_arquivo, chunk, embedding, campos_reuniao)
+                for chunk, embedding in zip(lote, embeddings)
+            ]
+            
+            chunks_processados += self._inserir_lote(linhas)
+        
+        print(f"✅ {chunks_processados}/{len(chunks_a_inserir)} chunks inseridos")
+        
+        # Só remover o conteúdo antigo depois que o novo foi todo gravado
+        if removidos:
+            if chunks_processados == len(chunks_a_inserir):
+                self._remover_chunks([linha['id'] for linha in removidos])
+            else:
+                print(f"⚠️  Inserção incompleta: {len(removidos)} chunks antigos mantidos até a próxima ingestão")
         
         # Se processado com sucesso e deve excluir
-        sucesso = chunks_processados > 0
+        sucesso = chunks_processados + len(mantidos) > 0
         
         if sucesso and excluir_apos_processar:
             try:
@@ -258,22 +413,33 @@ class ProcessadorEmbeddings:
         
         return sucesso
     
-    def processar_pasta(self, caminho_pasta: str):
+    def processar_pasta(self, caminho_pasta: str, max_workers: int = 4) -> List[Dict]:
         """
-        Processa todos os arquivos .txt em uma pasta
+        Processa todos os arquivos .txt em uma pasta (em paralelo)
+        
+        Args:
+            caminho_pasta: Pasta com os arquivos de reunião
+            max_workers: Número máximo de arquivos processados ao mesmo tempo
+            
+        Returns:
+            Lista com um registro de resultado por arquivo
         """
         pasta = Path(caminho_pasta)
         if not pasta.exists():
             print(f"Pasta não encontrada: {caminho_pasta}")
-            return
+            return []
         
-        arquivos_txt = list(pasta.glob("*.txt"))
+        arquivos_txt = sorted(pasta.glob("*.txt"))
         print(f"Encontrados {len(arquivos_txt)} arquivos .txt")
         
-        for arquivo in arquivos_txt:
-            self.processar_arquivo(str(arquivo))
+        economizados_antes = self.embeddings_economizados
+        registros = processar_arquivos_em_paralelo(arquivos_txt, self.processar_arquivo, max_workers)
         
+        economizados = self.embeddings_economizados - economizados_antes
+        if economizados:
+            print(f"♻️  {economizados} chamadas de embedding economizadas por deduplicação")
         print("Processamento concluído!")
+        return registros
 
 # Função auxiliar para verificar arquivos já processados
 def verificar_arquivo_processado(supabase: Client, nome_arquivo: str) -> bool:
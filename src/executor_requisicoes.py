@@ -0,0 +1,253 @@
+"""
+Executor de perguntas do backend
+Atende as perguntas do chat com um número fixo de workers e uma fila limitada
+- Pool limitado: nunca mais perguntas simultâneas que o configurado
+- Fila com limite: quando cheia, a pergunta é recusada na hora
+- Pergunta nova de uma sessão substitui a anterior ainda pendente ou em andamento
+- Latência de cada pergunta (fila, primeiro trecho, total) e encerramento limpo
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Marca o fim do trabalho para os workers
+_FIM = object()
+
+
+@dataclass
+class RequisicaoChat:
+    """Uma pergunta enviada ao backend e seus tempos"""
+    sessao: str
+    mensagem: str
+    callback: Callable[[str], None]
+    error_callback: Callable[[str], None]
+    token_callback: Optional[Callable[[str], None]] = None
+    enfileirada_em: float = field(default_factory=time.monotonic)
+    iniciada_em: Optional[float] = None
+    primeiro_trecho_em: Optional[float] = None
+    concluida_em: Optional[float] = None
+    cancelada: bool = False
+
+    def cancelar(self):
+        """Marca a pergunta como substituída (para no próximo trecho)"""
+        self.cancelada = True
+
+    def latencias(self) -> Dict[str, Optional[float]]:
+        """Tempos em segundos: espera na fila, até o primeiro trecho e total"""
+        def _intervalo(inicio, fim):
+            return round(fim - inicio, 3) if inicio is not None and fim is not None else None
+
+        return {
+            'espera_fila': _intervalo(self.enfileirada_em, self.iniciada_em),
+            'primeiro_trecho': _intervalo(self.enfileirada_em, self.primeiro_trecho_em),
+            'total': _intervalo(self.enfileirada_em, self.concluida_em)
+        }
+
+
+def _percentil(valores: List[float], percentual: float) -> Optional[float]:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(percentual / 100 * (len(ordenados) - 1))))
+    return round(ordenados[indice], 3)
+
+
+class ExecutorRequisicoes:
+    """
+    Pool limitado de workers que respondem perguntas em streaming
+
+    `processar(mensagem, sessao)` deve retornar um iterador de trechos da
+    resposta (a sessão separa a memória de conversa de cada janela/usuário).
+    Cada sessão (janela, usuário) tem no máximo uma pergunta ativa: uma nova
+    pergunta cancela a anterior, que deixa de receber callbacks.
+    """
+
+    def __init__(self, processar: Callable[[str, str], Iterator[str]], max_workers: int = 2,
+                 tamanho_fila: int = 16, historico_latencias: int = 200):
+        """
+        Args:
+            processar: Função que recebe a pergunta e a sessão e gera os trechos da resposta
+            max_workers: Perguntas respondidas ao mesmo tempo
+            tamanho_fila: Perguntas aguardando worker antes de recusar novas
+            historico_latencias: Quantas latências recentes entram nas estatísticas
+        """
+        self.processar = processar
+        self.max_workers = max_workers
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+
+        # Pergunta ativa (na fila ou em andamento) de cada sessão
+        self._ativas: Dict[str, RequisicaoChat] = {}
+        self._em_andamento = 0
+        self._encerrado = False
+
+        # Lock para operações thread-safe
+        self.lock = threading.Lock()
+
+        # Estatísticas
+        self.enviadas = 0
+        self.concluidas = 0
+        self.canceladas = 0
+        self.recusadas = 0
+        self.erros = 0
+        self._latencias_total = deque(maxlen=historico_latencias)
+        self._latencias_primeiro = deque(maxlen=historico_latencias)
+        self._latencias_fila = deque(maxlen=historico_latencias)
+
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'auralis-chat-{i}', daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def enviar(self, sessao: str, mensagem: str, callback: Callable[[str], None],
+               error_callback: Callable[[str], None],
+               token_callback: Optional[Callable[[str], None]] = None) -> Optional[RequisicaoChat]:
+        """
+        Coloca uma pergunta na fila (não bloqueia)
+
+        Returns:
+            A requisição criada, ou None se foi recusada (error_callback é chamado)
+        """
+        requisicao = RequisicaoChat(sessao, mensagem, callback, error_callback, token_callback)
+
+        with self.lock:
+            if self._encerrado:
+                motivo = "O backend está sendo encerrado"
+            else:
+                try:
+                    self._fila.put_nowait(requisicao)
+                    motivo = None
+                except queue.Full:
+                    motivo = "Muitas perguntas em andamento. Tente novamente em instantes."
+
+            if motivo is None:
+                anterior = self._ativas.get(sessao)
+                if anterior is not None:
+                    anterior.cancelar()
+                    self.canceladas += 1
+                self._ativas[sessao] = requisicao
+                self.enviadas += 1
+            else:
+                self.recusadas += 1
+
+        if motivo is not None:
+            print(f"⚠️  Pergunta recusada: {motivo}")
+            error_callback(motivo)
+            return None
+        return requisicao
+
+    def _worker(self):
+        while True:
+            requisicao = self._fila.get()
+            if requisicao is _FIM:
+                return
+            if requisicao.cancelada:
+                continue
+
+            with self.lock:
+                self._em_andamento += 1
+            try:
+                self._executar(requisicao)
+            finally:
+                with self.lock:
+                    self._em_andamento -= 1
+                    if self._ativas.get(requisicao.sessao) is requisicao:
+                        del self._ativas[requisicao.sessao]
+
+    def _executar(self, requisicao: RequisicaoChat):
+        """Responde uma pergunta, parando se ela for substituída"""
+        requisicao.iniciada_em = time.monotonic()
+        partes = []
+        fluxo = None
+
+        try:
+            fluxo = self.processar(requisicao.mensagem, requisicao.sessao)
+            for trecho in fluxo:
+                if requisicao.cancelada:
+                    break
+                if requisicao.primeiro_trecho_em is None:
+                    requisicao.primeiro_trecho_em = time.monotonic()
+                partes.append(trecho)
+                if requisicao.token_callback is not None:
+                    requisicao.token_callback(trecho)
+        except Exception as e:
+            if not requisicao.cancelada:
+                with self.lock:
+                    self.erros += 1
+                requisicao.error_callback(str(e))
+            return
+        finally:
+            # Interrompe a geração (e a conexão com a API) se a pergunta foi substituída
+            if fluxo is not None and hasattr(fluxo, 'close'):
+                fluxo.close()
+
+        if requisicao.cancelada:
+            print(f"⏭️  Pergunta substituída por outra mais recente: {requisicao.mensagem[:40]}")
+            return
+
+        requisicao.concluida_em = time.monotonic()
+        latencias = requisicao.latencias()
+        with self.lock:
+            self.concluidas += 1
+            self._latencias_total.append(latencias['total'])
+            self._latencias_fila.append(latencias['espera_fila'])
+            if latencias['primeiro_trecho'] is not None:
+                self._latencias_primeiro.append(latencias['primeiro_trecho'])
+
+        print(f"⏱️  Pergunta respondida em {latencias['total']:.2f}s "
+              f"(fila {latencias['espera_fila']:.2f}s, primeiro trecho {latencias['primeiro_trecho'] or 0:.2f}s)")
+        requisicao.callback("".join(partes))
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Contagens e latências recentes (p50/p95, em segundos)"""
+        with self.lock:
+            total = list(self._latencias_total)
+            primeiro = list(self._latencias_primeiro)
+            fila = list(self._latencias_fila)
+            return {
+                'workers': self.max_workers,
+                'em_fila': self._fila.qsize(),
+                'em_andamento': self._em_andamento,
+                'enviadas': self.enviadas,
+                'concluidas': self.concluidas,
+                'canceladas': self.canceladas,
+                'recusadas': self.recusadas,
+                'erros': self.erros,
+                'latencia_total_p50': _percentil(total, 50),
+                'latencia_total_p95': _percentil(total, 95),
+                'primeiro_trecho_p50': _percentil(primeiro, 50),
+                'primeiro_trecho_p95': _percentil(primeiro, 95),
+                'espera_fila_p95': _percentil(fila, 95)
+            }
+
+    def encerrar(self, timeout: Optional[float] = 10.0):
+        """
+        Para de aceitar perguntas, cancela as pendentes e aguarda os workers
+
+        Perguntas em andamento são interrompidas no próximo trecho.
+        """
+        with self.lock:
+            if self._encerrado:
+                return
+            self._encerrado = True
+            for requisicao in self._ativas.values():
+                requisicao.cancelar()
+            self._ativas.clear()
+
+        # Esvaziar a fila e avisar cada worker
+        while True:
+            try:
+                self._fila.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self._workers:
+            self._fila.put(_FIM)
+
+        for worker in self._workers:
+            worker.join(timeout)
+        print("✅ Executor de perguntas encerrado")
@@ -0,0 +1,172 @@
+"""
+Ingestão paralela de pastas com pool de workers e limite de taxa
+- Pool de workers configurável para processar vários arquivos ao mesmo tempo
+- Token bucket compartilhado para requisições/tokens por minuto da OpenAI
+- Retentativa com backoff exponencial em erros 429/5xx
+- Registro de resultado por arquivo
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LimitadorTaxa:
+    """
+    Token bucket para requisições e tokens por minuto
+
+    Compartilhado entre threads: cada chamada à API aguarda até haver
+    saldo de requisição e de tokens, respeitando a cota da conta.
+    """
+
+    def __init__(self, requisicoes_por_minuto: int = 3000, tokens_por_minuto: int = 1_000_000):
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self.tokens_por_minuto = tokens_por_minuto
+
+        # Baldes começam cheios
+        self._saldo_requisicoes = float(requisicoes_por_minuto)
+        self._saldo_tokens = float(tokens_por_minuto)
+        self._ultima_reposicao = time.monotonic()
+
+        # Lock para operações thread-safe
+        self.lock = threading.Lock()
+
+    def _repor(self):
+        """Repõe os baldes proporcionalmente ao tempo decorrido"""
+        agora = time.monotonic()
+        decorrido = agora - self._ultima_reposicao
+        self._ultima_reposicao = agora
+
+        self._saldo_requisicoes = min(
+            self.requisicoes_por_minuto,
+            self._saldo_requisicoes + decorrido * self.requisicoes_por_minuto / 60
+        )
+        self._saldo_tokens = min(
+            self.tokens_por_minuto,
+            self._saldo_tokens + decorrido * self.tokens_por_minuto / 60
+        )
+
+    def aguardar(self, tokens: int = 0):
+        """Bloqueia até haver saldo para uma requisição com `tokens` tokens"""
+        tokens = min(tokens, self.tokens_por_minuto)
+
+        while True:
+            with self.lock:
+                self._repor()
+                if self._saldo_requisicoes >= 1 and self._saldo_tokens >= tokens:
+                    self._saldo_requisicoes -= 1
+                    self._saldo_tokens -= tokens
+                    return
+
+                espera = max(
+                    (1 - self._saldo_requisicoes) * 60 / self.requisicoes_por_minuto,
+                    (tokens - self._saldo_tokens) * 60 / self.tokens_por_minuto,
+                    0.01
+                )
+            time.sleep(espera)
+
+
+def _erro_transitorio(erro: Exception) -> bool:
+    """Indica se o erro vale uma nova tentativa (429, 5xx ou falha de conexão)"""
+    status = getattr(erro, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(erro, 'response', None), 'status_code', None)
+
+    if status is not None:
+        return status == 429 or status >= 500
+
+    return type(erro).__name__ in ('APIConnectionError', 'APITimeoutError', 'ConnectError',
+                                   'ReadTimeout', 'ConnectTimeout')
+
+
+def executar_com_retry(funcao: Callable[[], T], tentativas: int = 5,
+                       espera_inicial: float = 1.0, espera_maxima: float = 60.0) -> T:
+    """
+    Executa `funcao` repetindo com backoff exponencial (com jitter) em erros transitórios
+    """
+    for tentativa in range(tentativas):
+        try:
+            return funcao()
+        except Exception as e:
+            if tentativa == tentativas - 1 or not _erro_transitorio(e):
+                raise
+
+            espera = min(espera_maxima, espera_inicial * 2 ** tentativa)
+            espera *= 0.5 + random.random() / 2
+            print(f"⚠️  Erro transitório ({e}); nova tentativa em {espera:.1f}s "
+                  f"({tentativa + 2}/{tentativas})")
+            time.sleep(espera)
+
+
+def processar_arquivos_em_paralelo(arquivos: List[Path],
+                                   processar: Callable[[str], Any],
+                                   max_workers: int = 4,
+                                   sucesso: Optional[Callable[[Any], bool]] = None) -> List[Dict[str, Any]]:
+    """
+    Processa arquivos com um pool limitado de workers
+
+    Args:
+        arquivos: Arquivos a processar
+        processar: Função que processa um arquivo (recebe o caminho)
+        max_workers: Número máximo de arquivos processados ao mesmo tempo
+        sucesso: Função que interpreta o retorno de `processar` (padrão: bool(retorno))
+
+    Returns:
+        Um registro por arquivo, na ordem original, com status, retorno e duração
+    """
+    sucesso = sucesso or bool
+    registros: Dict[Path, Dict[str, Any]] = {}
+    inicio_total = time.monotonic()
+
+    def _executar(arquivo: Path) -> Dict[str, Any]:
+        inicio = time.monotonic()
+        registro = {'arquivo': arquivo.name, 'caminho': str(arquivo)}
+        try:
+            resultado = processar(str(arquivo))
+            registro['resultado'] = resultado
+            registro['sucesso'] = sucesso(resultado)
+        except Exception as e:
+            registro['resultado'] = None
+            registro['sucesso'] = False
+            registro['erro'] = str(e)
+        registro['duracao_segundos'] = round(time.monotonic() - inicio, 2)
+        return registro
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers),
+                            thread_name_prefix='auralis-ingestao') as executor:
+        futuros = {executor.submit(_executar, arquivo): arquivo for arquivo in arquivos}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            registro = futuro.result()
+            registros[futuros[futuro]] = registro
+            status = "✅" if registro['sucesso'] else "❌"
+            print(f"{status} [{concluidos}/{len(arquivos)}] {registro['arquivo']} "
+                  f"({registro['duracao_segundos']:.1f}s)")
+
+    duracao_total = time.monotonic() - inicio_total
+    sucessos = sum(1 for r in registros.values() if r['sucesso'])
+    print(f"📊 {sucessos}/{len(arquivos)} arquivos processados em {duracao_total:.1f}s "
+          f"({max_workers} workers)")
+
+    return [registros[arquivo] for arquivo in arquivos]
+
+
+# Instância global do limitador (compartilhada por todos os processadores)
+_limitador_openai: Optional[LimitadorTaxa] = None
+_lock_limitador = threading.Lock()
+
+def obter_limitador_openai() -> LimitadorTaxa:
+    """Obtém ou cria o limitador global de taxa para a OpenAI"""
+    global _limitador_openai
+    with _lock_limitador:
+        if _limitador_openai is None:
+            _limitador_openai = LimitadorTaxa(
+                requisicoes_por_minuto=int(os.getenv('OPENAI_RPM', '3000')),
+                tokens_por_minuto=int(os.getenv('OPENAI_TPM', '1000000'))
+            )
+    return _limitador_openai
@@ -0,0 +1,123 @@
+"""
+Limpeza incremental das respostas do modelo
+Remove as frases desnecessárias e as linhas vazias enquanto os tokens chegam,
+para que a interface mostre a resposta já limpa desde o primeiro token
+- Trechos que ainda podem virar uma frase removível ficam retidos
+- Espaços só são liberados quando chega texto depois deles (strip no fim)
+"""
+
+import re
+from typing import Iterable
+
+# Frases removidas das respostas (introduções, ofertas de ajuda, etc.)
+FRASES_REMOVER = [
+    "Com base no contexto fornecido,",
+    "De acordo com as informações disponíveis,",
+    "Posso ajudar com mais alguma coisa?",
+    "Se precisar de mais informações,",
+    "Espero ter ajudado",
+    "Fico à disposição",
+    "Baseado no contexto,",
+    "Conforme o contexto,",
+    "Segundo as informações,",
+    "Como posso ajudar mais?",
+    "Algo mais que",
+    "Mais alguma coisa?",
+    "Há algo mais",
+    "Você perguntou sobre",
+    "Você questionou",
+    "Sua pergunta foi sobre",
+    "Em relação à sua pergunta",
+    "Sobre sua dúvida",
+    "Se desejar,",
+    "Se quiser,",
+    "Quer que eu",
+    "Gostaria que eu",
+    "Considerações importantes:",
+    "Consideração importante:",
+    "Pontos a considerar:",
+    "Vale destacar que",
+    "Vale lembrar que",
+    "Vale ressaltar que",
+    "É importante notar que"
+]
+
+_REGEX_FRASES = re.compile('|'.join(re.escape(frase) for frase in FRASES_REMOVER))
+_PREFIXOS_FRASES = {frase[:i] for frase in FRASES_REMOVER for i in range(1, len(frase))}
+_MAIOR_PREFIXO = max(len(frase) for frase in FRASES_REMOVER) - 1
+
+
+class LimpadorResposta:
+    """
+    Aplica a limpeza da resposta sobre um fluxo de tokens
+
+    `adicionar(token)` devolve o trecho que já pode ser exibido e
+    `finalizar()` o que restou. A concatenação de tudo é a resposta sem as
+    frases de FRASES_REMOVER, sem linhas vazias e sem espaços nas pontas.
+    """
+
+    def __init__(self):
+        self._buffer = ""  # Texto que ainda pode conter o início de uma frase
+        self._espacos = ""  # Espaços/quebras aguardando texto depois deles
+        self._emitiu = False
+
+    def _reter_sufixo(self) -> int:
+        """Tamanho do maior final do buffer que é início de uma frase removível"""
+        for tamanho in range(min(_MAIOR_PREFIXO, len(self._buffer)), 0, -1):
+            if self._buffer[-tamanho:] in _PREFIXOS_FRASES:
+                return tamanho
+        return 0
+
+    def _formatar(self, texto: str) -> str:
+        """Remove linhas vazias e espaços nas pontas do que já está liberado"""
+        saida = []
+        for caractere in texto:
+            if caractere.isspace():
+                self._espacos += caractere
+                continue
+
+            if self._espacos and self._emitiu:
+                if '\n' in self._espacos:
+                    # Linhas só com espaços somem; fica uma quebra e o recuo da linha
+                    antes = self._espacos[:self._espacos.index('\n')]
+                    depois = self._espacos[self._espacos.rindex('\n') + 1:]
+                    saida.append(antes + '\n' + depois)
+                else:
+                    saida.append(self._espacos)
+            self._espacos = ""
+            self._emitiu = True
+            saida.append(caractere)
+        return "".join(saida)
+
+    def adicionar(self, token: str) -> str:
+        """Recebe um token e retorna o trecho limpo que já pode ser exibido"""
+        self._buffer = _REGEX_FRASES.sub("", self._buffer + token)
+        retido = self._reter_sufixo()
+        liberado = self._buffer[:len(self._buffer) - retido]
+        self._buffer = self._buffer[len(liberado):]
+        return self._formatar(liberado)
+
+    def finalizar(self) -> str:
+        """Libera o que ficou retido (espaços finais são descartados)"""
+        restante = self._formatar(self._buffer)
+        self._buffer = ""
+        self._espacos = ""
+        return restante
+
+
+def limpar_resposta(texto: str) -> str:
+    """Limpa uma resposta completa (mesmo resultado da versão em streaming)"""
+    limpador = LimpadorResposta()
+    return limpador.adicionar(texto) + limpador.finalizar()
+
+
+def limpar_fluxo(tokens: Iterable[str]) -> Iterable[str]:
+    """Gera os trechos limpos de um fluxo de tokens, pulando os vazios"""
+    limpador = LimpadorResposta()
+    for token in tokens:
+        trecho = limpador.adicionar(token)
+        if trecho:
+            yield trecho
+    trecho = limpador.finalizar()
+    if trecho:
+        yield trecho
@@ -0,0 +1,108 @@
+"""
+Utilitários para geração de embeddings em lote
+Agrupa textos em lotes limitados por tokens estimados e número de itens
+e mede a vazão (chunks/s, tokens/s) do processamento
+"""
+
+import time
+from typing import List, Dict, Any, Callable, Iterator, Optional
+
+from openai import OpenAI
+
+try:
+    from .ingestao_paralela import LimitadorTaxa, executar_com_retry
+except ImportError:
+    from ingestao_paralela import LimitadorTaxa, executar_com_retry
+
+# Limites conservadores da API de embeddings (por requisição)
+MAX_TOKENS_LOTE = 100_000
+MAX_ITENS_LOTE = 256
+
+# Média aproximada de caracteres por token para texto em português
+CARACTERES_POR_TOKEN = 3
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estima o número de tokens de um texto (sem depender de tokenizer)"""
+    return len(texto) // CARACTERES_POR_TOKEN + 1
+
+
+def dividir_em_lotes(itens: List[Dict[str, Any]],
+                     obter_texto: Callable[[Dict[str, Any]], str],
+                     max_tokens: int = MAX_TOKENS_LOTE,
+                     max_itens: int = MAX_ITENS_LOTE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Divide os itens em lotes respeitando o orçamento de tokens e de itens
+
+    Args:
+        itens: Itens a agrupar (ex.: chunks)
+        obter_texto: Função que extrai o texto de cada item
+        max_tokens: Máximo de tokens estimados por lote
+        max_itens: Máximo de itens por lote
+    """
+    lote = []
+    tokens_lote = 0
+
+    for item in itens:
+        tokens_item = estimar_tokens(obter_texto(item))
+
+        if lote and (tokens_lote + tokens_item > max_tokens or len(lote) >= max_itens):
+            yield lote
+            lote = []
+            tokens_lote = 0
+
+        lote.append(item)
+        tokens_lote += tokens_item
+
+    if lote:
+        yield lote
+
+
+def gerar_embeddings_lote(client: OpenAI, modelo: str, textos: List[str],
+                          limitador: Optional[LimitadorTaxa] = None) -> List[List[float]]:
+    """
+    Gera embeddings para vários textos em uma única requisição
+
+    Respeita o limitador de taxa (se informado) e repete com backoff em 429/5xx.
+
+    Returns:
+        Embeddings na mesma ordem dos textos
+    """
+    if not textos:
+        return []
+
+    def _requisitar():
+        if limitador is not None:
+            limitador.aguardar(sum(estimar_tokens(t) for t in textos))
+        return client.embeddings.create(model=modelo, input=textos)
+
+    response = executar_com_retry(_requisitar)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+class RelatorioVazao:
+    """Acompanha o progresso e a vazão (chunks/s, tokens/s) de uma ingestão"""
+
+    def __init__(self, total_chunks: int):
+        self.total_chunks = total_chunks
+        self.chunks = 0
+        self.tokens = 0
+        self.inicio = time.monotonic()
+
+    def registrar_lote(self, chunks: int, tokens: int):
+        """Registra um lote concluído e exibe o progresso"""
+        self.chunks += chunks
+        self.tokens += tokens
+        resumo = self.resumo()
+        print(f"🔄 {self.chunks}/{self.total_chunks} chunks | "
+              f"{resumo['chunks_por_segundo']:.1f} chunks/s | "
+              f"{resumo['tokens_por_segundo']:.0f} tokens/s")
+
+    def resumo(self) -> Dict[str, float]:
+        """Retorna duração e vazão acumuladas"""
+        duracao = max(time.monotonic() - self.inicio, 1e-6)
+        return {
+            'duracao_segundos': round(duracao, 2),
+            'chunks_por_segundo': self.chunks / duracao,
+            'tokens_por_segundo': self.tokens / duracao
+        }
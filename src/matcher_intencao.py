@@ -0,0 +1,256 @@
+"""
+Classificador de intenção pré-compilado (uma única passada por pergunta)
+Reúne num só autômato os termos do ClarificadorIntencao e as verificações
+do agente (ambiguidade, ajuda vaga, pergunta simples, contexto temporal)
+- Uma regex combinada (lookahead sobre uma trie de termos) encontra todos os
+  termos, inclusive sobrepostos
+- Termos que são prefixo do termo encontrado são deduzidos sem nova busca
+- Restrições de início/fim (ex.: "^qual\\s+") verificadas só nos termos encontrados
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Restrições sobre o que vem depois do termo
+ESPACO = 'espaco'  # \s+
+ESPACO_OU_FIM = 'espaco_ou_fim'  # (?:\s|$)
+ESPACO_PALAVRA = 'espaco_palavra'  # \s+\w+
+
+# Termos usados pelo agente (substring, salvo indicação)
+TERMOS_ESPECIFICOS = ['data', 'horário', 'nome', 'valor', 'número', 'telefone',
+                      'email', 'endereço', 'cpf', 'cnpj', 'código']
+
+# Perguntas diretas e objetivas (somente no início da pergunta)
+INICIOS_SIMPLES = [
+    ('o que é', ESPACO_PALAVRA),  # "O que é X?"
+    ('quem é', ESPACO_PALAVRA),   # "Quem é X?"
+    ('quando', ESPACO),           # "Quando...?"
+    ('onde', ESPACO),             # "Onde...?"
+    ('qual', ESPACO),             # "Qual...?"
+    ('quanto', ESPACO),           # "Quanto...?"
+    ('quantos', ESPACO),          # "Quantos...?"
+]
+
+# Perguntas sim/não (somente no início da pergunta)
+INICIOS_SIM_NAO = ['é possível', 'posso', 'tem como', 'existe', 'há']
+
+INDICADORES_RECENTE = ['última', 'ultima', 'mais recente', 'recente', 'últimas', 'ultimas']
+INDICADORES_PRIMEIRA = ['primeira', 'mais antiga', 'inicial']
+INDICADORES_DATA = ['hoje', 'ontem', 'semana', 'mês', 'mes', 'data', 'quando']
+
+TERMOS_AMBIGUOS = [
+    'isso', 'aquilo', 'ele', 'ela', 'eles',
+    'o que aconteceu', 'me explique', 'como assim',
+    'o que foi', 'qual foi', 'me fale sobre'
+]
+
+TERMOS_GENERICOS = [
+    'como melhorar', 'o que é', 'qual a importância',
+    'melhores práticas', 'dicas para', 'estratégias de',
+    'o que você acha', 'sua opinião sobre'
+]
+
+EXPRESSOES_CONFUSAO = ['wtf', 'ue', 'uai', 'ué', 'mas eu nem',
+                       'não perguntei', 'nao perguntei', 'como assim']
+
+# Pedidos de ajuda vagos (alternâncias das regex originais já expandidas)
+PEDIDOS_AJUDA_VAGOS = [
+    ('pode me ajudar', None), ('poderia me ajudar', None), ('consegue me ajudar', None),
+    ('to com um problema', None), ('to com problema', None),
+    ('tô com um problema', None), ('tô com problema', None),
+    ('estou com um problema', None), ('estou com problema', None),
+    ('preciso de ajuda', None), ('preciso de auxílio', None), ('preciso de socorro', None),
+    ('tem como me ajudar', None), ('tem como ajudar', None),
+    ('teria como me ajudar', None), ('teria como ajudar', None),
+    ('ajuda', ESPACO_OU_FIM), ('socorro', ESPACO_OU_FIM), ('help', ESPACO_OU_FIM),
+    ('não sei o que fazer', None), ('nao sei o que fazer', None),
+    ('tá difícil', None), ('está difícil', None)
+]
+
+
+@dataclass
+class SinaisPergunta:
+    """Tudo o que o clarificador e o agente precisam saber sobre uma pergunta"""
+    texto: str  # Pergunta em minúsculas, sem espaços nas pontas
+    num_palavras: int
+    palavras_por_tipo: Dict[Any, Set[str]] = field(default_factory=dict)
+    tipos_por_radical: Set[Any] = field(default_factory=set)
+    indice_variacao_ambigua: Optional[int] = None
+    pergunta_simples: bool = False
+    pergunta_ambigua: bool = False
+    pergunta_generica: bool = False
+    pedido_ajuda_vago: bool = False
+    expressao_confusao: bool = False
+    menciona_reuniao: bool = False
+    busca_recente: bool = False
+    busca_primeira: bool = False
+    busca_data: bool = False
+
+    @property
+    def tem_contexto_temporal(self) -> bool:
+        return self.busca_recente or self.busca_primeira or self.busca_data
+
+    def contexto_temporal(self) -> Dict:
+        """Mesmo formato de AgenteBuscaMelhorado.detectar_busca_temporal"""
+        return {
+            'busca_recente': self.busca_recente,
+            'busca_primeira': self.busca_primeira,
+            'busca_data': self.busca_data,
+            'tem_contexto_temporal': self.tem_contexto_temporal
+        }
+
+
+def _regex_trie(termos: List[str]) -> str:
+    """
+    Monta uma alternância fatorada por prefixos comuns (trie)
+    
+    Em cada posição o motor de regex segue um único ramo por caractere, em vez
+    de testar todos os termos. Os opcionais são gulosos: vence o mais longo.
+    """
+    trie: Dict[str, Any] = {}
+    for termo in termos:
+        no = trie
+        for caractere in termo:
+            no = no.setdefault(caractere, {})
+        no[''] = {}
+
+    def _montar(no: Dict[str, Any]) -> str:
+        ramos = [re.escape(c) + _montar(filho) for c, filho in sorted(no.items()) if c]
+        if not ramos:
+            return ''
+        grupo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        if '' in no:
+            return '(?:' + grupo + ')?' if len(ramos) == 1 else grupo + '?'
+        return grupo
+
+    return _montar(trie)
+
+
+class MatcherIntencao:
+    """
+    Autômato de termos montado uma vez e usado para classificar cada pergunta
+
+    Cada termo tem regras (sinal, valor, restrição posterior, só no início).
+    A regex `(?=(trie dos termos))` acha em cada posição o termo mais longo;
+    os demais termos na mesma posição são necessariamente prefixos dele e vêm
+    de uma tabela pré-calculada.
+    """
+
+    def __init__(self, padroes_pergunta: Dict[Any, Dict], perguntas_ambiguas: Dict[str, Dict]):
+        self._regras: Dict[str, List[Tuple[str, Any, Optional[str], bool]]] = {}
+
+        # Tipos de pergunta do clarificador: palavras-chave e radicais
+        for tipo, padrao in padroes_pergunta.items():
+            for palavra in padrao["palavras"]:
+                self._adicionar(palavra, 'palavra', tipo)
+            for radical in padrao["radicais"]:
+                self._adicionar(radical, 'radical', tipo, padrao.get("seguido_de"),
+                                padrao.get("somente_inicio", False))
+
+        # Variações de perguntas ambíguas, na ordem em que são avaliadas
+        self.variacoes: List[Tuple[str, str, List[str]]] = []
+        for categoria, info in perguntas_ambiguas.items():
+            for variacao in info["variacoes"]:
+                self._adicionar(variacao, 'variacao', len(self.variacoes))
+                self.variacoes.append((categoria, variacao, info["sugestoes"]))
+
+        # Pergunta contida numa variação ("ajud" em "ajuda"): todos os trechos
+        self._trechos_variacao: Dict[str, int] = {}
+        for indice, (_, variacao, _) in enumerate(self.variacoes):
+            for inicio in range(len(variacao) + 1):
+                for fim in range(inicio, len(variacao) + 1):
+                    self._trechos_variacao.setdefault(variacao[inicio:fim], indice)
+
+        # Verificações do agente
+        for termo in TERMOS_ESPECIFICOS:
+            self._adicionar(termo, 'sinal', 'termo_especifico')
+        for termo, seguido_de in INICIOS_SIMPLES:
+            self._adicionar(termo, 'sinal', 'inicio_simples', seguido_de, True)
+        for termo in INICIOS_SIM_NAO:
+            self._adicionar(termo, 'sinal', 'sim_nao', somente_inicio=True)
+        for termo in INDICADORES_RECENTE:
+            self._adicionar(termo, 'sinal', 'busca_recente')
+        for termo in INDICADORES_PRIMEIRA:
+            self._adicionar(termo, 'sinal', 'busca_primeira')
+        for termo in INDICADORES_DATA:
+            self._adicionar(termo, 'sinal', 'busca_data')
+        for termo in TERMOS_AMBIGUOS:
+            self._adicionar(termo, 'sinal', 'termo_ambiguo')
+        for termo in TERMOS_GENERICOS:
+            self._adicionar(termo, 'sinal', 'pergunta_generica')
+        for termo in EXPRESSOES_CONFUSAO:
+            self._adicionar(termo, 'sinal', 'confusao')
+        for termo, seguido_de in PEDIDOS_AJUDA_VAGOS:
+            self._adicionar(termo, 'sinal', 'ajuda_vaga', seguido_de)
+        self._adicionar('reunião', 'sinal', 'menciona_reuniao')
+
+        # Regex única: em cada posição, o termo mais longo que começa ali
+        self._regex = re.compile('(?=(' + _regex_trie(list(self._regras)) + '))')
+        self._prefixos = {
+            termo: [p for p in self._regras if termo.startswith(p)]
+            for termo in self._regras
+        }
+
+    def _adicionar(self, termo: str, sinal: str, valor: Any,
+                   seguido_de: Optional[str] = None, somente_inicio: bool = False):
+        self._regras.setdefault(termo, []).append((sinal, valor, seguido_de, somente_inicio))
+
+    @staticmethod
+    def _restricao_ok(texto: str, fim: int, seguido_de: Optional[str]) -> bool:
+        """Verifica o que vem depois do termo"""
+        if seguido_de is None:
+            return True
+        if seguido_de == ESPACO_OU_FIM:
+            return fim == len(texto) or texto[fim].isspace()
+
+        j = fim
+        while j < len(texto) and texto[j].isspace():
+            j += 1
+        if j == fim:
+            return False
+        if seguido_de == ESPACO_PALAVRA:
+            return j < len(texto) and (texto[j].isalnum() or texto[j] == '_')
+        return True
+
+    def analisar(self, pergunta: str) -> SinaisPergunta:
+        """Classifica a pergunta em uma passada e retorna todos os sinais"""
+        texto = pergunta.lower().strip()
+        sinais = SinaisPergunta(texto=texto, num_palavras=len(texto.split()))
+        encontrados: Set[str] = set()
+        indice_variacao = self._trechos_variacao.get(texto)
+
+        for match in self._regex.finditer(texto):
+            posicao = match.start()
+            for termo in self._prefixos[match.group(1)]:
+                fim = posicao + len(termo)
+                for sinal, valor, seguido_de, somente_inicio in self._regras[termo]:
+                    if somente_inicio and posicao:
+                        continue
+                    if not self._restricao_ok(texto, fim, seguido_de):
+                        continue
+
+                    if sinal == 'sinal':
+                        encontrados.add(valor)
+                    elif sinal == 'palavra':
+                        sinais.palavras_por_tipo.setdefault(valor, set()).add(termo)
+                    elif sinal == 'radical':
+                        sinais.tipos_por_radical.add(valor)
+                    elif indice_variacao is None or valor < indice_variacao:
+                        indice_variacao = valor
+
+        sinais.indice_variacao_ambigua = indice_variacao
+        sinais.pergunta_simples = (
+            ('inicio_simples' in encontrados and sinais.num_palavras < 10) or
+            'termo_especifico' in encontrados or
+            'sim_nao' in encontrados
+        )
+        sinais.pergunta_ambigua = 'termo_ambiguo' in encontrados and sinais.num_palavras <= 4
+        sinais.pergunta_generica = 'pergunta_generica' in encontrados
+        sinais.pedido_ajuda_vago = 'ajuda_vaga' in encontrados and sinais.num_palavras < 10
+        sinais.expressao_confusao = 'confusao' in encontrados and sinais.num_palavras <= 3
+        sinais.menciona_reuniao = 'menciona_reuniao' in encontrados
+        sinais.busca_recente = 'busca_recente' in encontrados
+        sinais.busca_primeira = 'busca_primeira' in encontrados
+        sinais.busca_data = 'busca_data' in encontrados
+        return sinais
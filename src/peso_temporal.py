@@ -0,0 +1,101 @@
+"""
+Peso temporal vetorizado para a reordenação dos resultados
+Prioriza documentos recentes com um decaimento contínuo por meia-vida
+- Datas convertidas uma única vez (na indexação) para segundos desde a época
+- Peso de todos os candidatos calculado de uma vez com NumPy
+- Curva configurável no .env (meia-vida, peso máximo e mínimo)
+"""
+
+import os
+import re
+import math
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+
+_SEGUNDOS_POR_DIA = 86400.0
+
+# Frações de segundo do Postgres (1 a 6+ dígitos) normalizadas para 6 dígitos
+_FRACAO_SEGUNDOS = re.compile(r'\.(\d+)')
+
+
+def epoca_de_data(valor: Any) -> float:
+    """
+    Converte uma data do banco em segundos desde a época (NaN se ausente ou inválida)
+
+    Aceita datetime/date ou texto ISO ('2024-05-01', '2024-05-01T10:00:00.123+00:00').
+    Datas sem fuso são tratadas como UTC.
+    """
+    if valor is None or valor == '':
+        return math.nan
+
+    if isinstance(valor, datetime):
+        data = valor
+    elif isinstance(valor, date):
+        data = datetime(valor.year, valor.month, valor.day)
+    else:
+        texto = str(valor).strip().replace('Z', '+00:00')
+        texto = _FRACAO_SEGUNDOS.sub(lambda m: '.' + m.group(1)[:6].ljust(6, '0'), texto, count=1)
+        try:
+            data = datetime.fromisoformat(texto)
+        except ValueError:
+            return math.nan
+
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data.timestamp()
+
+
+class PesoTemporal:
+    """
+    Curva de recência: peso_minimo + (peso_maximo - peso_minimo) * 0.5 ** (idade / meia_vida)
+
+    Um documento novo recebe peso_maximo, um com a idade da meia-vida fica no
+    meio do caminho e os antigos tendem a peso_minimo. Sem data, o peso é 1.0.
+    """
+
+    def __init__(self, meia_vida_dias: float = 30.0, peso_maximo: float = 1.2,
+                 peso_minimo: float = 0.9):
+        """
+        Args:
+            meia_vida_dias: Idade (dias) em que o bônus de recência cai pela metade
+            peso_maximo: Peso de um documento criado agora
+            peso_minimo: Peso para o qual documentos muito antigos convergem
+        """
+        if meia_vida_dias <= 0:
+            raise ValueError("meia_vida_dias deve ser positivo")
+        self.meia_vida_dias = meia_vida_dias
+        self.peso_maximo = peso_maximo
+        self.peso_minimo = peso_minimo
+
+    def pesos(self, epocas: np.ndarray, agora: Optional[float] = None) -> np.ndarray:
+        """Peso de cada época (vetorizado); NaN vira 1.0"""
+        agora = time.time() if agora is None else agora
+        epocas = np.asarray(epocas, dtype=np.float64)
+
+        # Datas no futuro contam como recém-criadas
+        idade_dias = np.maximum(agora - epocas, 0.0) / _SEGUNDOS_POR_DIA
+        pesos = self.peso_minimo + (self.peso_maximo - self.peso_minimo) * np.exp2(
+            -idade_dias / self.meia_vida_dias
+        )
+        return np.where(np.isnan(epocas), 1.0, pesos)
+
+    def peso(self, data: Any, agora: Optional[float] = None) -> float:
+        """Peso de uma única data (texto ISO, date ou datetime)"""
+        return float(self.pesos(np.array([epoca_de_data(data)]), agora)[0])
+
+    def aplicar(self, similaridades: np.ndarray, epocas: np.ndarray,
+                agora: Optional[float] = None) -> np.ndarray:
+        """Similaridades multiplicadas pelo peso temporal, limitadas a 1.0"""
+        return np.minimum(similaridades * self.pesos(epocas, agora), 1.0)
+
+
+def obter_peso_temporal() -> PesoTemporal:
+    """Cria a curva de recência a partir do .env"""
+    return PesoTemporal(
+        meia_vida_dias=float(os.getenv('PESO_TEMPORAL_MEIA_VIDA_DIAS', '30')),
+        peso_maximo=float(os.getenv('PESO_TEMPORAL_MAXIMO', '1.2')),
+        peso_minimo=float(os.getenv('PESO_TEMPORAL_MINIMO', '0.9'))
+    )
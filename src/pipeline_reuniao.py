@@ -0,0 +1,268 @@
+"""
+Pipeline de ingestão de reuniões em streaming
+Leva os segmentos transcritos direto para chunking, embeddings em lote e
+inserção em lote, sem passar por arquivos temporários
+- Uma thread por etapa, ligadas por filas limitadas (contrapressão)
+- Chunks embeddados assim que ficam completos; a reunião fica pesquisável
+  segundos depois de terminar
+"""
+
+import time
+import queue
+import threading
+from typing import List, Dict, Optional
+
+try:
+    from .embeddings_processor import ProcessadorEmbeddings, ChunkerIncremental
+    from .lotes_embeddings import estimar_tokens, gerar_embeddings_lote
+except ImportError:
+    from embeddings_processor import ProcessadorEmbeddings, ChunkerIncremental
+    from lotes_embeddings import estimar_tokens, gerar_embeddings_lote
+
+# Marca o fim do fluxo entre as etapas
+_FIM = object()
+
+
+class PipelineIngestaoReuniao:
+    """
+    Ingestão incremental de uma reunião: segmentos -> chunks -> embeddings -> banco
+
+    Cada etapa roda em sua própria thread. As filas entre elas são limitadas:
+    se a API de embeddings ou o banco ficarem lentos, `adicionar_segmento`
+    bloqueia em vez de acumular texto e vetores em memória.
+
+    Se uma etapa falhar, todas passam a só escoar suas filas até o fim (nada
+    fica bloqueado), o fim do fluxo segue adiante e `finalizar` informa o erro.
+    """
+
+    def __init__(self, processador: ProcessadorEmbeddings, cabecalho: str,
+                 arquivo_origem: str, tamanho_fila: int = 8, espera_lote_s: float = 0.5):
+        """
+        Args:
+            processador: Processador de embeddings (clientes, limites e inserção)
+            cabecalho: Cabeçalho da reunião (Título:, Responsável:, Data:, ...)
+            arquivo_origem: Identificador gravado em arquivo_origem
+            tamanho_fila: Capacidade de cada fila entre etapas
+            espera_lote_s: Tempo máximo esperando mais chunks antes de enviar um lote
+        """
+        self.processador = processador
+        self.arquivo_origem = arquivo_origem
+        self.espera_lote_s = espera_lote_s
+
+        self._cabecalho = cabecalho.strip()
+        self._textos: List[str] = [self._cabecalho]
+        self._chunker = ChunkerIncremental(processador.chunk_size, processador.chunk_overlap)
+
+        # Campos da reunião vindos do cabeçalho (temas/participantes no final)
+        self._metadados = processador.extrair_metadados_completos(self._cabecalho, arquivo_origem)
+        self._campos = processador.campos_reuniao(self._metadados)
+
+        self._fila_segmentos = queue.Queue(maxsize=tamanho_fila)
+        self._fila_chunks = queue.Queue(maxsize=tamanho_fila)
+        self._fila_linhas = queue.Queue(maxsize=tamanho_fila)
+
+        # Estatísticas
+        self.segmentos_recebidos = 0
+        self.chunks_criados = 0
+        self.chunks_inseridos = 0
+        self.chunks_com_erro = 0
+        self.inicio = time.monotonic()
+        self.lock = threading.Lock()
+        self._cancelado = False
+        self._erro: Optional[str] = None
+
+        self._threads = [
+            threading.Thread(target=self._etapa_chunks, name='auralis-pipeline-chunks', daemon=True),
+            threading.Thread(target=self._etapa_embeddings, name='auralis-pipeline-embeddings', daemon=True),
+            threading.Thread(target=self._etapa_insercao, name='auralis-pipeline-insercao', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        # O cabeçalho entra no primeiro chunk, como na ingestão por arquivo
+        self._fila_segmentos.put(self._cabecalho + "\n")
+
+    def adicionar_segmento(self, texto: str):
+        """Entrega um trecho transcrito (bloqueia se as etapas estiverem atrasadas)"""
+        if not texto or not texto.strip() or self._erro is not None:
+            return
+        self._textos.append(texto.strip())
+        self.segmentos_recebidos += 1
+        self._fila_segmentos.put(texto)
+
+    def _registrar_erro(self, etapa: str, erro: Exception):
+        """Guarda a primeira falha; a partir dela as etapas só escoam as filas"""
+        with self.lock:
+            if self._erro is None:
+                self._erro = f"{etapa}: {erro}"
+        print(f"❌ Erro na etapa de {etapa} da ingestão: {erro}")
+
+    def _etapa_chunks(self):
+        """Transforma segmentos em chunks completos"""
+        try:
+            while True:
+                segmento = self._fila_segmentos.get()
+                if self._erro is None:
+                    try:
+                        if segmento is _FIM:
+                            chunks = [] if self._cancelado else self._chunker.finalizar()
+                        else:
+                            chunks = self._chunker.adicionar(segmento)
+
+                        for chunk in chunks:
+                            self.chunks_criados += 1
+                            self._fila_chunks.put(chunk)
+                    except Exception as e:
+                        self._registrar_erro('chunks', e)
+
+                if segmento is _FIM:
+                    return
+        finally:
+            self._fila_chunks.put(_FIM)
+
+    def _etapa_embeddings(self):
+        """Agrupa chunks em lotes e gera os embeddings de cada lote"""
+        lote: List[Dict] = []
+        tokens_lote = 0
+
+        try:
+            while True:
+                try:
+                    # Com lote aberto, espera pouco: chunks parados não devem atrasar a busca
+                    chunk = self._fila_chunks.get(timeout=self.espera_lote_s if lote else None)
+                except queue.Empty:
+                    chunk = None
+
+                if self._erro is not None:
+                    lote, tokens_lote = [], 0
+                else:
+                    try:
+                        if chunk is None or chunk is _FIM:
+                            # Tempo esgotado ou fim do fluxo: envia o lote aberto
+                            self._enviar_lote(lote)
+                            lote, tokens_lote = [], 0
+                        else:
+                            lote.append(chunk)
+                            tokens_lote += estimar_tokens(chunk['texto'])
+                            if (len(lote) >= self.processador.max_itens_lote or
+                                    tokens_lote >= self.processador.max_tokens_lote):
+                                self._enviar_lote(lote)
+                                lote, tokens_lote = [], 0
+                    except Exception as e:
+                        self._registrar_erro('embeddings', e)
+                        lote, tokens_lote = [], 0
+
+                if chunk is _FIM:
+                    return
+        finally:
+            self._fila_linhas.put(_FIM)
+
+    def _enviar_lote(self, lote: List[Dict]):
+        """Gera embeddings de um lote e repassa as linhas para inserção"""
+        if not lote:
+            return
+
+        try:
+            embeddings = gerar_embeddings_lote(
+                self.processador.client, self.processador.embedding_model,
+                [chunk['texto'] for chunk in lote], limitador=self.processador.limitador
+            )
+        except Exception as e:
+            print(f"❌ Erro ao gerar embeddings dos chunks "
+                  f"{lote[0]['numero']}-{lote[-1]['numero']}: {e}")
+            with self.lock:
+                self.chunks_com_erro += len(lote)
+            return
+
+        self._fila_linhas.put([
+            self.processador.montar_linha(self.arquivo_origem, chunk, embedding, self._campos)
+            for chunk, embedding in zip(lote, embeddings)
+        ])
+
+    def _etapa_insercao(self):
+        """Insere cada lote de linhas com uma única requisição"""
+        while True:
+            linhas = self._fila_linhas.get()
+            if linhas is _FIM:
+                return
+            if self._erro is not None:
+                continue
+
+            try:
+                inseridos = self.processador._inserir_lote(linhas)
+            except Exception as e:
+                self._registrar_erro('inserção', e)
+                inseridos = 0
+            with self.lock:
+                self.chunks_inseridos += inseridos
+                self.chunks_com_erro += len(linhas) - inseridos
+
+    def _atualizar_metadados_finais(self):
+        """Completa temas e participantes, que dependem do texto inteiro"""
+        texto_completo = "\n\n".join(self._textos)
+        metadados = self.processador.extrair_metadados_completos(texto_completo, self.arquivo_origem)
+        if metadados == self._metadados:
+            return
+
+        try:
+            self.processador.supabase.table('reunioes_embbed').update(
+                self.processador.campos_reuniao(metadados)
+            ).eq('arquivo_origem', self.arquivo_origem).execute()
+        except Exception as e:
+            print(f"⚠️  Erro ao atualizar metadados da reunião: {e}")
+
+    def cancelar(self):
+        """Interrompe a ingestão e remove os chunks já inseridos desta reunião"""
+        self._cancelado = True
+        self._fila_segmentos.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+
+        if self.chunks_inseridos:
+            try:
+                self.processador.supabase.table('reunioes_embbed').delete().eq(
+                    'arquivo_origem', self.arquivo_origem
+                ).execute()
+                print(f"🗑️  Ingestão cancelada: {self.chunks_inseridos} chunks removidos")
+            except Exception as e:
+                print(f"⚠️  Erro ao remover chunks da reunião cancelada: {e}")
+
+    def finalizar(self) -> Dict:
+        """
+        Fecha o fluxo, aguarda as etapas e retorna o resultado da ingestão
+
+        Returns:
+            Dicionário com sucesso, contagens, tempos e a falha de etapa (se houve);
+            `parcial` indica que a reunião foi salva sem parte dos chunks
+        """
+        fim_entrada = time.monotonic()
+        self._fila_segmentos.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+
+        if self.chunks_inseridos:
+            self._atualizar_metadados_finais()
+
+        agora = time.monotonic()
+        completa = self._erro is None and self.chunks_com_erro == 0
+        resultado = {
+            'sucesso': self.chunks_inseridos > 0 and completa,
+            'parcial': self.chunks_inseridos > 0 and not completa,
+            'erro': self._erro,
+            'arquivo_origem': self.arquivo_origem,
+            'segmentos': self.segmentos_recebidos,
+            'chunks_criados': self.chunks_criados,
+            'chunks_inseridos': self.chunks_inseridos,
+            'chunks_com_erro': self.chunks_com_erro,
+            'duracao_segundos': round(agora - self.inicio, 2),
+            'segundos_apos_fim': round(agora - fim_entrada, 2)
+        }
+
+        if not completa:
+            motivo = self._erro or f"{self.chunks_com_erro} chunks com erro"
+            print(f"⚠️  Ingestão incompleta ({motivo}): {self.chunks_inseridos}/{self.chunks_criados} "
+                  f"chunks inseridos")
+        else:
+            print(f"✅ Reunião pesquisável: {self.chunks_inseridos}/{self.chunks_criados} chunks "
+                  f"({resultado['segundos_apos_fim']:.1f}s após o fim da transcrição)")
+        return resultado
@@ -0,0 +1,69 @@
+"""
+Conversão compacta de embeddings para NumPy
+Lê os formatos em que o Supabase devolve vetores direto para float32
+- Texto do pgvector ("[0.1,0.2,...]"): um único parse em C (np.fromstring)
+- Binário do pgvector em base64 (coluna computada embedding_b64): sem parse de texto
+- Nunca cria listas Python de 1536 floats (~50 KB por vetor contra 6 KB em float32)
+"""
+
+import base64
+from typing import Any, Optional
+
+import numpy as np
+
+# Dimensão do text-embedding-ada-002
+DIMENSAO_PADRAO = 1536
+
+# Formato binário do pgvector (vector_send): dim (int16), reservado (int16), floats big-endian
+_CABECALHO_PGVECTOR = np.dtype('>u2')
+_FLOAT_PGVECTOR = np.dtype('>f4')
+
+
+def vetor_de_texto(texto: str) -> np.ndarray:
+    """Converte o texto do pgvector (ou uma lista JSON) em um vetor float32"""
+    inicio = texto.find('[')
+    fim = texto.rfind(']')
+    if inicio < 0 or fim < inicio:
+        raise ValueError("embedding em texto sem colchetes")
+    vetor = np.fromstring(texto[inicio + 1:fim], dtype=np.float32, sep=',')
+    if vetor.size == 0 and texto[inicio + 1:fim].strip():
+        raise ValueError("embedding em texto inválido")
+    return vetor
+
+
+def vetor_de_pgvector_b64(texto_b64: str) -> np.ndarray:
+    """
+    Converte o binário do pgvector codificado em base64 em um vetor float32
+
+    É o valor de `encode(vector_send(embedding), 'base64')` (quebras de
+    linha do encode do Postgres são ignoradas).
+    """
+    dados = base64.b64decode(texto_b64)
+    if len(dados) < 4:
+        raise ValueError("embedding binário truncado")
+    dimensao = int(np.frombuffer(dados, dtype=_CABECALHO_PGVECTOR, count=1)[0])
+    if len(dados) != 4 + 4 * dimensao:
+        raise ValueError("embedding binário com tamanho inconsistente")
+    return np.frombuffer(dados, dtype=_FLOAT_PGVECTOR, count=dimensao, offset=4).astype(np.float32)
+
+
+def converter_embedding(valor: Any, dimensao: int = DIMENSAO_PADRAO) -> Optional[np.ndarray]:
+    """
+    Converte um embedding vindo do banco em float32
+
+    Aceita texto do pgvector/JSON, lista de números ou array. Retorna None se
+    o valor estiver vazio, for inválido ou não tiver a dimensão esperada.
+    """
+    if valor is None:
+        return None
+    try:
+        if isinstance(valor, str):
+            vetor = vetor_de_texto(valor)
+        else:
+            vetor = np.asarray(valor, dtype=np.float32)
+    except (ValueError, TypeError):
+        return None
+
+    if vetor.ndim != 1 or vetor.shape[0] != dimensao:
+        return None
+    return vetor
@@ -0,0 +1,216 @@
+"""
+Testes do processamento de áudio (partes em disco, transcrição ao vivo e horário real)
+Requer pyaudio instalado (o módulo o importa no topo)
+"""
+
+import threading
+import time
+import wave
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pyaudio")
+
+from src.audio_processor import (AudioProcessor, GravadorPartesWav, RemovedorSilencio, SegmentadorVoz,
+                                 TranscricaoAoVivo, ler_resposta_whisper, marcador_erro_transcricao,
+                                 remover_marcadores_erro)
+
+
+def _ao_vivo(tmp_path, transcrever, callback):
+    return TranscricaoAoVivo(tmp_path / "gravacao", channels=1, sample_width=2, rate=16000,
+                             transcrever=transcrever, callback_parcial=callback, max_workers=2)
+
+
+def _registro(indice, sucesso=True):
+    texto = f"trecho {indice}" if sucesso else marcador_erro_transcricao('segmento', indice + 1)
+    return {'parte': indice + 1, 'arquivo': f"seg{indice}", 'texto': texto, 'sucesso': sucesso,
+            'tentativas': 1, 'duracao_segundos': 0.0}
+
+
+def test_callback_recebe_so_segmentos_transcritos_em_ordem(tmp_path):
+    recebidos = []
+    # O segmento 0 demora mais: o 1 espera por ele para manter a ordem
+    def transcrever(indice, caminho):
+        time.sleep(0.1 if indice == 0 else 0.0)
+        return _registro(indice, sucesso=indice != 1)
+
+    ao_vivo = _ao_vivo(tmp_path, transcrever, recebidos.append)
+    for _ in range(3):
+        ao_vivo.enviar(b"\x00\x00" * 1600)
+    relatorio = ao_vivo.finalizar()
+
+    assert recebidos == ["trecho 0", "trecho 2"]
+    assert [parte['sucesso'] for parte in relatorio] == [True, False, True]
+    assert "[Erro na transcrição do segmento 2]" in ao_vivo.texto_parcial()
+
+
+def test_callback_lento_nao_segura_o_lock(tmp_path):
+    liberar = threading.Event()
+    ao_vivo = _ao_vivo(tmp_path, lambda indice, caminho: _registro(indice), lambda texto: liberar.wait(2))
+
+    ao_vivo.enviar(b"\x00\x00" * 1600)
+    time.sleep(0.1)
+    inicio = time.monotonic()
+    assert ao_vivo.texto_parcial() == "trecho 0"
+    assert time.monotonic() - inicio < 1.0
+    liberar.set()
+    ao_vivo.finalizar()
+
+
+class _Clientes:
+    def openai(self, timeout_s=None, max_retries=None):
+        return SimpleNamespace()
+
+
+def test_resposta_verbose_json_traz_segmentos_e_duracao():
+    resposta = {'text': 'Bom dia. Vamos começar.', 'duration': 12.5,
+                'segments': [{'start': 0.0, 'end': 2.0, 'text': ' Bom dia.'},
+                             {'start': 8.0, 'end': 12.5, 'text': ' Vamos começar.'}]}
+
+    texto, segmentos, duracao = ler_resposta_whisper(resposta)
+
+    assert texto == 'Bom dia. Vamos começar.'
+    assert segmentos[1] == {'inicio': 8.0, 'fim': 12.5, 'texto': 'Vamos começar.'}
+    assert duracao == 12.5
+    assert ler_resposta_whisper("só texto") == ("só texto", [], None)
+
+
+def test_horarios_somam_partes_anteriores(tmp_path, monkeypatch):
+    monkeypatch.setenv('REMOVER_SILENCIO', 'false')
+    processador = AudioProcessor(str(tmp_path), clientes=_Clientes())
+    processador.inicio_gravacao = datetime(2024, 3, 10, 14, 0, 0)
+    relatorio = [
+        {'duracao_audio': 60.0, 'segmentos': [{'inicio': 5.0, 'fim': 9.0, 'texto': 'Abertura'}]},
+        {'duracao_audio': 30.0, 'segmentos': [{'inicio': 10.0, 'fim': 12.0, 'texto': 'Pauta'}]},
+    ]
+
+    marcacoes = processador.marcar_horarios(relatorio)
+
+    assert [m['horario'] for m in marcacoes] == [datetime(2024, 3, 10, 14, 0, 5), datetime(2024, 3, 10, 14, 1, 10)]
+
+
+def test_segmentador_informa_posicao_mesmo_apos_descartar_silencio():
+    segmentador = SegmentadorVoz(rate=100, sample_width=2, channels=1,
+                                 silencio_minimo_s=0.5, segmento_minimo_s=1.0, segmento_maximo_s=2.0)
+    um_segundo = b"\x00" * 200
+
+    # Dois segundos só de silêncio: descartados, mas contam na posição
+    assert segmentador.adicionar(um_segundo, -90.0) is None
+    assert segmentador.adicionar(um_segundo, -90.0) is None
+    assert segmentador.adicionar(um_segundo, -10.0) is None
+    assert segmentador.adicionar(um_segundo, -10.0) is not None
+    assert segmentador.inicio_ultimo_s == 2.0
+
+
+def test_gravador_divide_em_partes_com_quadros_inteiros(tmp_path):
+    tamanho_parte = GravadorPartesWav.TAMANHO_CABECALHO + 1001
+    gravador = GravadorPartesWav(tmp_path / "gravacao", channels=1, sample_width=2, rate=16000,
+                                 max_bytes=tamanho_parte)
+    for _ in range(5):
+        gravador.escrever(b"\x01\x00" * 500)
+    partes = gravador.fechar()
+
+    assert [parte.name for parte in partes] == [f"gravacao_part{i:03d}.wav" for i in range(len(partes))]
+    quadros = []
+    for parte in partes:
+        with wave.open(str(parte), 'rb') as wf:
+            assert wf.getnchannels() == 1 and wf.getframerate() == 16000
+            quadros.append(wf.getnframes())
+    # Cada parte cabe no limite sem cortar um quadro ao meio (1001 bytes -> 500 quadros)
+    assert all(n <= 500 for n in quadros)
+    assert sum(quadros) * 2 == gravador.bytes_audio == 5000
+
+
+def test_gravador_sem_audio_nao_cria_partes(tmp_path):
+    gravador = GravadorPartesWav(tmp_path / "vazio", channels=1, sample_width=2, rate=16000, max_bytes=4096)
+
+    assert gravador.fechar() == []
+
+
+def _remover(removedor, padrao):
+    """Passa buffers de 0.1 s ('v' = voz, 's' = silêncio) e devolve os bytes que seguiram"""
+    saida = 0
+    for tipo in padrao:
+        for trecho, _ in removedor.processar(b"\x00" * 10, -10.0 if tipo == 'v' else -90.0):
+            saida += len(trecho)
+    return saida
+
+
+def test_silencio_longo_e_comprimido_mantendo_as_margens():
+    removedor = RemovedorSilencio(bytes_por_segundo=100, margem_s=0.5)
+
+    # 1 s de voz, 3 s de silêncio, 1 s de voz: ficam 0.5 s de cada ponta do silêncio
+    saida = _remover(removedor, 'v' * 10 + 's' * 30 + 'v' * 10)
+
+    assert saida == 300
+    assert removedor.resumo()['segundos_removidos'] == 2.0
+    assert removedor.resumo()['segundos_originais'] == 5.0
+
+
+def test_mapear_tempo_devolve_a_posicao_real():
+    removedor = RemovedorSilencio(bytes_por_segundo=100, margem_s=0.5)
+    _remover(removedor, 'v' * 10 + 's' * 30 + 'v' * 10)
+
+    assert removedor.mapear_tempo(1.0) == pytest.approx(1.0)   # antes do corte
+    assert removedor.mapear_tempo(1.5) == pytest.approx(3.5)   # começo da margem final do silêncio
+    assert removedor.mapear_tempo(2.5) == pytest.approx(4.5)   # voz depois do silêncio
+
+
+def test_silencio_curto_passa_inteiro():
+    removedor = RemovedorSilencio(bytes_por_segundo=100, margem_s=0.5)
+
+    assert _remover(removedor, 'v' * 5 + 's' * 8 + 'v' * 5) == 180
+    assert removedor.mapear_tempo(1.2) == pytest.approx(1.2)
+
+
+def test_horario_real_desconta_silencio_removido(tmp_path, monkeypatch):
+    monkeypatch.setenv('REMOVER_SILENCIO', 'false')
+    processador = AudioProcessor(str(tmp_path), clientes=_Clientes())
+    processador.inicio_gravacao = datetime(2024, 3, 10, 14, 0, 0)
+    processador.removedor = RemovedorSilencio(bytes_por_segundo=100, margem_s=0.5)
+    _remover(processador.removedor, 'v' * 10 + 's' * 30 + 'v' * 10)
+
+    assert processador.horario_real(2.5) == datetime(2024, 3, 10, 14, 0, 4, 500000)
+
+
+def test_marcadores_de_erro_nao_sao_ingeridos():
+    texto = "\n".join(["Abertura da reunião.", marcador_erro_transcricao('parte', 2),
+                       "Votação do orçamento.", marcador_erro_transcricao('segmento', 7)])
+
+    assert remover_marcadores_erro(texto) == "Abertura da reunião.\nVotação do orçamento."
+
+
+def test_reenvio_das_partes_com_falha_completa_a_transcricao(tmp_path, monkeypatch):
+    monkeypatch.setenv('REMOVER_SILENCIO', 'false')
+    gravador = GravadorPartesWav(tmp_path / "reuniao", channels=1, sample_width=2, rate=16000,
+                                 max_bytes=GravadorPartesWav.TAMANHO_CABECALHO + 200)
+    for _ in range(3):
+        gravador.escrever(b"\x01\x00" * 100)
+    gravador.fechar()
+
+    falhar = {"reuniao_part001.wav"}
+
+    def transcrever(model, file, language, response_format):
+        nome = file.name.rsplit('/', 1)[-1]
+        if nome in falhar:
+            raise ValueError("falha")
+        return {'text': f"texto de {nome}", 'segments': []}
+
+    cliente = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(create=transcrever)))
+    clientes = SimpleNamespace(openai=lambda timeout_s=None, max_retries=None: cliente)
+    processador = AudioProcessor(str(tmp_path), clientes=clientes)
+    base = tmp_path / "reuniao"
+
+    primeira = processador.transcribe_audio_files(str(base))
+    assert primeira.split("\n")[1] == marcador_erro_transcricao('parte', 2)
+    assert [p.name for p in tmp_path.glob("reuniao_part*")] == ["reuniao_part001.wav"]
+
+    falhar.clear()
+    segunda = processador.transcribe_audio_files(str(base))
+
+    esperado = "\n".join(f"texto de reuniao_part{i:03d}.wav" for i in range(3))
+    assert segunda == esperado
+    assert (tmp_path / "reuniao_transcricao.txt").read_text(encoding="utf-8") == esperado
+    assert not (tmp_path / "reuniao_transcricao_partes.json").exists()
@@ -0,0 +1,86 @@
+"""
+Testes do índice BM25 usado na busca lexical
+"""
+
+import math
+
+import pytest
+
+from src.busca_lexica import IndiceBM25, tokenizar
+
+
+def test_tokenizar_remove_acentos_e_stopwords():
+    assert tokenizar("A reunião do Comitê sobre o CDI em 2024") == ['reuniao', 'comite', 'cdi', '2024']
+    assert tokenizar("a 1 b") == ['1']
+    assert tokenizar(None) == []
+
+
+def _indice(*textos):
+    indice = IndiceBM25()
+    for texto in textos:
+        indice.adicionar(texto)
+    return indice
+
+
+def test_posicoes_seguem_a_ordem_de_insercao():
+    indice = IndiceBM25()
+
+    assert [indice.adicionar(t) for t in ["um", "dois", None]] == [0, 1, 2]
+    assert indice.total_documentos == 3
+
+
+def test_termo_raro_pesa_mais_que_termo_comum():
+    indice = _indice(
+        "taxa de juros e taxa Selic",
+        "taxa de câmbio",
+        "taxa de inadimplência da carteira",
+    )
+
+    resultados = indice.buscar("taxa Selic")
+
+    assert resultados[0][0] == 0
+    assert resultados[0][1] > resultados[1][1] > 0
+
+
+def test_documento_curto_vence_com_mesma_frequencia():
+    indice = _indice("Selic", "Selic mencionada no meio de um texto bem mais longo sobre outras pautas")
+
+    assert [posicao for posicao, _ in indice.buscar("selic")] == [0, 1]
+
+
+def test_busca_sem_acento_encontra_texto_acentuado():
+    indice = _indice("Decisão sobre o orçamento", "Outro assunto")
+
+    assert [posicao for posicao, _ in indice.buscar("decisao orcamento")] == [0]
+
+
+def test_limite_e_consultas_vazias():
+    indice = _indice(*[f"documento {i} sobre credito" for i in range(20)])
+
+    assert len(indice.buscar("credito", limite=5)) == 5
+    assert indice.buscar("credito", limite=0) == []
+    assert indice.buscar("de o a") == []
+    assert indice.buscar("inexistente") == []
+    assert IndiceBM25().buscar("credito") == []
+
+
+def test_limpar_zera_o_indice():
+    indice = _indice("CDI", "Selic")
+    indice.limpar()
+
+    assert indice.total_documentos == 0
+    assert indice.buscar("CDI") == []
+    assert indice.adicionar("CDI") == 0
+
+
+def test_pontuacao_bm25_conhecida():
+    indice = IndiceBM25(k1=1.5, b=0.75)
+    indice.adicionar("selic alta")
+    indice.adicionar("cambio")
+
+    # Okapi BM25: 2 documentos, termo em 1; documento com 2 tokens e média 1.5
+    idf = math.log(1 + 1.5 / 1.5)
+    normalizacao = 1.5 * (1 - 0.75 + 0.75 * 2 / 1.5)
+    esperado = idf * 1 * 2.5 / (1 + normalizacao)
+
+    assert indice.buscar("selic") == [(0, pytest.approx(esperado, rel=1e-5))]
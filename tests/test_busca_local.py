@@ -0,0 +1,190 @@
+"""
+Testes do índice local (atualização concorrente e consistência com o BM25)
+Usa um cliente Supabase falso em memória; nenhuma chamada de rede
+"""
+
+import base64
+import struct
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.busca_local import BuscaSemanticaLocal
+
+DIMENSAO = 8
+
+
+def _b64(vetor):
+    return base64.b64encode(struct.pack('>HH', len(vetor), 0) + np.asarray(vetor, '>f4').tobytes()).decode()
+
+
+def _linhas(quantidade, inicio=0):
+    rng = np.random.default_rng(inicio)
+    return [
+        {
+            'id': f'id-{i}',
+            'created_at': f'2024-01-01T00:00:{i:02d}+00:00',
+            'chunk_texto': f'chunk {i} sobre CDI' if i % 2 else f'chunk {i} sobre Selic',
+            'embedding_b64': _b64(rng.normal(size=DIMENSAO)),
+        }
+        for i in range(inicio, inicio + quantidade)
+    ]
+
+
+class _Consulta:
+    def __init__(self, banco):
+        self.banco = banco
+        self.intervalo = (0, None)
+        self.condicoes = []
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: self
+
+    def gte(self, coluna, valor):
+        self.condicoes.append(lambda linha: linha[coluna] >= valor)
+        return self
+
+    def in_(self, coluna, valores):
+        self.condicoes.append(lambda linha: linha[coluna] in valores)
+        return self
+
+    def range(self, inicio, fim):
+        self.intervalo = (inicio, fim + 1)
+        return self
+
+    def execute(self):
+        self.banco.consultas += 1
+        if self.banco.falhar:
+            raise RuntimeError("banco indisponível")
+        time.sleep(self.banco.atraso)
+        linhas = [l for l in self.banco.linhas if all(condicao(l) for condicao in self.condicoes)]
+        inicio, fim = self.intervalo
+        return type('Resultado', (), {'data': [dict(l) for l in linhas[inicio:fim]]})()
+
+
+class _SupabaseFalso:
+    def __init__(self, linhas, atraso=0.0):
+        self.linhas = linhas
+        self.atraso = atraso
+        self.falhar = False
+        self.consultas = 0
+
+    def table(self, nome):
+        banco = self
+
+        class _Tabela:
+            def select(self, colunas):
+                return _Consulta(banco)
+
+        return _Tabela()
+
+
+def _indice(banco):
+    return BuscaSemanticaLocal(banco, dimensao=DIMENSAO, colunas='id, chunk_texto, created_at',
+                               coluna_texto='chunk_texto')
+
+
+def test_buscas_paralelas_em_indice_frio_veem_indice_completo():
+    banco = _SupabaseFalso(_linhas(10), atraso=0.2)
+    indice = _indice(banco)
+    consulta = np.ones(DIMENSAO).tolist()
+    resultados = {}
+
+    def lexical():
+        resultados['lex'] = indice.buscar_texto('CDI', limit=10)
+
+    def vetorial():
+        resultados['vet'] = indice.buscar_similares(consulta, threshold=-1.0, limit=10)
+
+    threads = [threading.Thread(target=lexical), threading.Thread(target=vetorial)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(resultados['lex']) == 5
+    assert len(resultados['vet']) == 10
+    assert banco.consultas == 1
+
+
+def test_documentos_bm25_correspondem_as_linhas_da_matriz():
+    banco = _SupabaseFalso(_linhas(6))
+    indice = _indice(banco)
+
+    for resultado in indice.buscar_texto('Selic', limit=10):
+        numero = int(resultado['id'].split('-')[1])
+        assert numero % 2 == 0
+        assert resultado['chunk_texto'] == f'chunk {numero} sobre Selic'
+    assert indice._lexico.total_documentos == indice._total == 6
+
+
+def test_falha_no_download_nao_marca_atualizacao():
+    banco = _SupabaseFalso(_linhas(4))
+    indice = _indice(banco)
+    banco.falhar = True
+
+    with pytest.raises(RuntimeError):
+        indice.atualizar_indice()
+    assert indice._ultima_atualizacao is None
+
+    banco.falhar = False
+    assert indice.atualizar_indice() == 4
+
+
+def test_atualizacao_incremental_adiciona_so_linhas_novas():
+    banco = _SupabaseFalso(_linhas(3))
+    indice = _indice(banco)
+    assert indice.atualizar_indice() == 3
+
+    banco.linhas = banco.linhas + _linhas(2, inicio=3)
+    assert indice.atualizar_indice(forcar=True) == 2
+    assert indice._total == 5
+
+
+def test_reconciliacao_remove_linhas_apagadas_do_banco():
+    banco = _SupabaseFalso(_linhas(6))
+    indice = BuscaSemanticaLocal(banco, dimensao=DIMENSAO, colunas='id, chunk_texto, created_at',
+                                 coluna_texto='chunk_texto', intervalo_reconciliacao=0.0)
+    indice.atualizar_indice()
+
+    # Reingestão: chunks 0 e 1 saem, chunk 6 entra
+    banco.linhas = banco.linhas[2:] + _linhas(1, inicio=6)
+    indice.atualizar_indice(forcar=True)
+
+    ids = {chunk['id'] for chunk in indice.buscar_similares(np.ones(DIMENSAO).tolist(), threshold=-1.0, limit=10)}
+    assert ids == {f'id-{i}' for i in range(2, 7)}
+    assert indice._lexico.total_documentos == indice._total == 5
+    for resultado in indice.buscar_texto('Selic', limit=10):
+        numero = int(resultado['id'].split('-')[1])
+        assert resultado['chunk_texto'] == f'chunk {numero} sobre Selic'
+
+
+def test_reconciliacao_baixa_linhas_fora_da_marca_dagua():
+    banco = _SupabaseFalso(_linhas(4, inicio=2))
+    indice = BuscaSemanticaLocal(banco, dimensao=DIMENSAO, colunas='id, chunk_texto, created_at',
+                                 coluna_texto='chunk_texto', intervalo_reconciliacao=0.0)
+    indice.atualizar_indice()
+
+    # Chunks reativados/gravados com created_at anterior à marca d'água
+    banco.linhas = _linhas(2) + banco.linhas
+    assert indice.atualizar_indice(forcar=True) == 0
+
+    assert indice._ids == {f'id-{i}' for i in range(6)}
+    assert indice._lexico.total_documentos == indice._total == 6
+    assert indice._marca == '2024-01-01T00:00:05+00:00'
+    for resultado in indice.buscar_texto('Selic', limit=10):
+        numero = int(resultado['id'].split('-')[1])
+        assert resultado['chunk_texto'] == f'chunk {numero} sobre Selic'
+
+
+def test_falha_na_reconciliacao_nao_derruba_a_busca():
+    banco = _SupabaseFalso(_linhas(3))
+    indice = BuscaSemanticaLocal(banco, dimensao=DIMENSAO, colunas='id, chunk_texto, created_at',
+                                 intervalo_reconciliacao=0.0)
+    indice.atualizar_indice()
+    indice._reconciliar = lambda: (_ for _ in ()).throw(RuntimeError("banco indisponível"))
+
+    assert indice.atualizar_indice(forcar=True) == 0
+    assert indice._total == 3
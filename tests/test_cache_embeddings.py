@@ -0,0 +1,52 @@
+"""
+Testes do cache de embeddings (LRU em memória e persistência em SQLite)
+"""
+
+import pytest
+
+from src.cache_embeddings import CacheEmbeddings
+
+MODELO = "text-embedding-ada-002"
+
+
+def test_variacoes_de_aspas_e_espacos_usam_a_mesma_entrada():
+    cache = CacheEmbeddings()
+    cache.guardar(MODELO, 'Qual a taxa "Selic"?', [0.5, 0.25])
+
+    assert cache.obter(MODELO, "Qual  a taxa Selic? ") == [0.5, 0.25]
+    assert cache.obter("outro-modelo", "Qual a taxa Selic?") is None
+
+
+def test_lru_descarta_o_menos_usado():
+    cache = CacheEmbeddings(capacidade_maxima=2)
+    cache.guardar(MODELO, "a", [1.0])
+    cache.guardar(MODELO, "b", [2.0])
+    cache.obter(MODELO, "a")
+    cache.guardar(MODELO, "c", [3.0])
+
+    assert cache.obter(MODELO, "b") is None
+    assert cache.obter(MODELO, "a") == [1.0]
+    assert cache.obter(MODELO, "c") == [3.0]
+
+
+def test_persistencia_sobrevive_a_novo_processo(tmp_path):
+    caminho = str(tmp_path / "embeddings.sqlite")
+    cache = CacheEmbeddings(caminho_persistencia=caminho)
+    cache.guardar(MODELO, "pergunta", [0.1, 0.2, 0.3])
+    cache.fechar()
+
+    reaberto = CacheEmbeddings(caminho_persistencia=caminho)
+    assert reaberto.obter(MODELO, "pergunta") == pytest.approx([0.1, 0.2, 0.3])
+    assert reaberto.obter_estatisticas()['hits_disco'] == 1
+    reaberto.fechar()
+
+
+def test_estatisticas_contam_hits_e_misses():
+    cache = CacheEmbeddings()
+    cache.obter(MODELO, "nada")
+    cache.guardar(MODELO, "algo", [1.0])
+    cache.obter(MODELO, "algo")
+
+    estatisticas = cache.obter_estatisticas()
+    assert (estatisticas['hits'], estatisticas['misses']) == (1, 1)
+    assert estatisticas['taxa_acerto'] == "50.0%"
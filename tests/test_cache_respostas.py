@@ -0,0 +1,70 @@
+"""
+Testes do cache de respostas (consulta exata antes da busca e por evidências depois)
+"""
+
+from src.cache_respostas import CacheRespostas
+
+
+def _cache():
+    return CacheRespostas(capacidade_maxima=3, ttl_segundos=60)
+
+
+def test_pergunta_igual_com_mesma_conversa_responde_do_cache():
+    cache = _cache()
+    cache.guardar("Quem aprovou o orçamento?", [1.0, 0.0], frozenset({'reuniao:1'}), "A diretoria.", 1)
+
+    em_cache = cache.obter_por_texto(CacheRespostas.chave_texto("  quem aprovou o ORÇAMENTO ", ""), 1)
+    assert em_cache['resposta'] == "A diretoria."
+
+
+def test_perguntas_quase_iguais_nao_colidem_antes_da_busca():
+    cache = _cache()
+    cache.guardar("O que foi decidido em 10/03?", [1.0, 0.0], frozenset({'reuniao:1'}), "Aumento.", 1)
+
+    assert cache.obter_por_texto(CacheRespostas.chave_texto("O que foi decidido em 11/03?"), 1) is None
+
+
+def test_contexto_da_conversa_diferente_nao_reaproveita_resposta():
+    cache = _cache()
+    cache.guardar("E depois?", [1.0, 0.0], frozenset(), "Votação.", 1,
+                  contexto_conversa="Falávamos do comitê de crédito")
+
+    assert cache.obter_por_texto(CacheRespostas.chave_texto("E depois?", "Falávamos do RH"), 1) is None
+
+
+def test_versao_nova_dos_dados_invalida_entrada():
+    cache = _cache()
+    chave = CacheRespostas.chave_texto("Pergunta")
+    cache.guardar("Pergunta", [1.0, 0.0], frozenset(), "Resposta", 1)
+
+    assert cache.obter_por_texto(chave, 2) is None
+    assert cache.obter_estatisticas()['total_entradas'] == 0
+
+
+def test_evidencias_exigem_os_mesmos_chunks():
+    cache = _cache()
+    cache.guardar("Pergunta", [1.0, 0.0], frozenset({'reuniao:1'}), "Resposta", 1)
+
+    assert cache.obter_por_evidencias([0.99, 0.05], frozenset({'reuniao:2'}), 1) is None
+    assert cache.obter_por_evidencias([0.99, 0.05], frozenset({'reuniao:1'}), 1)['resposta'] == "Resposta"
+
+
+def test_evidencias_exigem_o_mesmo_contexto_da_conversa():
+    cache = _cache()
+    cache.guardar("E depois?", [1.0, 0.0], frozenset({'reuniao:1'}), "Votação.", 1,
+                  contexto_conversa="Falávamos do comitê de crédito")
+
+    assert cache.obter_por_evidencias([1.0, 0.0], frozenset({'reuniao:1'}), 1, "Falávamos do RH") is None
+    em_cache = cache.obter_por_evidencias([1.0, 0.0], frozenset({'reuniao:1'}), 1,
+                                          "Falávamos do comitê de crédito")
+    assert em_cache['resposta'] == "Votação."
+
+
+def test_lru_remove_chave_textual_da_entrada_descartada():
+    cache = _cache()
+    for i in range(4):
+        cache.guardar(f"Pergunta {i}", [1.0, float(i)], frozenset(), f"Resposta {i}", 1)
+
+    assert cache.obter_por_texto(CacheRespostas.chave_texto("Pergunta 0"), 1) is None
+    assert cache.obter_por_texto(CacheRespostas.chave_texto("Pergunta 3"), 1)['resposta'] == "Resposta 3"
+    assert len(cache._por_texto) == 3
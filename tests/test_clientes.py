@@ -0,0 +1,53 @@
+"""
+Testes do registro de clientes (fechamento definitivo)
+"""
+
+import pytest
+
+from src import clientes
+from src.clientes import RegistroClientes, obter_registro_clientes
+
+
+@pytest.fixture
+def credenciais(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-teste')
+    monkeypatch.setattr(clientes, '_registro_clientes', None)
+
+
+def test_mesmo_cliente_openai_entre_chamadas(credenciais):
+    registro = RegistroClientes()
+
+    assert registro.openai() is registro.openai()
+    registro.fechar()
+
+
+def test_registro_fechado_recusa_novos_clientes(credenciais):
+    registro = RegistroClientes()
+    registro.openai()
+    registro.fechar()
+
+    assert registro.fechado
+    with pytest.raises(RuntimeError):
+        registro.openai()
+    with pytest.raises(RuntimeError):
+        registro.supabase('anon')
+
+
+def test_global_fechado_e_substituido(credenciais):
+    primeiro = obter_registro_clientes()
+    primeiro.fechar()
+
+    segundo = obter_registro_clientes()
+    assert segundo is not primeiro
+    assert segundo.openai() is not None
+    segundo.fechar()
+
+
+def test_opcoes_proprias_nao_alteram_o_cliente_compartilhado(credenciais):
+    registro = RegistroClientes()
+    compartilhado = registro.openai()
+    whisper = registro.openai(timeout_s=300, max_retries=0)
+
+    assert whisper.max_retries == 0 and whisper.timeout == 300
+    assert compartilhado.max_retries == registro.tentativas_openai
+    registro.fechar()
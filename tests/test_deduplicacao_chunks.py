@@ -0,0 +1,42 @@
+"""
+Testes do planejamento da reingestão por conteúdo dos chunks
+"""
+
+from src.deduplicacao_chunks import calcular_hash_chunk, planejar_reingestao
+
+
+def _planejar(novos, existentes):
+    return planejar_reingestao(
+        [{'texto': texto} for texto in novos],
+        [{'id': i, 'chunk_texto': texto} for i, texto in enumerate(existentes)],
+        texto_novo=lambda chunk: chunk['texto'],
+        texto_existente=lambda linha: linha['chunk_texto']
+    )
+
+
+def test_hash_ignora_espacos_nas_pontas():
+    assert calcular_hash_chunk("  texto\n") == calcular_hash_chunk("texto")
+
+
+def test_separa_novos_mantidos_e_removidos():
+    a_inserir, mantidos, a_remover = _planejar(["igual", "novo"], ["igual", "antigo"])
+
+    assert [chunk['texto'] for chunk in a_inserir] == ["novo"]
+    assert [(chunk['texto'], linha['id']) for chunk, linha in mantidos] == [("igual", 0)]
+    assert [linha['chunk_texto'] for linha in a_remover] == ["antigo"]
+
+
+def test_textos_repetidos_sao_pareados_um_a_um():
+    a_inserir, mantidos, a_remover = _planejar(["repetido", "repetido", "repetido"], ["repetido", "repetido"])
+
+    assert len(mantidos) == 2
+    assert {linha['id'] for _, linha in mantidos} == {0, 1}
+    assert [chunk['texto'] for chunk in a_inserir] == ["repetido"]
+    assert a_remover == []
+
+
+def test_linha_existente_sem_texto_e_removida():
+    a_inserir, mantidos, a_remover = _planejar(["texto"], [None])
+
+    assert len(a_inserir) == 1 and mantidos == []
+    assert a_remover == [{'id': 0, 'chunk_texto': None}]
@@ -0,0 +1,91 @@
+"""
+Testes do executor de perguntas (fila limitada, substituição por sessão, encerramento)
+"""
+
+import threading
+import time
+
+from src.executor_requisicoes import ExecutorRequisicoes
+
+
+def _aguardar(condicao, timeout=2.0):
+    limite = time.monotonic() + timeout
+    while not condicao() and time.monotonic() < limite:
+        time.sleep(0.01)
+    return condicao()
+
+
+def test_responde_e_repassa_a_sessao():
+    recebidas = []
+    respostas = []
+
+    def processar(mensagem, sessao):
+        recebidas.append((mensagem, sessao))
+        yield "Olá, "
+        yield "mundo"
+
+    executor = ExecutorRequisicoes(processar, max_workers=1)
+    trechos = []
+    executor.enviar('s1', 'oi', respostas.append, respostas.append, token_callback=trechos.append)
+
+    assert _aguardar(lambda: respostas)
+    assert respostas == ["Olá, mundo"]
+    assert trechos == ["Olá, ", "mundo"]
+    assert recebidas == [('oi', 's1')]
+    executor.encerrar()
+
+
+def test_pergunta_nova_da_sessao_cancela_a_anterior_e_fecha_o_gerador():
+    liberar = threading.Event()
+    fechados = []
+    respostas = []
+
+    def processar(mensagem, sessao):
+        try:
+            yield mensagem
+            liberar.wait(2)
+            yield " fim"
+        finally:
+            fechados.append(mensagem)
+
+    executor = ExecutorRequisicoes(processar, max_workers=1)
+    executor.enviar('s1', 'primeira', respostas.append, respostas.append)
+    assert _aguardar(lambda: executor.obter_estatisticas()['em_andamento'] == 1)
+
+    executor.enviar('s1', 'segunda', respostas.append, respostas.append)
+    liberar.set()
+
+    assert _aguardar(lambda: respostas)
+    assert respostas == ["segunda fim"]
+    assert 'primeira' in fechados
+    assert executor.obter_estatisticas()['canceladas'] == 1
+    executor.encerrar()
+
+
+def test_fila_cheia_recusa_com_error_callback():
+    liberar = threading.Event()
+    erros = []
+
+    def processar(mensagem, sessao):
+        liberar.wait(2)
+        yield mensagem
+
+    executor = ExecutorRequisicoes(processar, max_workers=1, tamanho_fila=1)
+    executor.enviar('s1', 'a', lambda r: None, erros.append)
+    assert _aguardar(lambda: executor.obter_estatisticas()['em_andamento'] == 1)
+    executor.enviar('s2', 'b', lambda r: None, erros.append)
+    assert executor.enviar('s3', 'c', lambda r: None, erros.append) is None
+
+    assert len(erros) == 1
+    assert executor.obter_estatisticas()['recusadas'] == 1
+    liberar.set()
+    executor.encerrar()
+
+
+def test_encerrar_recusa_novas_perguntas():
+    executor = ExecutorRequisicoes(lambda mensagem, sessao: iter([mensagem]), max_workers=1)
+    executor.encerrar()
+    erros = []
+
+    assert executor.enviar('s1', 'oi', lambda r: None, erros.append) is None
+    assert erros
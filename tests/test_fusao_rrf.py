@@ -0,0 +1,34 @@
+"""
+Testes da ordenação quando a busca por termos individuais é fundida por RRF
+"""
+
+from types import SimpleNamespace
+
+from src.agente_busca_melhorado import AgenteBuscaMelhorado
+
+
+class _Clientes:
+    def openai(self, timeout_s=None):
+        return SimpleNamespace()
+
+    def supabase(self, chave='service_role'):
+        return SimpleNamespace()
+
+
+def _documento(identificador, similaridade):
+    return {'id': identificador, 'similarity': similaridade, 'fonte': 'documento', 'conteudo': identificador}
+
+
+def test_documentos_seguem_a_ordem_rrf_apos_busca_por_termos():
+    agente = AgenteBuscaMelhorado(_Clientes())
+    original = [_documento('a', 0.60), _documento('b', 0.55), _documento('c', 0.50)]
+    # 'c' aparece no topo das buscas por termo: sobe no RRF apesar da menor similaridade
+    por_termo = [[_documento('c', 0.50), _documento('b', 0.55)], [_documento('c', 0.50)]]
+
+    agente._buscar_fontes_em_paralelo = lambda pergunta: ([], original, [], [])
+    agente._buscar_em_base_conhecimento_multi = lambda termos, limite=15: por_termo
+
+    resultados = agente.buscar_chunks_relevantes("procedimentos cambiais", num_resultados=5)
+
+    assert [r['id'] for r in resultados] == ['c', 'b', 'a']
+    assert resultados[0]['rrf_score'] > resultados[1]['rrf_score'] > resultados[2]['rrf_score']
@@ -0,0 +1,174 @@
+"""
+Testes da ingestão paralela (limite de taxa, retentativas e isolamento de erros)
+"""
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src import ingestao_paralela
+from src.ingestao_paralela import LimitadorTaxa, executar_com_retry, processar_arquivos_em_paralelo
+
+
+class _ErroApi(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """Registra os sleeps do backoff sem esperar de verdade"""
+    registradas = []
+    monkeypatch.setattr(ingestao_paralela.time, 'sleep', registradas.append)
+    monkeypatch.setattr(ingestao_paralela.random, 'random', lambda: 1.0)
+    return registradas
+
+
+def test_limitador_libera_o_balde_cheio_sem_esperar():
+    limitador = LimitadorTaxa(requisicoes_por_minuto=600, tokens_por_minuto=10_000)
+    inicio = time.monotonic()
+
+    for _ in range(5):
+        limitador.aguardar(tokens=1000)
+
+    assert time.monotonic() - inicio < 0.1
+
+
+def test_limitador_espera_reposicao_de_requisicoes():
+    # 600/min = 1 requisição a cada 0.1 s
+    limitador = LimitadorTaxa(requisicoes_por_minuto=600, tokens_por_minuto=1_000_000)
+    limitador._saldo_requisicoes = 0.0
+    inicio = time.monotonic()
+
+    limitador.aguardar()
+
+    assert 0.08 <= time.monotonic() - inicio < 1.0
+
+
+def test_limitador_espera_reposicao_de_tokens():
+    # 60.000 tokens/min = 1.000 por segundo; pedir 200 sem saldo espera ~0.2 s
+    limitador = LimitadorTaxa(requisicoes_por_minuto=100_000, tokens_por_minuto=60_000)
+    limitador._saldo_tokens = 0.0
+    inicio = time.monotonic()
+
+    limitador.aguardar(tokens=200)
+
+    assert 0.15 <= time.monotonic() - inicio < 1.0
+
+
+def test_limitador_compartilhado_entre_threads_nao_estoura_a_cota():
+    limitador = LimitadorTaxa(requisicoes_por_minuto=600, tokens_por_minuto=1_000_000)
+    limitador._saldo_requisicoes = 2.0
+    liberadas = []
+
+    def chamar():
+        limitador.aguardar()
+        liberadas.append(time.monotonic())
+
+    inicio = time.monotonic()
+    threads = [threading.Thread(target=chamar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 2 do saldo na hora; as outras 2 precisam de ~0.1 s de reposição cada
+    assert max(liberadas) - inicio >= 0.15
+
+
+def test_retry_repete_erros_transitorios_com_backoff(esperas):
+    respostas = [_ErroApi(429), _ErroApi(503), "ok"]
+
+    def chamar():
+        resposta = respostas.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    assert executar_com_retry(chamar, tentativas=5, espera_inicial=1.0) == "ok"
+    assert esperas == [1.0, 2.0]
+
+
+def test_retry_respeita_espera_maxima_e_desiste(esperas):
+    chamadas = []
+
+    def falhar():
+        chamadas.append(1)
+        raise _ErroApi(500)
+
+    with pytest.raises(_ErroApi):
+        executar_com_retry(falhar, tentativas=4, espera_inicial=1.0, espera_maxima=3.0)
+    assert len(chamadas) == 4
+    assert esperas == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize('erro', [_ErroApi(400), ValueError("dados inválidos")])
+def test_retry_nao_repete_erros_definitivos(esperas, erro):
+    chamadas = []
+
+    def falhar():
+        chamadas.append(1)
+        raise erro
+
+    with pytest.raises(type(erro)):
+        executar_com_retry(falhar)
+    assert len(chamadas) == 1 and esperas == []
+
+
+def test_retry_reconhece_status_na_resposta_e_falha_de_conexao(esperas):
+    class APIConnectionError(Exception):
+        pass
+
+    erros = [APIConnectionError("sem rede"), Exception("x")]
+    erros[1].response = SimpleNamespace(status_code=502)
+
+    def chamar():
+        if erros:
+            raise erros.pop(0)
+        return "ok"
+
+    assert executar_com_retry(chamar) == "ok"
+    assert len(esperas) == 2
+
+
+def test_erro_em_um_arquivo_nao_afeta_os_outros(tmp_path):
+    arquivos = [tmp_path / f"reuniao_{i}.txt" for i in range(5)]
+
+    def processar(caminho):
+        nome = Path(caminho).name
+        if nome == "reuniao_1.txt":
+            raise RuntimeError("arquivo corrompido")
+        return nome != "reuniao_3.txt"
+
+    registros = processar_arquivos_em_paralelo(arquivos, processar, max_workers=3)
+
+    assert [r['arquivo'] for r in registros] == [a.name for a in arquivos]
+    assert [r['sucesso'] for r in registros] == [True, False, True, False, True]
+    assert registros[1]['erro'] == "arquivo corrompido" and registros[1]['resultado'] is None
+    assert 'erro' not in registros[3]
+
+
+def test_pool_respeita_max_workers_e_criterio_de_sucesso(tmp_path):
+    arquivos = [tmp_path / f"doc_{i}.txt" for i in range(6)]
+    ativos = []
+    maximo = []
+    lock = threading.Lock()
+
+    def processar(caminho):
+        with lock:
+            ativos.append(caminho)
+            maximo.append(len(ativos))
+        time.sleep(0.05)
+        with lock:
+            ativos.remove(caminho)
+        return {'erros': []}
+
+    registros = processar_arquivos_em_paralelo(arquivos, processar, max_workers=2,
+                                               sucesso=lambda r: not r['erros'])
+
+    assert max(maximo) <= 2
+    assert all(r['sucesso'] for r in registros)
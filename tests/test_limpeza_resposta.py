@@ -0,0 +1,45 @@
+"""
+Testes da limpeza incremental das respostas (mesmo resultado com ou sem streaming)
+"""
+
+import pytest
+
+from src.limpeza_resposta import LimpadorResposta, limpar_fluxo, limpar_resposta
+
+RESPOSTAS = [
+    "Com base no contexto fornecido, a taxa foi mantida em 10,5%.\n\n\nPosso ajudar com mais alguma coisa?",
+    "  A reunião decidiu:\n   \n- manter a meta\n- revisar em março  ",
+    "Vale destacar que o comitê aprovou. Espero ter ajudado",
+    "Resposta sem nada a remover.",
+]
+
+
+def _em_tokens(texto, tamanho):
+    return [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)]
+
+
+def test_remove_frases_linhas_vazias_e_espacos_das_pontas():
+    assert limpar_resposta(RESPOSTAS[0]) == "a taxa foi mantida em 10,5%."
+    assert limpar_resposta(RESPOSTAS[1]) == "A reunião decidiu:\n- manter a meta\n- revisar em março"
+
+
+@pytest.mark.parametrize('resposta', RESPOSTAS)
+@pytest.mark.parametrize('tamanho', [1, 2, 3, 7])
+def test_fluxo_em_pedacos_da_o_mesmo_resultado(resposta, tamanho):
+    assert "".join(limpar_fluxo(_em_tokens(resposta, tamanho))) == limpar_resposta(resposta)
+
+
+def test_inicio_de_frase_removivel_fica_retido_ate_decidir():
+    limpador = LimpadorResposta()
+
+    assert limpador.adicionar("Texto. Vale") == "Texto."
+    assert limpador.adicionar(" lembrar que") == ""
+    # A frase sai e os espaços em volta ficam, como na limpeza da resposta inteira
+    assert limpador.adicionar(" o prazo é sexta.") == "  o prazo é sexta."
+    assert limpar_resposta("Texto. Vale lembrar que o prazo é sexta.") == "Texto.  o prazo é sexta."
+
+
+def test_fluxo_nao_gera_trechos_vazios():
+    trechos = list(limpar_fluxo(["  ", "\n", "Olá", "  ", "\n\n"]))
+
+    assert trechos == ["Olá"]
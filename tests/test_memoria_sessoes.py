@@ -0,0 +1,77 @@
+"""
+Testes da memória de conversa por sessão e da versão dos dados no agente
+Clientes falsos; o agente não faz chamadas de rede ao ser criado
+"""
+
+from types import SimpleNamespace
+
+from src.agente_busca_melhorado import AgenteBuscaMelhorado
+
+
+class _Clientes:
+    def openai(self, timeout_s=None):
+        return SimpleNamespace()
+
+    def supabase(self, chave='service_role'):
+        return SimpleNamespace()
+
+
+def test_cada_sessao_tem_sua_memoria():
+    agente = AgenteBuscaMelhorado(_Clientes())
+
+    memoria_a = agente.memoria_da_sessao('janela-a')
+    memoria_b = agente.memoria_da_sessao('janela-b')
+    memoria_a.processar_interacao("Quem apresentou o orçamento?", "A diretoria financeira.")
+
+    assert memoria_a is agente.memoria_da_sessao('janela-a')
+    assert memoria_a is not memoria_b
+    assert memoria_b.obter_contexto() == ""
+    assert agente.memoria_da_sessao(None) is agente.gerenciador_memoria
+
+
+class _Consulta:
+    """Consulta falsa do Supabase: filtros de igualdade, ordenação e limite"""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        self.limite = None
+
+    def select(self, colunas, count=None):
+        return self
+
+    def eq(self, coluna, valor):
+        self.linhas = [linha for linha in self.linhas if linha.get(coluna) == valor]
+        return self
+
+    def order(self, coluna, desc=False):
+        self.linhas = sorted(self.linhas, key=lambda linha: linha[coluna], reverse=desc)
+        return self
+
+    def limit(self, n):
+        self.limite = n
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.linhas[:self.limite], count=len(self.linhas))
+
+
+def test_versao_dos_dados_muda_ao_desativar_chunks():
+    reunioes = [{'created_at': '2024-03-01'}]
+    conhecimento = [
+        {'data_atualizacao': '2024-03-01', 'ativo': True},
+        {'data_atualizacao': '2024-03-01', 'ativo': True},
+    ]
+    tabelas = {'reunioes_embbed': reunioes, 'base_conhecimento': conhecimento}
+    supabase = SimpleNamespace(table=lambda nome: _Consulta(tabelas[nome]))
+
+    class _ClientesBanco(_Clientes):
+        def supabase(self, chave='service_role'):
+            return supabase
+
+    agente = AgenteBuscaMelhorado(_ClientesBanco())
+    agente.intervalo_versao_dados = 0
+    versao = agente._versao_dados()
+
+    conhecimento[1]['ativo'] = False
+
+    assert agente._versao_dados() != versao
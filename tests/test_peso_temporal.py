@@ -0,0 +1,68 @@
+"""
+Testes da curva de recência (meia-vida) usada na reordenação
+"""
+
+import math
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.peso_temporal import PesoTemporal, epoca_de_data, obter_peso_temporal
+
+DIA = 86400.0
+AGORA = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
+
+
+def test_epoca_de_data_aceita_formatos_do_banco():
+    esperado = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+
+    assert epoca_de_data('2024-05-01T10:00:00+00:00') == esperado
+    assert epoca_de_data('2024-05-01T10:00:00Z') == esperado
+    assert epoca_de_data('2024-05-01T10:00:00.5+00:00') == esperado + 0.5
+    assert epoca_de_data('2024-05-01T10:00:00.1234567+00:00') == pytest.approx(esperado + 0.123456)
+    assert epoca_de_data(date(2024, 5, 1)) == esperado - 10 * 3600
+
+
+@pytest.mark.parametrize('valor', [None, '', 'ontem'])
+def test_epoca_de_data_invalida_vira_nan(valor):
+    assert math.isnan(epoca_de_data(valor))
+
+
+def test_curva_de_meia_vida():
+    curva = PesoTemporal(meia_vida_dias=30, peso_maximo=1.2, peso_minimo=0.9)
+    epocas = np.array([AGORA, AGORA - 30 * DIA, AGORA - 3650 * DIA, AGORA + DIA, np.nan])
+
+    pesos = curva.pesos(epocas, agora=AGORA)
+
+    assert pesos == pytest.approx([1.2, 1.05, 0.9, 1.2, 1.0])
+
+
+def test_aplicar_limita_a_um():
+    curva = PesoTemporal(peso_maximo=1.2, peso_minimo=0.9)
+    similaridades = np.array([0.95, 0.5])
+
+    ajustadas = curva.aplicar(similaridades, np.array([AGORA, AGORA]), agora=AGORA)
+
+    assert ajustadas == pytest.approx([1.0, 0.6])
+
+
+def test_peso_de_uma_data():
+    curva = PesoTemporal(meia_vida_dias=10, peso_maximo=2.0, peso_minimo=1.0)
+
+    assert curva.peso('2024-05-22T00:00:00+00:00', agora=AGORA) == pytest.approx(1.5)
+
+
+def test_meia_vida_deve_ser_positiva():
+    with pytest.raises(ValueError):
+        PesoTemporal(meia_vida_dias=0)
+
+
+def test_configuracao_pelo_env(monkeypatch):
+    monkeypatch.setenv('PESO_TEMPORAL_MEIA_VIDA_DIAS', '7')
+    monkeypatch.setenv('PESO_TEMPORAL_MAXIMO', '1.5')
+    monkeypatch.setenv('PESO_TEMPORAL_MINIMO', '0.5')
+
+    curva = obter_peso_temporal()
+
+    assert (curva.meia_vida_dias, curva.peso_maximo, curva.peso_minimo) == (7.0, 1.5, 0.5)
@@ -0,0 +1,132 @@
+"""
+Testes do pipeline de ingestão em streaming (fim do fluxo mesmo com falha de etapa)
+Clientes OpenAI e Supabase falsos em memória; nenhuma chamada de rede
+"""
+
+import threading
+from types import SimpleNamespace
+
+from src.embeddings_processor import ProcessadorEmbeddings
+from src.pipeline_reuniao import PipelineIngestaoReuniao
+
+CABECALHO = "Título: Comitê de Crédito\nData: 10/03/2024"
+
+
+class _Consulta:
+    def __init__(self, banco):
+        self.banco = banco
+
+    def insert(self, linhas):
+        self.banco.inseridas.extend(linhas)
+        return self
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+class _Banco:
+    def __init__(self):
+        self.inseridas = []
+
+    def table(self, nome):
+        return _Consulta(self)
+
+
+class _Clientes:
+    def __init__(self, banco):
+        self.banco = banco
+        embeddings = SimpleNamespace(create=lambda model, input: SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[0.1] * 4) for i in range(len(input))]
+        ))
+        self.cliente_openai = SimpleNamespace(embeddings=embeddings)
+
+    def openai(self, timeout_s=None):
+        return self.cliente_openai
+
+    def supabase(self, chave='service_role'):
+        return self.banco
+
+
+def _pipeline(banco, **kwargs):
+    processador = ProcessadorEmbeddings(_Clientes(banco))
+    processador.chunk_size = 20
+    processador.chunk_overlap = 2
+    return PipelineIngestaoReuniao(processador, CABECALHO, "reuniao_teste.txt", espera_lote_s=0.05, **kwargs)
+
+
+def _em_thread(funcao, timeout=5.0):
+    """Executa funcao e falha se ela não terminar dentro do prazo"""
+    resultado = {}
+    thread = threading.Thread(target=lambda: resultado.update(valor=funcao()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline travou"
+    return resultado.get('valor')
+
+
+def _segmentos(quantidade):
+    return [f"Segmento {i} sobre a taxa de juros e a carteira de crédito do trimestre." for i in range(quantidade)]
+
+
+def test_segmentos_viram_chunks_inseridos():
+    banco = _Banco()
+    pipeline = _pipeline(banco)
+    for segmento in _segmentos(10):
+        pipeline.adicionar_segmento(segmento)
+
+    resultado = _em_thread(pipeline.finalizar)
+
+    assert resultado['sucesso'] and resultado['erro'] is None
+    assert resultado['chunks_inseridos'] == resultado['chunks_criados'] == len(banco.inseridas) > 1
+
+
+def test_chunks_nao_inseridos_tornam_a_ingestao_parcial():
+    banco = _Banco()
+    pipeline = _pipeline(banco)
+    inserir = pipeline.processador._inserir_lote
+    pipeline.processador._inserir_lote = lambda linhas: inserir(linhas[1:])
+    for segmento in _segmentos(10):
+        pipeline.adicionar_segmento(segmento)
+
+    resultado = _em_thread(pipeline.finalizar)
+
+    assert not resultado['sucesso'] and resultado['parcial']
+    assert resultado['chunks_com_erro'] > 0 and resultado['erro'] is None
+
+
+def test_falha_ao_montar_linha_nao_trava_finalizar():
+    banco = _Banco()
+    pipeline = _pipeline(banco)
+    pipeline.processador.montar_linha = lambda *args: 1 / 0
+    for segmento in _segmentos(10):
+        pipeline.adicionar_segmento(segmento)
+
+    resultado = _em_thread(pipeline.finalizar)
+
+    assert not resultado['sucesso']
+    assert resultado['erro'].startswith('embeddings')
+
+
+def test_falha_no_chunker_nao_bloqueia_novos_segmentos():
+    banco = _Banco()
+    pipeline = _pipeline(banco, tamanho_fila=1)
+    pipeline._chunker.adicionar = lambda texto: 1 / 0
+
+    # Mais segmentos do que cabem nas filas: sem escoamento, adicionar_segmento bloquearia
+    _em_thread(lambda: [pipeline.adicionar_segmento(s) for s in _segmentos(20)])
+    resultado = _em_thread(pipeline.finalizar)
+
+    assert resultado['erro'].startswith('chunks')
+    assert banco.inseridas == []
+
+
+def test_cancelar_apos_falha_termina():
+    banco = _Banco()
+    pipeline = _pipeline(banco)
+    pipeline._chunker.adicionar = lambda texto: 1 / 0
+    pipeline.adicionar_segmento("Primeiro segmento.")
+
+    _em_thread(pipeline.cancelar)
@@ -0,0 +1,134 @@
+"""
+Testes da ordem da reingestão: o conteúdo antigo só sai depois que o novo foi gravado
+Clientes OpenAI e Supabase falsos em memória; nenhuma chamada de rede
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.embeddings_processor import ProcessadorEmbeddings
+from src.base_conhecimento_processor import ProcessadorBaseConhecimento
+
+
+class _Consulta:
+    def __init__(self, banco, tabela):
+        self.banco = banco
+        self.tabela = tabela
+        self.operacao = None
+        self.colunas = ''
+
+    def select(self, colunas='*', **kwargs):
+        self.operacao, self.colunas = 'select', colunas
+        return self
+
+    def insert(self, linhas):
+        self.operacao = 'insert'
+        return self
+
+    def update(self, valores):
+        self.operacao = 'update' if valores != {'ativo': False} else 'desativar'
+        return self
+
+    def delete(self):
+        self.operacao = 'delete'
+        return self
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.banco.operacoes.append((self.tabela, self.operacao))
+        if self.operacao == 'insert' and self.banco.falhar_insercao:
+            raise RuntimeError("falha na inserção")
+        dados = []
+        if self.operacao == 'select' and ('chunk_texto' in self.colunas or 'conteudo' in self.colunas):
+            dados = self.banco.existentes
+        return SimpleNamespace(data=dados)
+
+
+class _Banco:
+    def __init__(self, existentes, falhar_insercao=False):
+        self.existentes = existentes
+        self.falhar_insercao = falhar_insercao
+        self.operacoes = []
+
+    def table(self, nome):
+        return _Consulta(self, nome)
+
+
+class _Embeddings:
+    def __init__(self, falhar):
+        self.falhar = falhar
+
+    def create(self, model, input):
+        if self.falhar:
+            raise RuntimeError("OpenAI indisponível")
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[0.1] * 4) for i in range(len(input))])
+
+
+class _Clientes:
+    def __init__(self, banco, falhar_embeddings=False):
+        self.banco = banco
+        self.cliente_openai = SimpleNamespace(embeddings=_Embeddings(falhar_embeddings))
+
+    def openai(self, timeout_s=None):
+        return self.cliente_openai
+
+    def supabase(self, chave='service_role'):
+        return self.banco
+
+
+def _operacoes(banco, tabela, *tipos):
+    return [operacao for nome, operacao in banco.operacoes if nome == tabela and operacao in tipos]
+
+
+@pytest.fixture
+def reuniao(tmp_path):
+    caminho = tmp_path / "reuniao.txt"
+    caminho.write_text("Título: Comitê\n\nTexto novo da reunião sobre crédito.", encoding='utf-8')
+    return str(caminho)
+
+
+@pytest.fixture
+def documento(tmp_path):
+    caminho = tmp_path / "manual.txt"
+    caminho.write_text("Manual de procedimentos de crédito, versão revisada.", encoding='utf-8')
+    return str(caminho)
+
+
+def test_reuniao_remove_chunks_antigos_depois_de_inserir(reuniao):
+    banco = _Banco([{'id': 'antigo', 'chunk_texto': 'conteúdo que saiu', 'chunk_numero': 1}])
+    ProcessadorEmbeddings(_Clientes(banco)).processar_arquivo(reuniao)
+
+    assert _operacoes(banco, 'reunioes_embbed', 'insert', 'delete') == ['insert', 'delete']
+
+
+@pytest.mark.parametrize('falha', ['embeddings', 'insercao'])
+def test_reuniao_mantem_chunks_antigos_se_gravacao_falhar(reuniao, falha):
+    banco = _Banco([{'id': 'antigo', 'chunk_texto': 'conteúdo que saiu', 'chunk_numero': 1}],
+                   falhar_insercao=falha == 'insercao')
+    ProcessadorEmbeddings(_Clientes(banco, falhar_embeddings=falha == 'embeddings')).processar_arquivo(reuniao)
+
+    assert _operacoes(banco, 'reunioes_embbed', 'delete') == []
+
+
+def test_documento_desativa_chunks_antigos_depois_de_inserir(documento):
+    banco = _Banco([{'id': 'antigo', 'conteudo': 'versão anterior', 'chunk_index': 0}])
+    resultado = ProcessadorBaseConhecimento(_Clientes(banco)).processar_documento(documento)
+
+    assert _operacoes(banco, 'base_conhecimento', 'insert', 'desativar') == ['insert', 'desativar']
+    assert resultado['chunks_desativados'] == 1
+
+
+@pytest.mark.parametrize('falha', ['embeddings', 'insercao'])
+def test_documento_mantem_chunks_ativos_se_gravacao_falhar(documento, falha):
+    banco = _Banco([{'id': 'antigo', 'conteudo': 'versão anterior', 'chunk_index': 0}],
+                   falhar_insercao=falha == 'insercao')
+    resultado = ProcessadorBaseConhecimento(
+        _Clientes(banco, falhar_embeddings=falha == 'embeddings')
+    ).processar_documento(documento)
+
+    assert _operacoes(banco, 'base_conhecimento', 'desativar') == []
+    assert resultado['chunks_desativados'] == 0
+    assert resultado['erros']
@@ -0,0 +1,40 @@
+"""
+Testes da detecção de perguntas genéricas sobre uma reunião específica
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.agente_busca_melhorado import AgenteBuscaMelhorado
+
+
+class _Clientes:
+    def openai(self, timeout_s=None):
+        return SimpleNamespace()
+
+    def supabase(self, chave='service_role'):
+        return SimpleNamespace()
+
+
+@pytest.fixture(scope='module')
+def agente():
+    return AgenteBuscaMelhorado(_Clientes())
+
+
+@pytest.mark.parametrize('pergunta, nome', [
+    ("Me fale sobre a reunião de planejamento", "planejamento"),
+    ("O que aconteceu na reunião do comitê?", "comitê?"),
+    ("Qual foi a reuniao da diretoria", "diretoria"),
+])
+def test_detecta_nome_da_reuniao(agente, pergunta, nome):
+    assert agente._e_pergunta_sobre_reuniao_especifica(pergunta) == (True, nome)
+
+
+@pytest.mark.parametrize('pergunta', [
+    "Me fale sobre a reunião de planejamento: quero o resumo",
+    "Quais as decisões da reunião do comitê?",
+    "Qual a taxa Selic atual?",
+])
+def test_pedido_especifico_ou_outro_assunto_nao_pede_opcoes(agente, pergunta):
+    assert agente._e_pergunta_sobre_reuniao_especifica(pergunta) == (False, "")
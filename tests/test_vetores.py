@@ -0,0 +1,51 @@
+"""
+Testes da conversão de embeddings do pgvector para float32
+"""
+
+import base64
+import struct
+
+import numpy as np
+import pytest
+
+from src.vetores import converter_embedding, vetor_de_pgvector_b64, vetor_de_texto
+
+
+def _vector_send(valores):
+    """Mesmo formato de vector_send: dim, reservado e floats big-endian"""
+    return struct.pack('>HH', len(valores), 0) + struct.pack(f'>{len(valores)}f', *valores)
+
+
+def test_binario_base64_vira_float32():
+    vetor = vetor_de_pgvector_b64(base64.b64encode(_vector_send([0.5, -1.25, 3.0])).decode())
+
+    assert vetor.dtype == np.float32
+    assert vetor.tolist() == [0.5, -1.25, 3.0]
+    assert vetor.flags['C_CONTIGUOUS'] and vetor.flags['WRITEABLE']
+
+
+def test_binario_com_quebras_de_linha_do_postgres():
+    texto = base64.b64encode(_vector_send([0.1] * 100)).decode()
+    com_quebras = "\n".join(texto[i:i + 76] for i in range(0, len(texto), 76))
+
+    assert vetor_de_pgvector_b64(com_quebras) == pytest.approx([0.1] * 100)
+
+
+@pytest.mark.parametrize('dados', [b"\x00\x03", _vector_send([1.0, 2.0, 3.0])[:-4]])
+def test_binario_truncado_e_rejeitado(dados):
+    with pytest.raises(ValueError):
+        vetor_de_pgvector_b64(base64.b64encode(dados).decode())
+
+
+def test_texto_do_pgvector():
+    assert vetor_de_texto("[0.25,-0.5,1]").tolist() == [0.25, -0.5, 1.0]
+    with pytest.raises(ValueError):
+        vetor_de_texto("0.25,-0.5")
+
+
+def test_converter_embedding_confere_a_dimensao():
+    assert converter_embedding("[1,2,3]", dimensao=3).tolist() == [1.0, 2.0, 3.0]
+    assert converter_embedding([1, 2, 3], dimensao=3).dtype == np.float32
+    assert converter_embedding("[1,2]", dimensao=3) is None
+    assert converter_embedding("sem vetor", dimensao=3) is None
+    assert converter_embedding(None) is None